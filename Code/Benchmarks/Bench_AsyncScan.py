@@ -0,0 +1,107 @@
+"""
+高延迟文件系统上的扫描基准：同步 scan_artist_folder 对比异步 scan_artists_async。
+
+用延迟垫片模拟 /mnt/e (drvfs) 或 NAS：每次 os.scandir / os.stat 调用前 sleep 固定时长，
+sleep 会释放 GIL，与真实挂载点上阻塞等待 I/O 的表现一致。
+合成曲库沿用 Bench_Library 的目录布局，并校验两种扫描得到的 Track 完全一致。
+
+用法：
+    python3 Bench_AsyncScan.py --files 2000 --latency-ms 2
+    python3 Bench_AsyncScan.py --files 5000 --latency-ms 5 --limits 1 4 16 64 --cache
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+HEADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads')
+sys.path.append(HEADS_DIR)
+
+import Head_Collect as Collect
+from Head_Cache import ScanCache
+from Bench_Library import build_library
+
+LATENCY_CALLS = [(os, "scandir"), (os, "stat")]
+
+class LatencyShim:
+    """临时替换 os.scandir / os.stat，每次调用前注入 latency 秒的延迟"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._originals = {}
+
+    def __enter__(self):
+        for module, name in LATENCY_CALLS:
+            original = getattr(module, name)
+            self._originals[(module, name)] = original
+
+            def wrapper(*args, _original=original, **kwargs):
+                self.calls += 1
+                time.sleep(self.latency)
+                return _original(*args, **kwargs)
+            setattr(module, name, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for (module, name), original in self._originals.items():
+            setattr(module, name, original)
+        self._originals = {}
+
+def make_cache(use_cache, workdir, label):
+    """--cache 时每次运行使用一份新的空缓存（冷启动，lookup 的 stat 同样计入延迟）"""
+    return ScanCache(os.path.join(workdir, f"{label}.json")) if use_cache else None
+
+def run_sync(folders, latency, cache):
+    with LatencyShim(latency) as shim:
+        t0 = time.perf_counter()
+        result = {f: Collect.scan_artist_folder(f, cache=cache) for f in folders}
+        elapsed = time.perf_counter() - t0
+    return result, elapsed, shim.calls
+
+def run_async(folders, latency, cache, limit):
+    with LatencyShim(latency) as shim:
+        t0 = time.perf_counter()
+        result = Collect.scan_artists_async(folders, cache=cache, io_limit=limit)
+        elapsed = time.perf_counter() - t0
+    return result, elapsed, shim.calls
+
+def main():
+    parser = argparse.ArgumentParser(description="高延迟文件系统上的同步 / 异步扫描对比")
+    parser.add_argument("--files", type=int, default=2000, help="合成曲库文件数 (默认 2000)")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="每次 scandir / stat 注入的延迟 (毫秒)")
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="异步扫描的每挂载点并发上限，可多个")
+    parser.add_argument("--cache", action="store_true", help="同时启用 ScanCache（冷缓存）")
+    parser.add_argument("--root", default="/dev/shm" if os.path.isdir("/dev/shm") else None,
+                        help="生成曲库的目录，默认 /dev/shm (tmpfs)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_async_", dir=args.root)
+    latency = args.latency_ms / 1000
+    try:
+        music = os.path.join(workdir, "Music")
+        artist_names = build_library(music, args.files)
+        folders = [os.path.join(music, a) for a in artist_names]
+        print(f"曲库: {args.files} 个文件，{len(folders)} 位歌手，延迟 {args.latency_ms} ms/调用")
+
+        expected, sync_seconds, sync_calls = run_sync(folders, latency, make_cache(args.cache, workdir, "sync"))
+        tracks = sum(len(t) for t in expected.values())
+        print(f"\n  {'扫描方式':<14}{'耗时(s)':>10}{'调用数':>9}{'加速比':>9}")
+        print(f"  {'同步':<14}{sync_seconds:>10.3f}{sync_calls:>9}{1:>9.2f}")
+
+        for limit in args.limits:
+            result, seconds, calls = run_async(folders, latency, make_cache(args.cache, workdir, f"async{limit}"),
+                                               limit)
+            if result != expected:
+                print(f"❌ 异步扫描 (并发 {limit}) 结果与同步扫描不一致")
+                sys.exit(1)
+            print(f"  {'异步 x' + str(limit):<14}{seconds:>10.3f}{calls:>9}{sync_seconds / seconds:>9.2f}")
+        print(f"\n✅ 所有异步扫描结果与同步扫描一致（{tracks} 条 Track）")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+合成曲库基准：在 tmpfs 上按真实目录布局生成曲库，分别计时各阶段。
+
+目录布局：
+    <root>/<歌手>/YYYY.MM.DD_Album_专辑名[FLAC]/NNN.曲名.flac
+    <root>/<歌手>/单曲/YYYY.MM.DD_Single_曲名/曲名.flac
+    <root>/<歌手>/演唱会/YYYY.MM.DD-演唱会名.mp4
+    <root>/CloudMusic/<子目录>/歌手-歌名_来源.mp3
+
+阶段：
+    scan      : scan_artist_folder（所有歌手）
+    csv       : generate_csv（首次生成，policy=accept）
+    readme    : csv_to_markdown_grouped
+    summary   : scan_and_export_summary
+    summary_md: summary_csv_to_markdown
+
+每个阶段记录耗时、文件系统调用次数 (scandir / listdir / stat / open) 和内存峰值，
+结果写入 JSON，可用 --compare 与其他提交的结果对比。
+
+用法：
+    python3 Bench_Library.py --sizes 10 1000 100000 -o bench.json
+    python3 Bench_Library.py --sizes 1000000 --root /dev/shm
+    python3 Bench_Library.py --sizes 1000 --compare old.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+
+HEADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads')
+sys.path.append(HEADS_DIR)
+
+import Head_Collect as Collect
+from Head_Profile import FsCallCounter
+
+PHASES = ["scan", "csv", "readme", "summary", "summary_md"]
+ALBUM_SIZE = 12
+SOURCES = ["CD", "Live night", "Live ARIA", "MV", "Live MidnightSun"]
+
+def layout_counts(n_files):
+    """按比例分配：专辑 70%，单曲 10%，演唱会 2%，CloudMusic 其余"""
+    albums = max(1, n_files * 70 // 100)
+    singles = n_files * 10 // 100
+    lives = n_files * 2 // 100
+    cloud = max(0, n_files - albums - singles - lives)
+    artists = max(1, min(200, int(n_files ** 0.5) // 4))
+    return artists, albums, singles, lives, cloud
+
+def touch(path):
+    with open(path, "wb"):
+        pass
+
+def build_library(root, n_files):
+    """在 root 下生成约 n_files 个（空）文件的合成曲库"""
+    artists, albums, singles, lives, cloud = layout_counts(n_files)
+    artist_names = [f"歌手{a:03d}" for a in range(artists)]
+    for name in artist_names:
+        os.makedirs(os.path.join(root, name))
+
+    for i in range(0, albums, ALBUM_SIZE):
+        a = i // ALBUM_SIZE
+        artist = artist_names[a % artists]
+        album_dir = os.path.join(root, artist, f"{2000 + a % 25}.{a % 12 + 1:02d}.{a % 28 + 1:02d}_Album_专辑{a}[FLAC]")
+        os.makedirs(album_dir)
+        touch(os.path.join(album_dir, "cover.jpg"))
+        for t in range(min(ALBUM_SIZE, albums - i)):
+            touch(os.path.join(album_dir, f"{t + 1:03d}.曲目{a}-{t}.flac"))
+
+    for s in range(singles):
+        artist = artist_names[s % artists]
+        single_dir = os.path.join(root, artist, "单曲", f"{2000 + s % 25}.{s % 12 + 1:02d}.01_Single_单曲{s}")
+        os.makedirs(single_dir)
+        touch(os.path.join(single_dir, f"单曲{s}.flac"))
+
+    for v in range(lives):
+        live_dir = os.path.join(root, artist_names[v % artists], "演唱会")
+        os.makedirs(live_dir, exist_ok=True)
+        touch(os.path.join(live_dir, f"{2000 + v % 25}.{v % 12 + 1:02d}.01-演唱会{v}.mp4"))
+
+    cloud_subdirs = max(1, cloud // 500)
+    for c in range(cloud):
+        sub = os.path.join(root, "CloudMusic", f"列表{c % cloud_subdirs:03d}")
+        os.makedirs(sub, exist_ok=True)
+        touch(os.path.join(sub, f"{artist_names[c % artists]}-歌曲{c}_{SOURCES[c % len(SOURCES)]}.mp3"))
+    return artist_names
+
+def run_phase(name, func, results, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    with FsCallCounter() as counter, open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        t0 = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - t0
+    phase = {"seconds": elapsed, "syscalls": counter.counts,
+             "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    if trace_memory:
+        phase["peak_alloc_mb"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    results[name] = phase
+    return value
+
+def bench_size(tmp_root, n_files, trace_memory):
+    workdir = tempfile.mkdtemp(prefix=f"bench_lib_{n_files}_", dir=tmp_root)
+    music = os.path.join(workdir, "Music")
+    code_dir = os.path.join(workdir, "Code")
+    os.makedirs(code_dir)
+    cwd = os.getcwd()
+    try:
+        t0 = time.perf_counter()
+        artist_names = build_library(music, n_files)
+        build_seconds = time.perf_counter() - t0
+        os.chdir(code_dir)  # 输出写入 workdir/List
+
+        results = {}
+        folders = [os.path.join(music, a) for a in artist_names]
+        all_tracks = run_phase("scan", lambda: [Collect.scan_artist_folder(f) for f in folders],
+                               results, trace_memory)
+        csv_paths = run_phase("csv", lambda: [Collect.generate_csv(t, f, "All", policy="accept")
+                                              for t, f in zip(all_tracks, folders)], results, trace_memory)
+        run_phase("readme", lambda: [Collect.csv_to_markdown_grouped(p) for p in csv_paths],
+                  results, trace_memory)
+        summary_csv = run_phase("summary", lambda: Collect.scan_and_export_summary(
+            os.path.join(music, "CloudMusic"), policy="accept"), results, trace_memory)
+        run_phase("summary_md", lambda: Collect.summary_csv_to_markdown(summary_csv), results, trace_memory)
+
+        tracks = sum(len(t) for t in all_tracks)
+        return {"files": n_files, "artists": len(artist_names), "tracks": tracks,
+                "build_seconds": build_seconds, "phases": results}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HEADS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_table(report):
+    print(f"提交: {report['revision']}")
+    for size in report["sizes"]:
+        print(f"\n文件数 {size['files']} (歌手 {size['artists']}，曲目 {size['tracks']}，"
+              f"建库 {size['build_seconds']:.2f}s)")
+        print(f"  {'阶段':<12}{'耗时(s)':>10}{'scandir':>9}{'listdir':>9}{'stat':>9}{'open':>9}{'RSS(MB)':>10}")
+        for name in PHASES:
+            p = size["phases"][name]
+            c = p["syscalls"]
+            print(f"  {name:<12}{p['seconds']:>10.3f}{c['scandir']:>9}{c['listdir']:>9}"
+                  f"{c['stat']:>9}{c['open']:>9}{p['max_rss_mb']:>10.1f}")
+
+def print_compare(report, baseline):
+    """对比两份结果：按 文件数 + 阶段 输出耗时与调用次数比值"""
+    old_sizes = {s["files"]: s for s in baseline["sizes"]}
+    print(f"\n对比 {baseline['revision']} → {report['revision']}")
+    for size in report["sizes"]:
+        old = old_sizes.get(size["files"])
+        if old is None:
+            continue
+        print(f"\n文件数 {size['files']}")
+        for name in PHASES:
+            new_p, old_p = size["phases"][name], old["phases"].get(name)
+            if not old_p:
+                continue
+            ratio = new_p["seconds"] / old_p["seconds"] if old_p["seconds"] else float("inf")
+            calls_new = sum(new_p["syscalls"].values())
+            calls_old = sum(old_p["syscalls"].values())
+            flag = " ⚠️" if ratio > 1.2 else ""
+            print(f"  {name:<12}{old_p['seconds']:>9.3f}s → {new_p['seconds']:>8.3f}s (x{ratio:.2f}){flag}"
+                  f"   调用 {calls_old} → {calls_new}")
+
+def main():
+    parser = argparse.ArgumentParser(description="合成曲库分阶段基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000],
+                        help="合成曲库文件数，可多个 (10 ~ 1000000)")
+    parser.add_argument("--root", default="/dev/shm" if os.path.isdir("/dev/shm") else None,
+                        help="生成曲库的目录，默认 /dev/shm (tmpfs)")
+    parser.add_argument("-o", "--output", help="结果 JSON 输出路径")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="使用 tracemalloc 统计每阶段分配峰值（会明显变慢）")
+    args = parser.parse_args()
+
+    report = {"revision": git_revision(), "python": sys.version.split()[0], "sizes": []}
+    for n in args.sizes:
+        report["sizes"].append(bench_size(args.root, n, args.trace_memory))
+
+    print_table(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+二进制曲库快照基准：在临时 List 目录中生成若干歌手 CSV 与 Summary.csv。
+
+    csv     : 每次都解析 CSV（read_artist_csv / csv.DictReader）
+    pack    : mmap 打开 catalog.pack（含校验和验证），从快照取出同样的记录
+
+分别测量读取全部歌手、只读取一位歌手两种场景；两种做法的结果必须完全一致。
+
+用法：
+    python3 Bench_Packed.py --artists 15 --rows 2000
+    python3 Bench_Packed.py --artists 50 --rows 5000 --cloud 20000 --repeat 5
+"""
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import tempfile
+
+HEADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads')
+sys.path.append(HEADS_DIR)
+
+from Head_Record import RECORD_FIELDS, make_record, read_artist_csv
+from Head_Packed import PackedCatalog, refresh_pack, read_cloud_rows
+
+def synthetic_list(list_dir, n_artists, n_rows, n_cloud, rng):
+    for a in range(n_artists):
+        artist = f"Artist {a:03d}"
+        os.makedirs(os.path.join(list_dir, artist))
+        with open(os.path.join(list_dir, artist, f"{artist}.csv"), "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(RECORD_FIELDS)
+            for i in range(n_rows):
+                date = f"{2000 + i % 25}.{1 + i % 12:02d}.{1 + i % 28:02d}"
+                if rng.random() < 0.8:
+                    writer.writerow(make_record("album", date, f"アルバム {i // 12}", f"{1 + i % 12:03d}", f"曲 {a}-{i}"))
+                else:
+                    writer.writerow(make_record("single", date, "-", "-", f"シングル {a}-{i}"))
+    with open(os.path.join(list_dir, "Summary.csv"), "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Singer", "Name", "From"])
+        for i in range(n_cloud):
+            writer.writerow([f"Singer {i % 200}", f"歌 {i}", f"Source {i % 30}"])
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV 解析 vs mmap 二进制快照")
+    parser.add_argument("--artists", type=int, default=15, help="歌手数 (默认 15)")
+    parser.add_argument("--rows", type=int, default=2000, help="每位歌手的条目数 (默认 2000)")
+    parser.add_argument("--cloud", type=int, default=5000, help="Summary.csv 条目数 (默认 5000)")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快一次 (默认 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as list_dir:
+        synthetic_list(list_dir, args.artists, args.rows, args.cloud, random.Random(0))
+        pack_path = os.path.join(list_dir, ".cache", "catalog.pack")
+        _, build_seconds = timed(lambda: refresh_pack(list_dir, path=pack_path), 1)
+        artists = sorted(a for a in os.listdir(list_dir) if not a.startswith(".") and a != "Summary.csv")
+        csv_of = {a: os.path.join(list_dir, a, f"{a}.csv") for a in artists}
+        summary_csv = os.path.join(list_dir, "Summary.csv")
+
+        def csv_all():
+            return {a: read_artist_csv(csv_of[a]) for a in artists}, read_cloud_rows(summary_csv)
+
+        def pack_all():
+            pack = PackedCatalog.open(pack_path)
+            result = ({a: list(pack.artist_records(a, csv_of[a])) for a in artists},
+                      list(pack.cloud_rows(summary_csv)))
+            pack.close()
+            return result
+
+        one = artists[len(artists) // 2]
+
+        def pack_one():
+            pack = PackedCatalog.open(pack_path)
+            result = list(pack.artist_records(one, csv_of[one]))
+            pack.close()
+            return result
+
+        expected, csv_all_seconds = timed(csv_all, args.repeat)
+        result, pack_all_seconds = timed(pack_all, args.repeat)
+        one_expected, csv_one_seconds = timed(lambda: read_artist_csv(csv_of[one]), args.repeat)
+        one_result, pack_one_seconds = timed(pack_one, args.repeat)
+        if result != expected or one_result != one_expected:
+            print("❌ 快照内容与 CSV 不一致")
+            sys.exit(1)
+
+    total = args.artists * args.rows + args.cloud
+    print(f"{args.artists} 位歌手 × {args.rows} 行 + {args.cloud} 行 CloudMusic，共 {total} 行"
+          f"（快照生成 {build_seconds * 1000:.0f} ms，最快 {args.repeat} 次）")
+    print(f"  {'场景':<12}{'csv(ms)':>10}{'pack(ms)':>10}{'加速比':>9}")
+    print(f"  {'全部歌手':<12}{csv_all_seconds * 1000:>10.1f}{pack_all_seconds * 1000:>10.1f}"
+          f"{csv_all_seconds / pack_all_seconds:>9.2f}")
+    print(f"  {'单个歌手':<12}{csv_one_seconds * 1000:>10.1f}{pack_one_seconds * 1000:>10.1f}"
+          f"{csv_one_seconds / pack_one_seconds:>9.2f}")
+    print("✅ 结果一致")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Partial 模式更新基准：已有 N 行的歌手 CSV 追加少量新条目。
+
+    resort: 旧做法，old_records + 新增 后整表 sort（每次调用重建类型表、逐行解析日期 / 曲号）
+    merge : merge_sorted_records，旧表已有序，新增条目二分插入，排序键只算一次且日期 / 曲号解析有缓存
+
+两种做法的结果必须完全一致。
+
+用法：
+    python3 Bench_PartialMerge.py --rows 5000 --add 5
+    python3 Bench_PartialMerge.py --rows 100000 --add 20 --repeat 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+HEADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads')
+sys.path.append(HEADS_DIR)
+
+from Head_Record import make_record, merge_sorted_records
+
+def baseline_sort_key(r):
+    """改动前的排序键（原样保留，作为对照）"""
+    type_order = {"album": 0, "single": 1, "live": 2}
+    type_rank = type_order.get(r.Type, 3)
+    try:
+        date_rank = tuple(int(x) for x in r.Date.replace("-", ".").split("."))
+    except ValueError:
+        date_rank = (9999, 12, 31)
+    try:
+        track_no_rank = int(r.No) if r.No != '-' else 0
+    except ValueError:
+        track_no_rank = 0
+    return (type_rank, date_rank, track_no_rank, r.Name)
+
+def synthetic_records(n_rows, rng):
+    records = []
+    for i in range(n_rows):
+        kind = rng.random()
+        date = f"{2000 + i % 25}.{1 + i % 12:02d}.{1 + i % 28:02d}"
+        if kind < 0.8:
+            records.append(make_record("album", date, f"Album {i // 12}", f"{1 + i % 12:03d}", f"Song {i}"))
+        elif kind < 0.95:
+            records.append(make_record("single", date, "-", "-", f"Single {i}"))
+        else:
+            records.append(make_record("live", date, "-", "-", f"Live {i}"))
+    return records
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Partial 模式：整表重排 vs 有序归并")
+    parser.add_argument("--rows", type=int, default=5000, help="已有 CSV 行数 (默认 5000)")
+    parser.add_argument("--add", type=int, default=5, help="新增条目数 (默认 5)")
+    parser.add_argument("--repeat", type=int, default=10, help="重复次数，取最快一次 (默认 10)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    old_records = sorted(synthetic_records(args.rows, rng), key=baseline_sort_key)
+    additions = [make_record("single", f"20{rng.randint(10, 24)}.0{rng.randint(1, 9)}.15", "-", "-", f"New {i}")
+                 for i in range(args.add)]
+
+    def resort():
+        final_records = old_records + additions
+        final_records.sort(key=baseline_sort_key)
+        return final_records
+
+    expected, resort_seconds = timed(resort, args.repeat)
+    result, merge_seconds = timed(lambda: merge_sorted_records(old_records, additions), args.repeat)
+    if result != expected:
+        print("❌ 归并结果与整表重排不一致")
+        sys.exit(1)
+
+    print(f"已有 {args.rows} 行，新增 {args.add} 行（最快 {args.repeat} 次）")
+    print(f"  {'做法':<10}{'耗时(ms)':>12}{'加速比':>9}")
+    print(f"  {'resort':<10}{resort_seconds * 1000:>12.3f}{1:>9.2f}")
+    print(f"  {'merge':<10}{merge_seconds * 1000:>12.3f}{resort_seconds / merge_seconds:>9.2f}")
+    print("✅ 结果一致")
+
+if __name__ == "__main__":
+    main()
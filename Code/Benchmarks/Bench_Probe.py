@@ -0,0 +1,178 @@
+"""
+演唱会视频容器头探测基准：在临时目录中按规范逐字节生成几种布局的视频文件
+（媒体数据为稀疏文件，不占磁盘），统计探测耗时、读取字节数与 read 次数，并检查探测结果。
+
+    mp4-faststart : ftyp + moov + mdat（moov 在前）
+    mp4-moov-end  : ftyp + mdat(64 位大小) + moov（moov 在末尾，顶层只读 box 头部后 seek）
+    mp4-mdat-zero : ftyp + mdat(大小为 0) + moov（顶层遍历失败，从末尾有界读取查找 moov）
+    mkv-seekhead  : EBML + Segment(SeekHead, Info, Tracks, Cluster...)
+    mkv-tracks-end: Tracks 位于所有 Cluster 之后，只能经 SeekHead 跳转
+
+最后测量 FileCache 命中时的查询耗时。
+
+用法：
+    python3 Bench_Probe.py --size-gb 4
+"""
+import os
+import sys
+import time
+import struct
+import argparse
+import tempfile
+
+HEADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads')
+sys.path.append(HEADS_DIR)
+
+from Head_Cache import FileCache
+from Head_Probe import probe_stream, probe_video, media_columns
+
+# ---------- MP4 ----------
+def box(kind, payload):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+def full_box(kind, version, payload):
+    return box(kind, struct.pack(">I", version << 24) + payload)
+
+def mvhd(timescale, duration):
+    return full_box(b"mvhd", 0, struct.pack(">IIII", 0, 0, timescale, duration) + b"\0" * 80)
+
+def tkhd(width, height):
+    payload = struct.pack(">IIIII", 0, 0, 1, 0, 0) + b"\0" * 16 + b"\0" * 36 + struct.pack(">II", width << 16, height << 16)
+    return full_box(b"tkhd", 0, payload)
+
+def trak(handler, codec, width=0, height=0, samples=0):
+    hdlr = full_box(b"hdlr", 0, b"\0" * 4 + handler + b"\0" * 12 + b"\0")
+    entry = box(codec, b"\0" * 6 + struct.pack(">H", 1) + b"\0" * 16 + struct.pack(">HH", width, height) + b"\0" * 50)
+    stsd = full_box(b"stsd", 0, struct.pack(">I", 1) + entry)
+    stsz = full_box(b"stsz", 0, struct.pack(">II", 0, samples) + b"\0\0\x10\0" * samples)  # 大采样表，不应被读取
+    minf = box(b"minf", box(b"stbl", stsd + stsz))
+    return box(b"trak", tkhd(width, height) + box(b"mdia", hdlr + minf))
+
+def moov(seconds):
+    return box(b"moov", mvhd(1000, int(seconds * 1000)) + trak(b"vide", b"hvc1", 3840, 2160, 200000)
+               + trak(b"soun", b"mp4a", samples=100000))
+
+def write_mp4(path, layout, media_bytes, seconds):
+    ftyp = box(b"ftyp", b"isom\0\0\2\0isomiso2mp41")
+    with open(path, "wb") as f:
+        f.write(ftyp)
+        if layout == "faststart":
+            f.write(moov(seconds))
+            f.write(struct.pack(">I4sQ", 1, b"mdat", 16 + media_bytes))
+            f.truncate(f.tell() + media_bytes)
+            return
+        f.write(struct.pack(">I4sQ", 1, b"mdat", 16 + media_bytes) if layout == "moov-end"
+                else struct.pack(">I4s", 0, b"mdat"))
+        f.seek(media_bytes, os.SEEK_CUR)
+        f.write(moov(seconds))
+
+# ---------- Matroska ----------
+def ebml_id(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+def ebml_size(n):
+    return (0x01 << 56 | n).to_bytes(8, "big")  # 统一使用 8 字节大小
+
+def element(eid, payload):
+    return ebml_id(eid) + ebml_size(len(payload)) + payload
+
+def uint(eid, value):
+    return element(eid, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+def write_mkv(path, layout, media_bytes, seconds):
+    header = element(0x1A45DFA3, element(0x4282, b"matroska"))
+    info = element(0x1549A966, uint(0x2AD7B1, 1000000) + element(0x4489, struct.pack(">d", seconds * 1000)))
+    video = element(0xAE, uint(0x83, 1) + element(0x86, b"V_MPEGH/ISO/HEVC")
+                    + element(0xE0, uint(0xB0, 1920) + uint(0xBA, 1080)))
+    audio = element(0xAE, uint(0x83, 2) + element(0x86, b"A_FLAC") + element(0x63A2, b"\0" * 4096))
+    tracks = element(0x1654AE6B, video + audio)
+    cluster = ebml_id(0x1F43B675) + ebml_size(media_bytes)
+
+    def seek_head(info_pos, tracks_pos):
+        seeks = [element(0x4DBB, element(0x53AB, ebml_id(eid)) + element(0x53AC, pos.to_bytes(8, "big")))
+                 for eid, pos in ((0x1549A966, info_pos), (0x1654AE6B, tracks_pos))]
+        return element(0x114D9B74, b"".join(seeks))
+
+    head_len = len(seek_head(0, 0))  # SeekPosition 固定 8 字节，长度与偏移值无关
+    if layout == "seekhead":
+        body_head = seek_head(head_len, head_len + len(info)) + info + tracks
+        body_tail = b""
+    else:
+        body_head = seek_head(head_len, head_len + len(info) + len(cluster) + media_bytes) + info
+        body_tail = tracks
+    segment_size = len(body_head) + len(cluster) + media_bytes + len(body_tail)
+    with open(path, "wb") as f:
+        f.write(header + ebml_id(0x18538067) + ebml_size(segment_size) + body_head + cluster)
+        f.seek(media_bytes, os.SEEK_CUR)
+        f.write(body_tail)
+        f.truncate()
+
+# ---------- 统计读取 ----------
+class CountingFile:
+    """包装文件对象，累计 read 次数与字节数"""
+
+    def __init__(self, f):
+        self.f = f
+        self.reads = 0
+        self.bytes = 0
+
+    def read(self, n=-1):
+        data = self.f.read(n)
+        self.reads += 1
+        self.bytes += len(data)
+        return data
+
+    def seek(self, *args):
+        return self.f.seek(*args)
+
+def main():
+    parser = argparse.ArgumentParser(description="演唱会视频容器头探测")
+    parser.add_argument("--size-gb", type=float, default=4, help="每个视频的媒体数据大小 (默认 4 GB，稀疏文件)")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数，取最快一次 (默认 20)")
+    args = parser.parse_args()
+    media_bytes = int(args.size_gb * (1 << 30))
+    seconds = 2 * 3600 + 15 * 60 + 42.6
+
+    cases = [("mp4-faststart", write_mp4, "faststart"), ("mp4-moov-end", write_mp4, "moov-end"),
+             ("mp4-mdat-zero", write_mp4, "mdat-zero"), ("mkv-seekhead", write_mkv, "seekhead"),
+             ("mkv-tracks-end", write_mkv, "tracks-end")]
+    expected = {"mp4": ("2:15:43", "3840x2160", "HEVC/AAC"), "mkv": ("2:15:43", "1920x1080", "HEVC/FLAC")}
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'布局':<16}{'文件大小':>10}{'读取次数':>8}{'读取字节':>10}{'耗时(ms)':>10}  结果")
+        paths = []
+        for name, write, layout in cases:
+            path = os.path.join(tmp, f"{name}.{name[:3]}")
+            write(path, layout, media_bytes, seconds)
+            paths.append(path)
+            size = os.path.getsize(path)
+            best = None
+            for _ in range(args.repeat):
+                with open(path, "rb") as raw:
+                    f = CountingFile(raw)
+                    t0 = time.perf_counter()
+                    info = probe_stream(f, size)
+                    elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            columns = media_columns(info or {})
+            ok = columns == expected[name[:3]]
+            failed |= not ok
+            print(f"{name:<16}{size / (1 << 30):>8.1f}GB{f.reads:>8}{f.bytes:>10}{best * 1000:>10.2f}  "
+                  f"{'✅' if ok else '❌'} {' · '.join(columns)}")
+
+        cache = FileCache("video", path=os.path.join(tmp, "video.json"))
+        for path in paths:
+            cache.put(path, os.stat(path), probe_video(path))
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            for path in paths:
+                cache.get(path, os.stat(path))
+        per_lookup = (time.perf_counter() - t0) / (args.repeat * len(paths))
+        print(f"缓存命中（stat + 查表）：{per_lookup * 1e6:.1f} µs / 文件")
+    if failed:
+        print("❌ 探测结果不正确")
+        sys.exit(1)
+    print("✅ 探测结果正确")
+
+if __name__ == "__main__":
+    main()
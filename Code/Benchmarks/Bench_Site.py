@@ -0,0 +1,125 @@
+"""
+静态网站导出基准：在临时目录中生成若干歌手的记录与 CloudMusic 条目，测量三种场景：
+
+    full       : 首次导出（全部页面 + 搜索索引）
+    noop       : 源数据未变，再次导出（只比较内容哈希）
+    one album  : 一位歌手新增一张专辑后导出（只重新渲染该专辑 / 该歌手 / 首页，搜索索引就地更新）
+
+最后检查增量导出的页面与 --force 完整导出逐字节一致，搜索索引的内容（每个 bigram 命中的文档）一致，
+并且导出的文件与目录对所有用户可读（网站通常由其他用户运行的 Web 服务器提供）。
+
+用法：
+    python3 Bench_Site.py --artists 15 --rows 2000
+    python3 Bench_Site.py --artists 50 --rows 1000 --cloud 20000
+"""
+import os
+import sys
+import json
+import stat
+import time
+import argparse
+import tempfile
+
+HEADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads')
+sys.path.append(HEADS_DIR)
+
+from Head_Record import make_record
+from Head_Site import build_site
+
+def synthetic_catalogs(n_artists, n_rows, n_cloud):
+    catalogs = {}
+    for a in range(n_artists):
+        rows = []
+        for i in range(n_rows):
+            date = f"{2000 + i // 240}.{1 + i // 20 % 12:02d}.01"
+            if i % 5:
+                rows.append(make_record("album", date, f"アルバム {i // 12}", f"{1 + i % 12:03d}", f"曲 {a}-{i}"))
+            else:
+                rows.append(make_record("single", date, "-", "-", f"シングル {a}-{i}"))
+        catalogs[f"Artist {a:03d}"] = rows
+    cloud = [{"Singer": f"Singer {i % 200}", "Name": f"歌 {i}", "From": f"Source {i % 30}"} for i in range(n_cloud)]
+    return catalogs, cloud
+
+def read_pages(root):
+    """搜索索引以外的全部文件"""
+    files = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root)
+            if name != ".manifest.json" and not rel.startswith("search"):
+                with open(path, "rb") as f:
+                    files[rel] = f.read()
+    return files
+
+def read_index(root):
+    """搜索索引的内容：{bigram: 命中文档的有序列表}（增量更新后文档编号可能与完整导出不同）"""
+    search = os.path.join(root, "search")
+    with open(os.path.join(search, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    docs = {}
+    for k in range((meta["docs"] + meta["per_shard"] - 1) // meta["per_shard"]):
+        with open(os.path.join(search, f"d{k}.json"), encoding="utf-8") as f:
+            for i, doc in enumerate(json.load(f)):
+                docs[k * meta["per_shard"] + i] = doc
+    index = {}
+    for k in range(meta["shards"]):
+        with open(os.path.join(search, f"g{k}.json"), encoding="utf-8") as f:
+            for gram, ids in json.load(f).items():
+                index[gram] = sorted(docs[i] for i in ids)
+    return index
+
+def unreadable(root):
+    """其他用户无法读取的文件 / 无法进入的目录"""
+    bad = []
+    for dirpath, dirnames, names in os.walk(root):
+        for name in dirnames:
+            if not os.stat(os.path.join(dirpath, name)).st_mode & stat.S_IXOTH:
+                bad.append(os.path.join(dirpath, name))
+        for name in names:
+            if not os.stat(os.path.join(dirpath, name)).st_mode & stat.S_IROTH:
+                bad.append(os.path.join(dirpath, name))
+    return bad
+
+def timed(func):
+    t0 = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description="静态网站：完整导出 vs 增量导出")
+    parser.add_argument("--artists", type=int, default=15, help="歌手数 (默认 15)")
+    parser.add_argument("--rows", type=int, default=2000, help="每位歌手的条目数 (默认 2000)")
+    parser.add_argument("--cloud", type=int, default=5000, help="CloudMusic 条目数 (默认 5000)")
+    args = parser.parse_args()
+
+    catalogs, cloud = synthetic_catalogs(args.artists, args.rows, args.cloud)
+    with tempfile.TemporaryDirectory() as tmp:
+        site, fresh = os.path.join(tmp, "site"), os.path.join(tmp, "fresh")
+        full, full_seconds = timed(lambda: build_site(site, catalogs, cloud))
+        noop, noop_seconds = timed(lambda: build_site(site, catalogs, cloud))
+
+        artist = sorted(catalogs)[len(catalogs) // 2]
+        catalogs[artist] = catalogs[artist] + [
+            make_record("album", "2030.01.01", "新しいアルバム", f"{i:03d}", f"新曲 {i}") for i in range(1, 13)]
+        one, one_seconds = timed(lambda: build_site(site, catalogs, cloud))
+
+        build_site(fresh, catalogs, cloud, force=True)
+        if read_pages(site) != read_pages(fresh) or read_index(site) != read_index(fresh):
+            print("❌ 增量导出与完整导出不一致")
+            sys.exit(1)
+        bad = unreadable(site) + unreadable(fresh)
+        if bad:
+            print(f"❌ {len(bad)} 个文件其他用户无法读取，例如 {os.path.relpath(bad[0], tmp)}")
+            sys.exit(1)
+
+    total = args.artists * args.rows + args.cloud
+    print(f"{args.artists} 位歌手 × {args.rows} 行 + {args.cloud} 行 CloudMusic，共 {total} 行，{full['pages']} 个页面")
+    print(f"  {'场景':<12}{'耗时(ms)':>10}{'渲染页面':>10}{'写入文件':>10}")
+    for label, result, seconds in (("full", full, full_seconds), ("noop", noop, noop_seconds),
+                                   ("one album", one, one_seconds)):
+        print(f"  {label:<12}{seconds * 1000:>10.1f}{result['rendered']:>10}{result['written']:>10}")
+    print("✅ 增量结果与完整导出一致，导出文件均可被其他用户读取")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Track / Record 内存与耗时基准：对比旧的“每曲目一个 dict”实现与 NamedTuple 实现。
+
+每个实现在独立子进程中运行，分别统计 峰值 RSS 与 各阶段耗时：
+    scan   : 构造扫描结果（模拟 extract_tracks 输出）
+    csv    : generate_csv（读旧 CSV → 差异 → Partial 合并 → 排序 → 写入）
+    readme : csv_to_markdown_grouped
+
+用法：
+    python3 Bench_Track.py                 (默认 500000 条)
+    python3 Bench_Track.py --tracks 100000
+"""
+import os
+import sys
+import csv
+import time
+import json
+import argparse
+import resource
+import tempfile
+import subprocess
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Heads'))
+
+ALBUM_SIZE = 12
+
+def synthetic_layout(n_tracks):
+    """产出 (folder_type, release_date, album_name, track_no, track_name, live_name) 的合成数据"""
+    n_albums = max(1, int(n_tracks * 0.8) // ALBUM_SIZE)
+    count = 0
+    for a in range(n_albums):
+        date = f"{2000 + a % 25}.{a % 12 + 1:02d}.{a % 28 + 1:02d}"
+        album = f"Album {a}"
+        for i in range(ALBUM_SIZE):
+            yield ('album', date, album, f"{i + 1:03d}", f"Song {a}-{i}", '')
+            count += 1
+    i = 0
+    while count < n_tracks:
+        date = f"{2000 + i % 25}.{i % 12 + 1:02d}.{i % 28 + 1:02d}"
+        if i % 5 == 0:
+            yield ('live', date, '', '', '', f"Live {i}")
+        else:
+            yield ('single', date, '', '', f"Single {i}", '')
+        count += 1
+        i += 1
+
+# ---------- 旧实现（dict + 5 元组集合），用于对照 ----------
+def baseline_scan(n_tracks):
+    tracks = []
+    for folder_type, date, album, no, name, live in synthetic_layout(n_tracks):
+        if folder_type == 'album':
+            tracks.append({'track_no': no, 'track_name': name, 'file_name': f"{no}.{name}.flac",
+                           'folder_type': 'album', 'release_date': date, 'album_name': album})
+        elif folder_type == 'single':
+            tracks.append({'track_no': '', 'track_name': name, 'file_name': f"{name}.flac",
+                           'folder_type': 'single', 'release_date': date, 'album_name': name,
+                           'parent_folder': f"{date}_Single_{name}"})
+        else:
+            tracks.append({'file_name': f"{date}-{live}.mp4", 'folder_type': 'live',
+                           'release_date': date, 'live_name': live})
+    return tracks
+
+def baseline_generate_csv(all_tracks, csv_file):
+    new_records = []
+    for t in all_tracks:
+        Type = t.get('folder_type', '-') or '-'
+        Date = t.get('release_date', '-') or '-'
+        if Type == 'album':
+            Album = t.get('album_name', '-') or '-'
+            No = t.get('track_no', '-') or '-'
+            Name = t.get('track_name', '-') or '-'
+        else:
+            Album = '-'
+            No = '-'
+            Name = (t.get('track_name', '-') if Type == 'single' else t.get('live_name', '-')) or '-'
+        new_records.append({"Type": Type, "Date": Date, "Album": Album, "No": No, "Name": Name})
+
+    old_records = []
+    with open(csv_file, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            old_records.append(row)
+
+    old_set = {(r["Type"], r["Date"], r["Album"], r["No"], r["Name"]) for r in old_records}
+    new_set = {(r["Type"], r["Date"], r["Album"], r["No"], r["Name"]) for r in new_records}
+    added = new_set - old_set
+
+    final_records = old_records + [r for r in new_records
+                                   if (r["Type"], r["Date"], r["Album"], r["No"], r["Name"]) in added]
+
+    def sort_key(r):
+        type_order = {"album": 0, "single": 1, "live": 2}
+        type_rank = type_order.get(r["Type"], 3)
+        try:
+            date_rank = tuple(int(x) for x in r["Date"].replace("-", ".").split("."))
+        except ValueError:
+            date_rank = (9999, 12, 31)
+        try:
+            track_no_rank = int(r["No"]) if r["No"] != '-' else 0
+        except ValueError:
+            track_no_rank = 0
+        return (type_rank, date_rank, track_no_rank, r["Name"])
+
+    final_records.sort(key=sort_key)
+    with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Type', 'Date', 'Album', 'No', 'Name'])
+        for r in final_records:
+            writer.writerow([r["Type"], r["Date"], r["Album"], r["No"], r["Name"]])
+    return csv_file
+
+def baseline_markdown(csv_file, output_md_path):
+    albums = defaultdict(list)
+    singles = []
+    lives = []
+    with open(csv_file, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            if row['Type'] == 'album':
+                albums[(row['Date'], row['Album'])].append((row['No'].zfill(3), row['Name']))
+            elif row['Type'] == 'single':
+                singles.append((row['Date'], row['Name']))
+            elif row['Type'] == 'live':
+                lives.append((row['Date'], row['Name']))
+
+    with open(output_md_path, 'w', encoding='utf-8') as f:
+        f.write("# 🎵 Bench 歌曲列表\n\n")
+        if albums:
+            f.write("## 📀 Albums\n\n")
+            for (date, album_name) in sorted(albums.keys()):
+                f.write(f"### 📁 ({date}) {album_name} \n\n")
+                for no, name in sorted(albums[(date, album_name)], key=lambda x: x[0]):
+                    f.write(f"- **[{no}]** {name}\n")
+                f.write("\n")
+        if singles:
+            f.write("## 🎵 Singles\n\n")
+            for date, name in sorted(singles, key=lambda x: x[0]):
+                f.write(f"- **[{date}]** {name}\n")
+            f.write("\n")
+        if lives:
+            f.write("## 🎤 Lives\n\n")
+            for date, name in sorted(lives, key=lambda x: x[0]):
+                f.write(f"- **[{date or '-'}]** {name}\n")
+            f.write("\n")
+
+# ---------- 新实现（Track / Record） ----------
+def track_scan(n_tracks):
+    from Head_Record import Track, intern
+    tracks = []
+    for folder_type, date, album, no, name, live in synthetic_layout(n_tracks):
+        date = intern(date)
+        if folder_type == 'album':
+            tracks.append(Track('album', date, intern(album), no, name, f"{no}.{name}.flac"))
+        elif folder_type == 'single':
+            tracks.append(Track('single', date, name, '', name, f"{name}.flac",
+                                parent_folder=f"{date}_Single_{name}"))
+        else:
+            tracks.append(Track('live', date, '', '', '', f"{date}-{live}.mp4", live_name=live))
+    return tracks
+
+def write_seed_csv(csv_file, n_tracks):
+    """写入已存在的旧 CSV：包含 99% 的曲目，剩余 1% 作为本次新增"""
+    from Head_Record import Track, track_to_record
+    rows = []
+    for i, (folder_type, date, album, no, name, live) in enumerate(synthetic_layout(n_tracks)):
+        if i % 100 == 0:
+            continue
+        rows.append(track_to_record(Track(folder_type, date, album, no, name, '', live_name=live)))
+    with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Type', 'Date', 'Album', 'No', 'Name'])
+        writer.writerows(rows)
+
+def run_variant(variant, n_tracks):
+    """子进程入口：运行一个实现并返回结果 dict"""
+    workdir = tempfile.mkdtemp(prefix="bench_track_")
+    code_dir = os.path.join(workdir, "Code")
+    artist_dir = os.path.join(workdir, "Music", "Bench")
+    list_dir = os.path.join(workdir, "List", "Bench")
+    os.makedirs(code_dir)
+    os.makedirs(list_dir)
+    os.chdir(code_dir)
+    csv_file = os.path.join(list_dir, "Bench.csv")
+    write_seed_csv(csv_file, n_tracks)
+    if variant == "track":
+        import Head_Collect
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    timings = {}
+    t0 = time.perf_counter()
+    if variant == "dict":
+        tracks = baseline_scan(n_tracks)
+    else:
+        tracks = track_scan(n_tracks)
+    timings["scan"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if variant == "dict":
+        baseline_generate_csv(tracks, csv_file)
+    else:
+        Head_Collect.generate_csv(tracks, artist_dir, "Partial", policy="accept")
+    timings["csv"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if variant == "dict":
+        baseline_markdown(csv_file, os.path.join(list_dir, "README.md"))
+    else:
+        Head_Collect.csv_to_markdown_grouped(csv_file)
+    timings["readme"] = time.perf_counter() - t0
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"variant": variant, "tracks": n_tracks, "timings": timings,
+            "peak_rss_mb": peak / 1024, "seed_rss_mb": base_rss / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description="Track 记录内存 / 耗时基准")
+    parser.add_argument("--tracks", type=int, default=500000, help="合成曲目数量 (默认 500000)")
+    parser.add_argument("--run", choices=["dict", "track"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # 屏蔽被测函数自身的打印，只输出 JSON 结果
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                result = run_variant(args.run, args.tracks)
+            finally:
+                sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    results = []
+    for variant in ("dict", "track"):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", variant,
+                              "--tracks", str(args.tracks)], capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"曲目数: {args.tracks}")
+    print(f"{'实现':<8}{'scan(s)':>10}{'csv(s)':>10}{'readme(s)':>11}{'总计(s)':>10}{'峰值RSS(MB)':>14}")
+    for r in results:
+        t = r["timings"]
+        print(f"{r['variant']:<8}{t['scan']:>10.2f}{t['csv']:>10.2f}{t['readme']:>11.2f}"
+              f"{sum(t.values()):>10.2f}{r['peak_rss_mb']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,261 @@ import re
 import csv
 from collections import defaultdict
 import sys
+import time
 import argparse
-import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), './Heads'))
 import Heads.Head_Collect as Collect
 
+SUBCOMMANDS = ("search", "plan", "apply", "snapshot", "compare", "dupes", "match", "stats", "html")
+
+def format_search_result(r):
+    """单条搜索结果的显示格式"""
+    if r["Kind"] == "cloud":
+        return f"☁️ [cloud] {r['Artist']} · {r['Name']} （{r['Album']}）"
+    if r["Type"] == "album":
+        return f"🎵 [album] {r['Artist']} · ({r['Date']}) {r['Album']} · [{r['No']}] {r['Name']}"
+    return f"🎵 [{r['Type']}] {r['Artist']} · [{r['Date']}] {r['Name']}"
+
+def search_main(argv):
+    """search 子命令：在搜索索引中跨歌手检索曲名 / 专辑 / CloudMusic 歌手与来源"""
+    parser = argparse.ArgumentParser(prog="Collect.py search", description="跨歌手检索曲目")
+    parser.add_argument("query", nargs="+", help="检索词，多个词需全部命中（支持中日文子串）")
+    parser.add_argument("-n", "--limit", type=int, default=50, help="最多显示条数 (默认 50)")
+    parser.add_argument("--type", nargs="+", choices=["album", "single", "live", "cloud"],
+                        help="只显示指定类型")
+    parser.add_argument("--artist", help="只查指定歌手")
+    parser.add_argument("--rebuild", action="store_true", help="检索前从 List 下的 CSV 重建索引")
+    parser.add_argument("--index", metavar="PATH", help="索引路径 (默认 List/.cache/search.sqlite3)")
+    args = parser.parse_args(argv)
+
+    index = Collect.open_search_index(args.index)
+    if args.rebuild:
+        index.rebuild(os.path.abspath(os.path.join(os.getcwd(), "..", "List")))
+    t0 = time.perf_counter()
+    results = index.search(" ".join(args.query), limit=args.limit, types=args.type, artist=args.artist)
+    elapsed = (time.perf_counter() - t0) * 1000
+    for r in results:
+        print(format_search_result(r))
+    print(f"🔎 {len(results)} 条结果 ({elapsed:.1f} ms)")
+    index.close()
+
+def add_shared_args(parser):
+    """主命令与 plan / apply 子命令共用的参数"""
+    parser.add_argument("--profile", action="store_true",
+                    help="统计各阶段耗时、文件系统调用次数、读写记录数与写入字节数")
+    parser.add_argument("--profile-out", metavar="PATH",
+                    help="保存性能数据，*.trace.json 为 Chrome trace 格式，其余为 JSON")
+    parser.add_argument("--cprofile", metavar="PATH",
+                    help="对每位歌手做 cProfile 采样，保存最耗时歌手的 .prof 文件")
+    parser.add_argument("--db", nargs="?", const="", default=None, metavar="PATH",
+                    help="启用 SQLite 曲库，可指定数据库路径")
+    parser.add_argument("--grammar", metavar="PATH",
+                    help="文件名命名规则配置 JSON (默认 List/grammar.json)")
+    parser.add_argument("--no-index", action="store_true",
+                    help="不更新搜索索引")
+    parser.add_argument("--no-pack", action="store_true",
+                    help="不使用 / 不更新二进制曲库快照 (List/.cache/catalog.pack)，始终读取 CSV")
+
+def start_run(args, dry_run=False):
+    """
+    加载命名规则，按参数打开曲库 / 搜索索引 / 性能统计，返回 (catalog, search_index, profiler)。
+    dry_run: plan / --policy dry-run 不写任何 CSV / README，也不打开（首次使用时会建立的）搜索索引
+    """
+    try:
+        Collect.set_grammar_book(Collect.load_grammar_book(args.grammar))
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+    catalog = Collect.Catalog(args.db or None) if args.db is not None else None
+    Collect.set_stream_diff(getattr(args, "stream_diff", None))
+    Collect.set_cloud_links(Collect.CloudLinks.load())
+    Collect.set_packed_catalog(not args.no_pack)
+    Collect.set_video_probe(getattr(args, "probe", False))
+    search_index = None
+    if not args.no_index and not dry_run:
+        search_index = Collect.open_search_index()
+        Collect.set_search_index(search_index)
+    profiler = None
+    if args.profile or args.profile_out or args.cprofile:
+        profiler = Collect.Profiler(cprofile=bool(args.cprofile))
+        Collect.set_profiler(profiler)
+    return catalog, search_index, profiler
+
+def finish_run(args, search_index, profiler, dry_run=False):
+    if not dry_run:
+        Collect.refresh_packed_catalog()
+    Collect.set_packed_catalog(False)
+    Collect.set_video_probe(False)
+    if profiler is not None:
+        Collect.set_profiler(None)
+        profiler.print_summary()
+        if args.profile_out:
+            profiler.save(args.profile_out)
+        if args.cprofile:
+            profiler.dump_cprofile(args.cprofile)
+
+    if search_index is not None:
+        Collect.set_search_index(None)
+        search_index.close()
+
+    print("✅ 完成")
+
+def plan_main(argv):
+    """plan 子命令：扫描曲库并写出变更集，不写任何 CSV / README"""
+    parser = argparse.ArgumentParser(prog="Collect.py plan", description="扫描曲库，生成待审核的变更集 (JSON Lines)")
+    parser.add_argument("path", help="音乐根目录（每个子目录为一个歌手，CloudMusic 一并处理）")
+    parser.add_argument("-m", "--mode", choices=["All", "Partial"], default="Partial",
+                        help="CSV 更新模式: All=应用新增与删除, Partial=只应用新增 (默认)")
+    parser.add_argument("-o", "--output", metavar="PATH", help="变更集路径 (默认 List/.cache/changeset.jsonl)")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="并发线程数 (默认 4)")
+    parser.add_argument("--no-cache", action="store_true", help="禁用扫描缓存，强制完整扫描")
+    parser.add_argument("--no-cloud", action="store_true", help="不处理 CloudMusic")
+    parser.add_argument("--tags", action="store_true", help="读取内嵌标签")
+    parser.add_argument("--io-limit", type=int, nargs="?", const=Collect.DEFAULT_IO_LIMIT, default=None,
+                        metavar="N", help="异步扫描，每个挂载点并发 N 个调用")
+    parser.add_argument("--stream-diff", type=int, nargs="?", const=Collect.SPILL_ROWS, default=None,
+                        metavar="ROWS", help="流式差异，外部排序每 ROWS 行溢出到临时文件")
+    add_shared_args(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.path):
+        print(f"❌ 错误: 路径 {args.path} 不存在或不是目录")
+        sys.exit(1)
+    catalog, search_index, profiler = start_run(args, dry_run=True)
+    Collect.plan_library(args.path, scan_mode=args.mode, out_path=args.output, workers=args.jobs,
+                         use_cache=not args.no_cache, catalog=catalog, use_tags=args.tags,
+                         io_limit=args.io_limit, include_cloud=not args.no_cloud)
+    finish_run(args, search_index, profiler, dry_run=True)
+
+def apply_main(argv):
+    """apply 子命令：按审核后的变更集写入受影响的 CSV / README，不重新扫描"""
+    parser = argparse.ArgumentParser(prog="Collect.py apply", description="应用 plan 生成的变更集")
+    parser.add_argument("changeset", nargs="?", help="变更集路径 (默认 List/.cache/changeset.jsonl)")
+    parser.add_argument("--force", action="store_true", help="plan 之后 CSV 被改动过也仍然应用")
+    add_shared_args(parser)
+    args = parser.parse_args(argv)
+
+    catalog, search_index, profiler = start_run(args)
+    try:
+        Collect.apply_changeset(args.changeset, catalog=catalog, force=args.force)
+    except (OSError, ValueError) as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    finish_run(args, search_index, profiler)
+
+def snapshot_main(argv):
+    """snapshot 子命令：为曲库建立 Merkle 快照"""
+    parser = argparse.ArgumentParser(prog="Collect.py snapshot", description="为曲库建立 Merkle 快照（目录名 / 文件大小 / 修改时间）")
+    parser.add_argument("path", help="音乐根目录")
+    parser.add_argument("-o", "--output", metavar="PATH", help="快照路径 (默认 List/.cache/snapshot.json.gz)")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="并发线程数 (默认 4)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.path):
+        print(f"❌ 错误: 路径 {args.path} 不存在或不是目录")
+        sys.exit(1)
+    Collect.snapshot_library(args.path, args.output, workers=args.jobs)
+
+def compare_main(argv):
+    """compare 子命令：比较两个快照 / 曲库副本，只进入哈希不同的子树"""
+    parser = argparse.ArgumentParser(prog="Collect.py compare", description="比较两个曲库副本（快照文件或目录），有差异时退出码为 1")
+    parser.add_argument("a", help="快照文件或音乐根目录 (A)")
+    parser.add_argument("b", help="快照文件或音乐根目录 (B)")
+    parser.add_argument("--ignore-mtime", action="store_true", help="只比较文件名与大小（复制时未保留修改时间）")
+    parser.add_argument("-n", "--limit", type=int, default=200, help="最多显示条数 (默认 200)")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="现场建立快照的并发线程数 (默认 4)")
+    args = parser.parse_args(argv)
+
+    for source in (args.a, args.b):
+        if not os.path.exists(source):
+            print(f"❌ 错误: {source} 不存在")
+            sys.exit(1)
+    try:
+        changes = Collect.compare_libraries(args.a, args.b, ignore_mtime=args.ignore_mtime,
+                                            workers=args.jobs, limit=args.limit)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    sys.exit(1 if changes else 0)
+
+def dupes_main(argv):
+    """dupes 子命令：查找歌手目录与 CloudMusic 中内容完全相同的文件"""
+    parser = argparse.ArgumentParser(prog="Collect.py dupes", description="查找内容完全相同的文件，报告写入 List/Duplicates.md")
+    parser.add_argument("path", help="音乐根目录")
+    parser.add_argument("-o", "--output", metavar="PATH", help="报告路径 (默认 List/Duplicates.md)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 4, help="哈希进程数 (默认 CPU 核数)")
+    parser.add_argument("--no-cache", action="store_true", help="不使用扫描缓存与哈希缓存")
+    parser.add_argument("--min-size", type=int, default=1, metavar="BYTES", help="忽略小于该大小的文件 (默认 1)")
+    parser.add_argument("--grammar", metavar="PATH", help="文件名命名规则配置 JSON (默认 List/grammar.json)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.path):
+        print(f"❌ 错误: 路径 {args.path} 不存在或不是目录")
+        sys.exit(1)
+    try:
+        Collect.set_grammar_book(Collect.load_grammar_book(args.grammar))
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    Collect.find_duplicates(args.path, args.output, workers=args.jobs, use_cache=not args.no_cache,
+                            min_size=args.min_size)
+
+def match_main(argv):
+    """match 子命令：CloudMusic 条目与歌手曲目交叉匹配，生成覆盖报告并标注 README"""
+    parser = argparse.ArgumentParser(prog="Collect.py match",
+                                     description="将 Summary.csv 与各歌手 CSV 交叉匹配，生成 List/Coverage.md 并在 README 中标注")
+    parser.add_argument("--min-score", type=float, default=Collect.MIN_SCORE,
+                        help=f"近似匹配的最低相似度 0~1 (默认 {Collect.MIN_SCORE})")
+    parser.add_argument("--clear", action="store_true", help="删除匹配结果，README 恢复为不带标注")
+    args = parser.parse_args(argv)
+
+    Collect.set_packed_catalog()
+    try:
+        Collect.match_library(min_score=args.min_score, clear=args.clear)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    print("✅ 完成")
+
+def stats_main(argv):
+    """stats 子命令：列式读取全部 CSV，计算曲库统计并写入 List/README.md"""
+    parser = argparse.ArgumentParser(prog="Collect.py stats",
+                                     description="统计年份分布、专辑曲目数与 CloudMusic 来源，写入 List/README.md 的统计分区")
+    parser.add_argument("--top", type=int, default=10, help="列出的 CloudMusic 来源数 (默认 10)")
+    args = parser.parse_args(argv)
+
+    try:
+        Collect.write_library_stats(top_sources=args.top)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    print("✅ 完成")
+
+def html_main(argv):
+    """html 子命令：导出静态网站（每位歌手 / 每张专辑一页 + 浏览器端分片搜索索引），增量更新"""
+    parser = argparse.ArgumentParser(prog="Collect.py html",
+                                     description="由 List 下的 CSV 生成静态网站，只重新生成源数据变化的页面")
+    parser.add_argument("-o", "--output", metavar="DIR", help="输出目录 (默认 List/site)")
+    parser.add_argument("--force", action="store_true", help="忽略 .manifest.json，重新生成全部页面")
+    args = parser.parse_args(argv)
+
+    Collect.set_cloud_links(Collect.CloudLinks.load())
+    Collect.set_packed_catalog()
+    try:
+        Collect.export_site(args.output, force=args.force)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    print("✅ 完成")
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        command = {"search": search_main, "plan": plan_main, "apply": apply_main,
+                   "snapshot": snapshot_main, "compare": compare_main, "dupes": dupes_main,
+                   "match": match_main, "stats": stats_main, "html": html_main}[sys.argv[1]]
+        return command(sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         description="音乐文件夹处理工具",
         formatter_class=argparse.RawTextHelpFormatter,  
@@ -16,44 +265,153 @@ def main():
         1) 模式 S：整理单个歌手
             python3 Collect.py -s "/mnt/e/Music/milet" (最佳条目)
             python3 Collect.py -s "/mnt/e/Music/milet" -m All (强制重新生成)
+            python3 Collect.py -s "/mnt/e/Music/milet" "/mnt/nas/Music/milet" (同一歌手分散在多个根目录)
 
         2) 模式 A：整理多个歌手（目录下每个子目录为一个歌手）
             python3 Collect.py -s "/mnt/e/Music" -a (最佳条目)
             python3 Collect.py -s "/mnt/e/Music" -a -m All (强制重新生成)
+            python3 Collect.py "/mnt/e/Music" -a --policy accept -j 8 (非交互批量处理)
+            python3 Collect.py "/mnt/e/Music" -a --policy dry-run (只报告差异)
+            python3 Collect.py "/mnt/e/Music" -a --watch (常驻监听，自动更新变化的歌手)
+            python3 Collect.py "/mnt/e/Music" -a --db (使用 SQLite 曲库，CSV 由曲库导出)
+            python3 Collect.py "/mnt/e/Music" "/mnt/f/Music" "/mnt/nas/Music" -a --policy accept --device-limit /mnt/nas=4
+                (多个根目录：同名歌手合并到同一个 List/<歌手>，各设备并发扫描，NAS 并发 4)
+
+        3) 模式 C：整理 CloudMusic 目录（生成 List/Summary.csv 与 List/README.md）
+            python3 Collect.py "/mnt/e/Music" -c (逐项确认差异)
+            python3 Collect.py "/mnt/e/Music" -c --policy accept -j 8 (非交互，8 线程并行扫描子目录)
+
+        4) 搜索：跨歌手检索曲名 / 专辑 / CloudMusic 歌手与来源
+            python3 Collect.py search 晴天
+            python3 Collect.py search inside --type album --artist milet
+
+        5) 两阶段更新：plan 扫描并生成变更集（可无人值守运行），审核后 apply 秒级写入
+            python3 Collect.py plan "/mnt/e/Music" -m All -o changes.jsonl
+            python3 Collect.py apply changes.jsonl (删除变更集中不想应用的行后再执行)
 
-        3) 模式 C：整理 CloudMusic 目录
-            TBD
+        6) 副本比较：为 NAS 曲库建立快照，与本地副本比较（只进入哈希不同的目录）
+            python3 Collect.py snapshot "/mnt/nas/Music" -o nas.json.gz
+            python3 Collect.py compare nas.json.gz "/mnt/e/Music" (--ignore-mtime 只比较大小)
+
+        7) 重复文件：大小 → 首尾哈希 → 全文哈希，报告写入 List/Duplicates.md
+            python3 Collect.py dupes "/mnt/e/Music" -j 8
+
+        8) CloudMusic 覆盖：哪些 CloudMusic 曲目已有专辑 / 单曲收录，报告写入 List/Coverage.md，
+           README 中标注对应条目（之后的运行沿用匹配结果，CSV 变化后重新运行 match 刷新）
+            python3 Collect.py match
+
+        9) 曲库统计：按年份的专辑 / 单曲 / 演唱会数、专辑曲目数分布、CloudMusic 来源，
+           写入 List/README.md 的统计分区（模式 C 重新生成 README 时保留，重新运行 stats 刷新）
+            python3 Collect.py stats
+
+        10) 静态网站：每位歌手 / 每张专辑一页，CloudMusic 每位歌手一页，首页可在浏览器中检索，
+            输出到 List/site（只重新生成源数据变化的页面；需通过 HTTP 访问，如 python3 -m http.server）
+            python3 Collect.py html
+            python3 Collect.py html -o /var/www/music --force
 
         说明：
         -s / -a / -c 只能三选一
         -m All     覆盖 CSV
         -m Partial 只追加，不覆盖（默认）
+        --policy   模式 A / C 的决策策略：ask=逐个询问（默认）, accept=全部接受,
+                   keep=拒绝删除只追加, dry-run=只报告不写入
+        -j         非交互批量模式的并发线程数；模式 C 并行扫描子目录的线程数
+        --no-cache 忽略 List/.cache 扫描缓存 / CloudMusic 子目录清单，重新完整扫描
+        模式 C 只重新扫描签名变化的子目录，差异只在这些子目录上计算，
+                   README 只重新生成条目有变化的歌手分区
+        --watch    模式 A 常驻监听 (inotify，不可用时轮询)，只更新变化的歌手 / CloudMusic
+        --tags     读取 FLAC / MP3 内嵌标签覆盖文件名解析出的曲名、编号、专辑、日期
+        --probe    读取演唱会视频的容器头 (MP4 moov / Matroska Info、Tracks，不读媒体数据)，
+                   CSV 末尾增加 Duration / Resolution / Codec 列，README 的 Lives 中标注；
+                   结果按 (路径, mtime, 大小) 缓存于 List/.cache/video.json，之后不带 --probe 运行时保留这些列
+        --profile  打印各阶段 / 各歌手的耗时、文件系统调用、读写记录数统计表
+                   --profile-out 保存为 JSON（*.trace.json 为 Chrome trace 格式）
+                   --cprofile    保存最耗时歌手的 cProfile 数据
+        --db       启用 SQLite 曲库 (默认 List/.cache/catalog.sqlite3)，首次使用时导入已有 CSV
+        --grammar  文件名命名规则配置 (默认 List/grammar.json，不存在时只用内置规则)，
+                   可为每位歌手追加正则规则；未匹配任何规则的文件会在结束时列出
+        --no-index 不更新搜索索引 (默认 CSV 写入后增量更新 List/.cache/search.sqlite3)
+        --io-limit 使用异步扫描器 (模式 S / 非交互模式 A)：各专辑、各歌手的目录读取重叠进行，
+                   N 为每个挂载点同时在途的文件系统调用数，适合 /mnt/e (drvfs)、NAS 等高延迟挂载点
+        多个根目录 模式 S / A 可给出多个路径，同名歌手目录合并为一份 CSV，末尾的 Root 列记录每行来自哪个根目录
+                   (同一条目在多个根目录上时以 | 分隔；CSV 一旦带 Root 列，之后单根目录运行也会保留)；
+                   非交互模式 A 默认使用异步扫描，每个挂载点独立限流，慢速 NAS 不会拖住本地磁盘
+        --device-limit PATH=N 为 PATH 所在挂载点单独设置异步扫描并发数 (可重复)
+        --stream-diff 超大曲库：新扫描结果外部排序后与已有 CSV 逐行 merge-join，只在内存中保存差异
+                   (临时文件位于 List/.cache；--db 曲库模式下差异仍由 SQLite 计算)
         """
     )
-    parser.add_argument("path", help="音乐文件夹路径")
+    parser.add_argument("path", nargs="+", help="音乐文件夹路径（模式 S / A 可给出多个根目录）")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("-s", action="store_true", help="启动模式 S，整理单个歌手")
     group.add_argument("-a", action="store_true", help="启动模式 A，整理所有歌手")
     group.add_argument("-c", action="store_true", help="启动模式 C，整理CloudMusic")
     parser.add_argument("-m", "--mode", choices=["All", "Partial"], default="Partial",
                     help="CSV 更新模式: All=完整覆盖, Partial=只新增条目 (默认)")
+    parser.add_argument("--policy", choices=Collect.DECISION_POLICIES, default="ask",
+                    help="模式 A 决策策略: ask=交互询问 (默认), accept / keep / dry-run 为非交互批量处理")
+    parser.add_argument("-j", "--jobs", type=int, default=4,
+                    help="批量模式并发线程数 (默认 4)")
+    parser.add_argument("--no-cache", action="store_true",
+                    help="禁用 List/.cache 下的增量扫描缓存，强制完整扫描")
+    parser.add_argument("--watch", action="store_true",
+                    help="模式 A 监听模式：文件变化后自动更新对应歌手的 CSV / README")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                    help="监听模式事件合并窗口，单位秒 (默认 2)")
+    parser.add_argument("--poll", type=float, default=None, metavar="SECONDS",
+                    help="监听模式强制使用轮询，并指定轮询间隔秒数")
+    parser.add_argument("--tags", action="store_true",
+                    help="读取内嵌标签 (FLAC Vorbis / ID3v2)，文件名解析作为后备")
+    parser.add_argument("--probe", action="store_true",
+                    help="读取演唱会视频的容器头 (MP4 / Matroska)，在 CSV 与 README 中记录时长、分辨率、编码")
+    parser.add_argument("--io-limit", type=int, nargs="?", const=Collect.DEFAULT_IO_LIMIT, default=None,
+                    metavar="N", help=f"异步扫描，每个挂载点并发 N 个调用 (默认 {Collect.DEFAULT_IO_LIMIT})")
+    parser.add_argument("--device-limit", action="append", default=[], metavar="PATH=N",
+                    help="为 PATH 所在挂载点单独设置异步扫描并发数，可重复 (例如 --device-limit /mnt/nas=4)")
+    parser.add_argument("--stream-diff", type=int, nargs="?", const=Collect.SPILL_ROWS, default=None,
+                    metavar="ROWS", help=f"流式差异：内存与曲库规模无关，外部排序每 ROWS 行溢出到临时文件 (默认 {Collect.SPILL_ROWS})")
+    add_shared_args(parser)
 
     args = parser.parse_args()
-    base_folder = args.path
+    roots = args.path
+    base_folder = roots[0] if len(roots) == 1 else roots
     scan_mode = args.mode
 
-    if not os.path.isdir(base_folder):
-        print(f"❌ 错误: 路径 {base_folder} 不存在或不是目录")
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"❌ 错误: 路径 {root} 不存在或不是目录")
+            sys.exit(1)
+    if len(roots) > 1 and (args.c or args.watch):
+        print("❌ 错误: 模式 C 与监听模式只支持一个根目录")
         sys.exit(1)
+    device_limits = {}
+    for item in args.device_limit:
+        path, _, n = item.rpartition("=")
+        if not path or not n.isdigit() or int(n) < 1:
+            print(f"❌ 错误: --device-limit 格式应为 PATH=N: {item}")
+            sys.exit(1)
+        device_limits[path] = int(n)
+
+    dry_run = args.policy == "dry-run" and not args.s
+    catalog, search_index, profiler = start_run(args, dry_run)
 
     if args.s:
-        Collect.mode_s(base_folder, scan_mode=scan_mode)
+        Collect.mode_s(base_folder, scan_mode=scan_mode, use_cache=not args.no_cache, catalog=catalog,
+                       use_tags=args.tags, io_limit=args.io_limit, device_limits=device_limits)
+    elif args.a and args.watch:
+        Collect.mode_watch(base_folder, scan_mode=scan_mode, policy=args.policy,
+                           debounce=args.debounce, poll_interval=args.poll or 5.0,
+                           force_poll=args.poll is not None, use_cache=not args.no_cache,
+                           catalog=catalog, use_tags=args.tags)
     elif args.a:
-        Collect.mode_a(base_folder, scan_mode=scan_mode)
+        Collect.mode_a(base_folder, scan_mode=scan_mode, policy=args.policy, workers=args.jobs,
+                       use_cache=not args.no_cache, catalog=catalog, use_tags=args.tags,
+                       io_limit=args.io_limit, device_limits=device_limits)
     elif args.c:
-        Collect.mode_c(base_folder)
+        Collect.mode_c(base_folder, policy=args.policy, catalog=catalog, use_cache=not args.no_cache,
+                       workers=args.jobs)
 
-    print("✅ 完成")
+    finish_run(args, search_index, profiler, dry_run)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import os
+import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# 每个挂载点默认同时进行的文件系统调用数
+DEFAULT_IO_LIMIT = 16
+
+_OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+def read_mount_points():
+    """读取 /proc/mounts 中的挂载点（最长的在前），不可用时返回 ['/']"""
+    points = []
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2:
+                    # /proc/mounts 中空格、制表符等以 \040 形式的八进制转义
+                    points.append(_OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), fields[1]))
+    except OSError:
+        pass
+    if "/" not in points:
+        points.append("/")
+    return sorted(set(points), key=len, reverse=True)
+
+class AsyncFs:
+    """
+    异步文件系统调用：阻塞调用放到线程池执行，
+    每个挂载点一个信号量，限制同时在途的调用数（drvfs / NAS 上每次调用都有毫秒级延迟，
+    重叠执行可以隐藏延迟，但过多并发会压垮远端）。
+    挂载点按路径前缀匹配 /proc/mounts，不额外产生 stat 调用。
+    roots 为本次要扫描的根目录；limits 为可选的 {路径: 并发数}，为该路径所在的挂载点单独设置上限
+    （例如 NAS 设得较低、本地 SSD 较高）。线程池大小 = 涉及的各挂载点上限之和，
+    慢设备占满自己的配额时，其余设备的调用仍有空闲线程可用。
+    需在事件循环内以 with 使用。
+    """
+
+    def __init__(self, roots, limit=DEFAULT_IO_LIMIT, limits=None):
+        self.limit = limit
+        self.mount_points = read_mount_points()
+        self.limits = {self.mount_of(path): n for path, n in (limits or {}).items()}
+        self._semaphores = {}
+        mounts = {self.mount_of(p) for p in roots}
+        self.executor = ThreadPoolExecutor(max_workers=max(1, sum(self.limit_of(m) for m in mounts)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown(wait=True)
+
+    def mount_of(self, path):
+        path = os.path.abspath(path)
+        for point in self.mount_points:
+            if point == "/" or path == point or path.startswith(point + os.sep):
+                return point
+        return "/"
+
+    def limit_of(self, mount):
+        return self.limits.get(mount, self.limit)
+
+    def _semaphore(self, path):
+        mount = self.mount_of(path)
+        sem = self._semaphores.get(mount)
+        if sem is None:
+            sem = self._semaphores[mount] = asyncio.Semaphore(self.limit_of(mount))
+        return sem
+
+    async def run(self, path, func, *args):
+        """在 path 所在挂载点的并发限制下，于线程池中执行 func(*args)"""
+        async with self._semaphore(path):
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
@@ -0,0 +1,230 @@
+import os
+import json
+import threading
+
+CACHE_VERSION = 4
+FILE_CACHE_VERSION = 1
+
+def default_cache_dir():
+    """缓存目录：与 CSV 输出一致，位于 ../List/.cache"""
+    return os.path.abspath(os.path.join(os.getcwd(), "..", "List", ".cache"))
+
+def dir_signature(path):
+    """目录签名 (mtime_ns, size, inode)；目录内增删改名都会改变 mtime"""
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+class ScanCache:
+    """
+    扫描清单缓存：记录每个目录的签名以及上次解析出的结果。
+    - dirs  : 容器目录（歌手目录、单曲目录）下的子目录名
+    - tracks: 叶子目录（专辑、单曲子目录、演唱会）解析出的 Track（JSON 中保存为列表）
+    - unmatched: 叶子目录中未匹配命名规则的 [类别, 名称]，命中缓存时仍可报告
+    签名未变化的目录直接复用缓存结果，不再 os.listdir。
+    salt 为命名规则指纹，规则变化后对应条目视为失效。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_cache_dir(), "scan_manifest.json")
+        self.folders = {}
+        self.hits = 0
+        self.misses = 0
+        self._roots = set()
+        self._touched = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=None):
+        cache = cls(path)
+        if os.path.exists(cache.path):
+            try:
+                with open(cache.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    cache.folders = data.get("folders", {})
+            except (OSError, ValueError):
+                print(f"⚠️ 扫描缓存损坏，忽略: {cache.path}")
+        return cache
+
+    def add_root(self, folder_path):
+        """登记本次扫描的根目录，保存时清理其下已消失的目录条目"""
+        with self._lock:
+            self._roots.add(os.path.abspath(folder_path))
+
+    def lookup(self, folder_path, salt=None):
+        """返回 (entry, signature)；签名或 salt 不一致时 entry 为 None"""
+        key = os.path.abspath(folder_path)
+        sig = dir_signature(key)
+        with self._lock:
+            self._touched.add(key)
+            entry = self.folders.get(key)
+            if entry is not None and entry.get("sig") == sig and entry.get("salt") == salt:
+                self.hits += 1
+                return entry, sig
+            self.misses += 1
+        return None, sig
+
+    def store(self, folder_path, sig, dirs=None, tracks=None, salt=None, unmatched=None):
+        entry = {"sig": sig}
+        if salt is not None:
+            entry["salt"] = salt
+        if dirs is not None:
+            entry["dirs"] = dirs
+        if tracks is not None:
+            entry["tracks"] = tracks
+        if unmatched:
+            entry["unmatched"] = unmatched
+        with self._lock:
+            self.folders[os.path.abspath(folder_path)] = entry
+
+    def save(self):
+        with self._lock:
+            for key in list(self.folders):
+                if key in self._touched:
+                    continue
+                if any(key == root or key.startswith(root + os.sep) for root in self._roots):
+                    del self.folders[key]
+            data = {"version": CACHE_VERSION, "folders": self.folders}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return f"📦 扫描缓存：命中 {self.hits} 个目录，未命中 {self.misses} 个目录"
+
+class FileCache:
+    """
+    按文件 (path, mtime_ns, size) 缓存的通用结果表（标签、哈希、视频信息等）。
+    文件被修改后 mtime / size 变化，缓存自动失效。
+    """
+
+    def __init__(self, name, path=None):
+        self.path = path or os.path.join(default_cache_dir(), f"{name}.json")
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, name, path=None):
+        cache = cls(name, path)
+        if os.path.exists(cache.path):
+            try:
+                with open(cache.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == FILE_CACHE_VERSION:
+                    cache.entries = data.get("files", {})
+            except (OSError, ValueError):
+                print(f"⚠️ 缓存损坏，忽略: {cache.path}")
+        return cache
+
+    def get(self, path, st):
+        """st 为 os.stat 结果；命中返回缓存值，否则返回 None"""
+        entry = self.entries.get(path)
+        with self._lock:
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        return None
+
+    def put(self, path, st, value):
+        with self._lock:
+            self.entries[path] = [st.st_mtime_ns, st.st_size, value]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": FILE_CACHE_VERSION, "files": self.entries}
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def summary(self, label):
+        return f"📦 {label}缓存：命中 {self.hits} 个文件，未命中 {self.misses} 个文件"
+
+class CloudManifest:
+    """
+    CloudMusic 子目录清单：记录每个子目录的签名、解析出的 (Singer, Name, From) 和未匹配的文件名，
+    以及上次写入 Summary.csv 后该文件的 (mtime_ns, size)。
+    - 签名未变化的子目录直接复用记录，不再 scandir
+    - Summary.csv 仍与清单一致时，差异只在变化的子目录上计算，无需读取整个 Summary.csv
+    salt 为命名规则指纹，规则变化后整个清单失效。
+    """
+
+    def __init__(self, path=None, salt=None):
+        self.path = path or os.path.join(default_cache_dir(), "cloud_manifest.json")
+        self.salt = salt
+        self.folders = {}
+        self.summary_sig = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, salt=None, path=None):
+        manifest = cls(path, salt)
+        if os.path.exists(manifest.path):
+            try:
+                with open(manifest.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION and data.get("salt") == salt:
+                    manifest.folders = data.get("folders", {})
+                    manifest.summary_sig = data.get("summary_sig")
+            except (OSError, ValueError):
+                print(f"⚠️ CloudMusic 清单损坏，忽略: {manifest.path}")
+        return manifest
+
+    def lookup(self, name, sig):
+        """签名一致时返回该子目录的 entry，否则返回 None"""
+        entry = self.folders.get(name)
+        with self._lock:
+            if entry is not None and entry.get("sig") == sig:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        return None
+
+    def records(self, name):
+        """上次写入时该子目录的记录（元组列表）；清单中没有时返回空列表"""
+        entry = self.folders.get(name)
+        return [tuple(r) for r in entry["records"]] if entry else []
+
+    def matches_summary(self, summary_csv):
+        """Summary.csv 是否仍是清单最后一次写入的版本"""
+        if self.summary_sig is None:
+            return False
+        try:
+            st = os.stat(summary_csv)
+        except OSError:
+            return False
+        return [st.st_mtime_ns, st.st_size] == self.summary_sig
+
+    def update(self, folders, summary_csv):
+        """folders 为 {子目录: {"sig", "records", "unmatched"}}，整体替换并记录 Summary.csv 当前签名"""
+        self.folders = folders
+        try:
+            st = os.stat(summary_csv)
+            self.summary_sig = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            self.summary_sig = None
+
+    def save(self):
+        data = {"version": CACHE_VERSION, "salt": self.salt, "summary_sig": self.summary_sig,
+                "folders": self.folders}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return f"📦 CloudMusic 清单：命中 {self.hits} 个子目录，未命中 {self.misses} 个子目录"
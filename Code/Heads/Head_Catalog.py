@@ -0,0 +1,204 @@
+import os
+import csv
+import sqlite3
+import threading
+
+from Head_Cache import default_cache_dir
+from Head_Output import file_signature
+from Head_Record import RECORD_FIELDS, make_record, read_artist_csv
+
+CLOUD_FIELDS = ["Singer", "Name", "From"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    artist TEXT NOT NULL,
+    pos    INTEGER NOT NULL,
+    type   TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    album  TEXT NOT NULL,
+    no     TEXT NOT NULL,
+    name   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks (artist, pos);
+CREATE INDEX IF NOT EXISTS idx_tracks_type   ON tracks (type);
+CREATE INDEX IF NOT EXISTS idx_tracks_date   ON tracks (date);
+CREATE INDEX IF NOT EXISTS idx_tracks_album  ON tracks (album);
+
+CREATE TABLE IF NOT EXISTS cloud_tracks (
+    pos    INTEGER NOT NULL,
+    singer TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cloud_singer ON cloud_tracks (singer);
+CREATE INDEX IF NOT EXISTS idx_cloud_source ON cloud_tracks (source);
+
+CREATE TABLE IF NOT EXISTS artists (
+    artist TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS csv_files (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL
+);
+"""
+
+def default_catalog_path():
+    return os.path.join(default_cache_dir(), "catalog.sqlite3")
+
+class Catalog:
+    """
+    SQLite 曲库：tracks 保存各歌手条目，cloud_tracks 保存 CloudMusic 汇总。
+    CSV / README 作为曲库的导出视图；差异比较在索引上完成，不再整表解析 CSV。
+    csv_files 记录曲库最近一次导入 / 导出时各 CSV 的签名 (mtime_ns, size)：
+    CSV 在曲库之外被改动（未启用 --db 的运行、手工编辑）后签名不同，下次使用前重新导入。
+    同一连接在线程池中共享，所有操作由锁串行化。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_catalog_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---------- CSV 签名 ----------
+    def csv_stale(self, csv_file):
+        """
+        CSV 与曲库不同步时返回 True：签名与上次导入 / 导出时不同、从未记录，或 CSV 不存在。
+        CSV 存在时应重新导入；不存在时由调用方按曲库中是否有该歌手决定是否重新导出。
+        """
+        signature = file_signature(csv_file)
+        if signature is None:
+            return True
+        with self._lock:
+            row = self.conn.execute("SELECT mtime_ns, size FROM csv_files WHERE path = ?",
+                                    (os.path.abspath(csv_file),)).fetchone()
+        return row is None or list(row) != signature
+
+    def mark_csv(self, csv_file):
+        """记录 CSV 当前签名（导入后、由曲库导出写入后调用）"""
+        signature = file_signature(csv_file)
+        if signature is None:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO csv_files VALUES (?, ?, ?)",
+                              (os.path.abspath(csv_file), *signature))
+
+    # ---------- 歌手曲目 ----------
+    def has_artist(self, artist):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM artists WHERE artist = ?", (artist,)).fetchone()
+        return row is not None
+
+    def artists(self):
+        with self._lock:
+            return [r[0] for r in self.conn.execute("SELECT artist FROM artists ORDER BY artist")]
+
+    def artist_records(self, artist):
+        """按 CSV 顺序返回该歌手的所有条目 (Record)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT type, date, album, no, name FROM tracks WHERE artist = ? ORDER BY pos",
+                (artist,)).fetchall()
+        return [make_record(*row) for row in rows]
+
+    def replace_artist(self, artist, records):
+        """单个事务内批量替换该歌手的所有条目"""
+        rows = [(artist, pos) + tuple(r) for pos, r in enumerate(records)]
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM tracks WHERE artist = ?", (artist,))
+            self.conn.executemany("INSERT INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR IGNORE INTO artists VALUES (?)", (artist,))
+
+    def import_artist_csv(self, artist, csv_file, records=None):
+        """从已有 CSV 初始化曲库（首次启用曲库或 CSV 在曲库之外被改动时使用）；records 为调用方已读出的记录"""
+        self.replace_artist(artist, records if records is not None else read_artist_csv(csv_file))
+        self.mark_csv(csv_file)
+
+    def diff_artist(self, artist, new_records):
+        """返回 (added, removed) 两个元组集合，比较在 SQL 中完成"""
+        rows = [tuple(r) for r in new_records]
+        with self._lock:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS scan_tracks "
+                              "(type TEXT, date TEXT, album TEXT, no TEXT, name TEXT)")
+            self.conn.execute("DELETE FROM scan_tracks")
+            self.conn.executemany("INSERT INTO scan_tracks VALUES (?, ?, ?, ?, ?)", rows)
+            added = set(self.conn.execute(
+                "SELECT type, date, album, no, name FROM scan_tracks "
+                "EXCEPT SELECT type, date, album, no, name FROM tracks WHERE artist = ?", (artist,)))
+            removed = set(self.conn.execute(
+                "SELECT type, date, album, no, name FROM tracks WHERE artist = ? "
+                "EXCEPT SELECT type, date, album, no, name FROM scan_tracks", (artist,)))
+            self.conn.execute("DELETE FROM scan_tracks")
+            self.conn.commit()
+        return added, removed
+
+    def find_tracks(self, name=None, artist=None, type=None, album=None, year=None):
+        """跨歌手查询，各条件可选，name / album 为子串匹配"""
+        sql = "SELECT artist, type, date, album, no, name FROM tracks WHERE 1 = 1"
+        params = []
+        if artist:
+            sql += " AND artist = ?"
+            params.append(artist)
+        if type:
+            sql += " AND type = ?"
+            params.append(type)
+        if year:
+            sql += " AND date LIKE ?"
+            params.append(f"{year}.%")
+        if album:
+            sql += " AND album LIKE ?"
+            params.append(f"%{album}%")
+        if name:
+            sql += " AND name LIKE ?"
+            params.append(f"%{name}%")
+        sql += " ORDER BY artist, pos"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(zip(["Artist"] + RECORD_FIELDS, row)) for row in rows]
+
+    # ---------- CloudMusic 汇总 ----------
+    def has_cloud(self):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM cloud_tracks LIMIT 1").fetchone()
+        return row is not None
+
+    def cloud_records(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT singer, name, source FROM cloud_tracks ORDER BY pos").fetchall()
+        return [dict(zip(CLOUD_FIELDS, row)) for row in rows]
+
+    def replace_cloud(self, records):
+        rows = [(pos, r["Singer"], r["Name"], r["From"]) for pos, r in enumerate(records)]
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM cloud_tracks")
+            self.conn.executemany("INSERT INTO cloud_tracks VALUES (?, ?, ?, ?)", rows)
+
+    def import_cloud_csv(self, csv_file):
+        with open(csv_file, "r", encoding="utf-8-sig") as f:
+            self.replace_cloud(list(csv.DictReader(f)))
+        self.mark_csv(csv_file)
+
+    def diff_cloud(self, new_records):
+        rows = [(r["Singer"], r["Name"], r["From"]) for r in new_records]
+        with self._lock:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS scan_cloud (singer TEXT, name TEXT, source TEXT)")
+            self.conn.execute("DELETE FROM scan_cloud")
+            self.conn.executemany("INSERT INTO scan_cloud VALUES (?, ?, ?)", rows)
+            added = set(self.conn.execute(
+                "SELECT singer, name, source FROM scan_cloud "
+                "EXCEPT SELECT singer, name, source FROM cloud_tracks"))
+            removed = set(self.conn.execute(
+                "SELECT singer, name, source FROM cloud_tracks "
+                "EXCEPT SELECT singer, name, source FROM scan_cloud"))
+            self.conn.execute("DELETE FROM scan_cloud")
+            self.conn.commit()
+        return added, removed
@@ -1,11 +1,323 @@
 import os
 import re
+import io
 import csv
-from collections import defaultdict
+import json
+import time
+from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 import argparse
+import heapq
+import asyncio
+from contextlib import nullcontext, ExitStack
+from itertools import chain
+from Head_Cache import ScanCache, CloudManifest, dir_signature, default_cache_dir
+from Head_Walk import scan_dir, iter_subdirs, iter_files, iter_cloud_files, folder_type_of, CLOUD_FOLDER
+from Head_Watch import watch_library
+from Head_Catalog import Catalog
+from Head_Tags import apply_tags, load_tag_cache
+from Head_Profile import Profiler
+from Head_Record import (Track, RECORD_FIELDS, make_track, make_record, track_to_record, read_artist_csv, intern,
+                         iter_artist_csv, record_sort_key, merge_sorted_records, ROOT_FIELD,
+                         MEDIA_FIELDS, read_artist_header, has_artist_columns, read_artist_table)
+from Head_Output import write_if_changed, file_signature, StreamingWrite
+from Head_Grammar import GrammarBook, load_grammar_book
+from Head_Search import open_search_index
+from Head_AsyncFs import AsyncFs, DEFAULT_IO_LIMIT
+from Head_StreamDiff import SortedSpill, UnsortedInput, stream_diff, collect_diff, SPILL_ROWS
+from Head_Snapshot import build_snapshot, save_snapshot, open_snapshot, diff_trees, layout_label, count_files
+from Head_Dupes import find_duplicate_groups, load_hash_cache
+from Head_Match import CatalogMatcher, CloudLinks, MIN_SCORE, default_links_path
+from Head_Packed import PackedCatalog, refresh_pack
+from Head_Columns import load_library_columns, library_stats, backend as stats_backend
+from Head_Site import build_site
+from Head_Probe import probe_live_tracks, load_video_cache, NO_MEDIA
+
+AUDIO_EXTS = {'.flac', '.mp3', '.wav'}
+VIDEO_EXTS = {'.mp4', '.mkv', '.avi'}
+
+# ---------- 性能统计钩子（Collect.py --profile 或外部脚本通过 set_profiler 启用） ----------
+_profiler = None
+
+def set_profiler(profiler):
+    """设置全局 Profiler（Head_Profile.Profiler），传入 None 关闭统计"""
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+    _profiler = profiler
+    if profiler is not None:
+        profiler.start()
+
+def get_profiler():
+    return _profiler
+
+def profile_phase(name, artist=None):
+    return _profiler.phase(name, artist) if _profiler is not None else nullcontext()
+
+def profile_count(key, n=1):
+    if _profiler is not None:
+        _profiler.count(key, n)
+
+def profile_artist(artist):
+    return _profiler.artist_profile(artist) if _profiler is not None else nullcontext()
+
+# ---------- 搜索索引（Collect.py 默认启用，--no-index 关闭；外部脚本通过 set_search_index 设置） ----------
+_search_index = None
+
+def set_search_index(index):
+    """设置全局搜索索引（Head_Search.SearchIndex），CSV 写入后增量更新；传入 None 关闭"""
+    global _search_index
+    _search_index = index
+
+def get_search_index():
+    return _search_index
+
+# ---------- 命名规则（Collect.py --grammar 或外部脚本通过 set_grammar_book 设置） ----------
+_grammar_book = GrammarBook()
+
+def set_grammar_book(book):
+    """设置全局命名规则配置（Head_Grammar.GrammarBook）"""
+    global _grammar_book
+    _grammar_book = book
+
+def get_grammar(artist=None):
+    """返回歌手适用的命名规则；artist 为 None 时返回默认规则"""
+    return _grammar_book.for_artist(artist) if artist else _grammar_book.default
+
+# ---------- 流式差异（Collect.py --stream-diff 或外部脚本通过 set_stream_diff 启用） ----------
+_stream_spill_rows = None
+
+def set_stream_diff(spill_rows=SPILL_ROWS):
+    """启用流式差异，spill_rows 为外部排序每段的行数；传入 None 关闭（默认，整表读入内存比较）"""
+    global _stream_spill_rows
+    _stream_spill_rows = spill_rows
+
+def get_stream_diff():
+    return _stream_spill_rows
+
+# ---------- CloudMusic ↔ 歌手曲目匹配结果（match 子命令生成，README 标注使用） ----------
+_cloud_links = None
+
+def set_cloud_links(links):
+    """设置全局匹配结果（Head_Match.CloudLinks）；传入 None 时 README 不做标注"""
+    global _cloud_links
+    _cloud_links = links
+
+def get_cloud_links():
+    return _cloud_links
+
+# ---------- 二进制曲库快照（Collect.py 默认启用，--no-pack 关闭；外部脚本通过 set_packed_catalog 启用） ----------
+_packed = None
+_pack_enabled = False
+_pack_updates = {}
+
+def set_packed_catalog(enabled=True):
+    """启用时打开 List/.cache/catalog.pack（不存在或已失效时读者退回 CSV）；传入 False 关闭"""
+    global _packed, _pack_enabled, _pack_updates
+    if _packed is not None:
+        _packed.close()
+    _pack_enabled = enabled
+    _packed = PackedCatalog.open() if enabled else None
+    _pack_updates = {}
+
+def get_packed_catalog():
+    return _packed
+
+def refresh_packed_catalog():
+    """
+    按当前 CSV 重新生成二进制快照：本次写入过的 CSV 直接使用写入时的记录，
+    其余签名未变的歌手沿用旧快照，只有快照缺失或 CSV 被外部改动时才重新解析 CSV。
+    """
+    global _packed, _pack_updates
+    if not _pack_enabled:
+        return
+    list_dir = os.path.dirname(default_cache_dir())
+    if not os.path.isdir(list_dir):
+        return
+    with profile_phase("pack"):
+        updates = {name: records for name, records in _pack_updates.items() if name != CLOUD_FOLDER}
+        cloud = _pack_updates.get(CLOUD_FOLDER)
+        # 旧快照交给 refresh_pack 沿用未变化的歌手，替换文件前由它释放 mmap
+        if refresh_pack(list_dir, _packed, updates, cloud):
+            print("📦 二进制曲库快照已更新")
+    _packed = PackedCatalog.open()
+    _pack_updates = {}
+
+# ---------- 演唱会视频探测（--probe 启用）：时长 / 分辨率 / 编码写入 CSV 可选列与 README ----------
+_video_cache = None
+
+def set_video_probe(enabled=True):
+    """启用时加载 List/.cache/video.json（按 (path, mtime, size) 缓存探测结果）；传入 False 时保存并关闭"""
+    global _video_cache
+    save_video_probe()
+    _video_cache = load_video_cache() if enabled else None
+
+def get_video_probe():
+    return _video_cache
+
+def save_video_probe():
+    if _video_cache is None or not (_video_cache.hits or _video_cache.misses):
+        return
+    _video_cache.save()
+    print(_video_cache.summary("视频信息"))
+
+def load_artist_records(csv_file):
+    """读取歌手 CSV 为 Record 列表：二进制快照中该歌手的签名与 CSV 一致时直接从快照取，否则解析 CSV"""
+    if _packed is not None:
+        rows = _packed.artist_records(os.path.splitext(os.path.basename(csv_file))[0], csv_file)
+        if rows is not None:
+            profile_count("pack_hits")
+            return list(rows)
+    return read_artist_csv(csv_file)
+
+def load_artist_table(csv_file):
+    """
+    读取歌手 CSV 的记录与可选列：(records, roots, media)，CSV 没有对应列时 roots / media 为 None。
+    没有可选列时只读表头，记录同 load_artist_records（可直接取快照）；有可选列时一次解析同时得到记录与列值。
+    """
+    header = read_artist_header(csv_file)
+    if header is None:
+        return [], None, None
+    if not any(has_artist_columns(header)):
+        return load_artist_records(csv_file), None, None
+    return read_artist_table(csv_file)
+
+def load_artist_media(csv_file):
+    """只需要视频信息列时（README）：CSV 没有这些列则只读表头"""
+    if not has_artist_columns(read_artist_header(csv_file))[1]:
+        return None
+    return read_artist_table(csv_file)[2]
+
+def load_summary_records(csv_path):
+    """读取 Summary.csv 为 dict 列表，快照有效时不解析 CSV"""
+    if _packed is not None:
+        rows = _packed.cloud_rows(csv_path)
+        if rows is not None:
+            profile_count("pack_hits")
+            return [{"Singer": singer, "Name": name, "From": source} for singer, name, source in rows]
+    return read_summary_csv(csv_path)
+
+def print_unmatched_report():
+    """打印并清空本次运行中未匹配任何命名规则的名称"""
+    items = _grammar_book.unmatched.take()
+    if not items:
+        return
+    print(f"\n⚠️ {len(items)} 个名称未匹配任何命名规则（可在 List/grammar.json 中追加规则）：")
+    for kind, where, name in sorted(items):
+        print(f"  ? [{kind}] {os.path.join(where, name)}")
+
+def iter_tracks(folder_path, folder_type='album', cache=None, grammar=None):
+    """
+    extract_tracks 的生成器版本：每个目录只做一次 scandir，逐条产出 Track。
+    cache: 可选 ScanCache，目录签名未变化时直接复用上次的解析结果
+    grammar: 命名规则（Head_Grammar.Grammar），默认使用 get_grammar()
+    """
+    if grammar is None:
+        grammar = get_grammar()
+    entry, sig = cache.lookup(folder_path, grammar.key) if cache is not None else (None, None)
+
+    if folder_type == 'single':
+        # 遍历单曲目录下的每个子文件夹
+        if entry is not None:
+            subfolders = entry["dirs"]
+        else:
+            subfolders = list(iter_subdirs(folder_path))
+            if cache is not None:
+                cache.store(folder_path, sig, dirs=subfolders, salt=grammar.key)
+        # 一次解析全部子文件夹名，提取开头的日期
+        parsed, _ = grammar.parse_listing('single_folder', subfolders, folder_path)
+        for subfolder, fields in zip(subfolders, parsed):
+            release_date = intern(fields.get('date') or '') if fields else ''
+
+            # 调用 album 逻辑提取每个子文件夹
+            subfolder_path = os.path.join(folder_path, subfolder)
+            try:
+                for t in iter_tracks(subfolder_path, folder_type='album', cache=cache, grammar=grammar):
+                    yield t._replace(parent_folder=subfolder, release_date=release_date, folder_type='single')
+            except FileNotFoundError:
+                continue  # 缓存中的子目录已被删除
+        return
+
+    if entry is not None:
+        # 叶子目录命中缓存：Track 不可变，直接复用；未匹配的名称照常报告
+        for kind, name in entry.get("unmatched", ()):
+            grammar.unmatched.add(kind, folder_path, [name])
+        tracks = entry["tracks"]
+        if tracks and not isinstance(tracks[0], Track):
+            tracks = entry["tracks"] = [make_track(t) for t in tracks]
+        yield from tracks
+        return
+
+    _, files = scan_dir(folder_path)
+    folder_path = intern(folder_path)
+    if folder_type == 'live':
+        tracks, unmatched = _parse_live_files(folder_path, files, grammar)
+    else:
+        tracks, unmatched = _parse_album_files(folder_path, files, grammar)
+
+    if cache is not None:
+        cache.store(folder_path, sig, tracks=tracks, salt=grammar.key, unmatched=unmatched)
+    yield from tracks
+
+def _split_media_files(files, exts):
+    """按扩展名筛选文件并跳过封面，返回 [(不含扩展名的名称, 文件名)]"""
+    result = []
+    for file in files:
+        name, ext = os.path.splitext(file)
+        if ext.lower() not in exts:
+            continue
+        if 'cover' in name.lower():
+            continue  # 跳过封面或非正式文件
+        result.append((name, file))
+    return result
+
+def _parse_live_files(folder_path, files, grammar):
+    """
+    解析演唱会目录下的视频文件名（规则 live_file，默认 YYYY.MM.DD-名称.mp4）。
+    返回 (Track 列表, 未匹配的 [类别, 名称] 列表)；未匹配的文件以完整文件名作为演唱会名保留。
+    """
+    media = _split_media_files(files, VIDEO_EXTS)
+    parsed, unmatched = grammar.parse_listing('live_file', [name for name, _ in media], folder_path)
+
+    tracks = []
+    for (name, file), fields in zip(media, parsed):
+        fields = fields or {}
+        release_date = fields.get('date') or ''
+        live_name = fields.get('live') or name
+        tracks.append(Track('live', intern(release_date), '', '', '', file, live_name=live_name, folder=folder_path))
+    return tracks, [['live_file', name] for name in unmatched]
+
+def _parse_album_files(folder_path, files, grammar):
+    """
+    解析专辑目录：目录名按规则 album_folder（默认 YYYY.MM.DD_..._专辑名[...]），
+    文件名按规则 track_file（默认 NNN.曲名.flac）。
+    返回 (Track 列表, 未匹配的 [类别, 名称] 列表)；未匹配的文件以完整文件名作为曲名保留，不再误拆分。
+    """
+    folder_name = os.path.basename(folder_path)
+    unmatched = []
+    folder_fields = grammar.parse('album_folder', folder_name)
+    if folder_fields is None:
+        grammar.unmatched.add('album_folder', os.path.dirname(folder_path), [folder_name])
+        unmatched.append(['album_folder', folder_name])
+        folder_fields = {'album': folder_name.strip()}
+    release_date = intern(folder_fields.get('date') or '')
+    album_name = intern(folder_fields.get('album') or '')
+
+    media = _split_media_files(files, AUDIO_EXTS)
+    parsed, unmatched_files = grammar.parse_listing('track_file', [name for name, _ in media], folder_path)
+    unmatched.extend(['track_file', name] for name in unmatched_files)
 
-def extract_tracks(folder_path, folder_type='album'):
+    tracks = []
+    for (name, file), fields in zip(media, parsed):
+        if fields is None:
+            track_no, track_name = '', name.strip()
+        else:
+            track_no, track_name = fields.get('no') or '', fields['title']
+        tracks.append(Track('album', release_date, album_name, track_no, track_name, file, folder=folder_path))
+    return tracks, unmatched
+
+def extract_tracks(folder_path, folder_type='album', cache=None, grammar=None):
     """
     提取文件夹下音频/视频文件信息，适应专辑、单曲、演唱会三类目录。
     
@@ -13,7 +325,7 @@ def extract_tracks(folder_path, folder_type='album'):
     live 模式会提取 live_name。
     album 模式会提取 album_name（兼容 Album 和 EP 命名）。
     
-    返回字段：
+    返回 Track 列表，字段：
         - track_no (album)
         - track_name (album / single)
         - file_name
@@ -22,331 +334,631 @@ def extract_tracks(folder_path, folder_type='album'):
         - release_date (album / single / live)
         - live_name (live)
         - album_name (album)
+        - folder (文件所在目录)
+
+    cache: 可选 ScanCache，目录签名未变化时直接复用上次的解析结果
+    grammar: 可选命名规则，默认使用 get_grammar()
     """
-    tracks = []
+    return list(iter_tracks(folder_path, folder_type, cache=cache, grammar=grammar))
+
+def iter_artist_tracks(artist_folder, cache=None):
+    """遍历歌手目录，按 专辑 / 单曲 / 演唱会 布局逐条产出曲目（使用该歌手的命名规则）"""
+    grammar = get_grammar(os.path.basename(os.path.normpath(artist_folder)))
+    if cache is not None:
+        cache.add_root(artist_folder)
+        entry, sig = cache.lookup(artist_folder)
+    else:
+        entry, sig = None, None
 
-    if folder_type == 'single':
-        # 遍历单曲目录下的每个子文件夹
-        for subfolder in os.listdir(folder_path):
-            subfolder_path = os.path.join(folder_path, subfolder)
-            if os.path.isdir(subfolder_path):
-                # 提取子文件夹开头的日期
-                release_date = ''
-                parts = subfolder.split('_', 1)
-                if len(parts) > 1:
-                    date_candidate = parts[0]
-                    if len(date_candidate) == 10 and date_candidate.count('.') == 2:
-                        release_date = date_candidate
-
-                # 调用 album 逻辑提取每个子文件夹
-                sub_tracks = extract_tracks(subfolder_path, folder_type='album')
-                for t in sub_tracks:
-                    t['parent_folder'] = subfolder
-                    t['release_date'] = release_date
-                    t['folder_type'] = 'single'
-                    tracks.append(t)
-        return tracks
+    if entry is not None:
+        subs = entry["dirs"]
+    else:
+        subs = list(iter_subdirs(artist_folder))
+        if cache is not None:
+            cache.store(artist_folder, sig, dirs=subs)
 
-    if folder_type == 'live':
-        # 遍历演唱会文件夹的文件
-        for file in os.listdir(folder_path):
-            full_path = os.path.join(folder_path, file)
-            if not os.path.isfile(full_path):
-                continue
+    for sub in subs:
+        sub_path = os.path.join(artist_folder, sub)
+        try:
+            yield from iter_tracks(sub_path, folder_type=folder_type_of(sub), cache=cache, grammar=grammar)
+        except FileNotFoundError:
+            continue  # 缓存中的子目录已被删除
 
-            name, ext = os.path.splitext(file)
-            if ext.lower() not in ['.mp4', '.mkv', '.avi']:
-                continue  # 只处理视频文件
-
-            if 'cover' in name.lower():
-                continue  # 跳过封面或非正式文件
-
-            # 提取开头日期和 live_name
-            release_date = ''
-            live_name = name
-            if '-' in name:
-                parts = name.split('-', 1)
-                date_candidate = parts[0]
-                if len(date_candidate) == 10 and date_candidate.count('.') == 2:
-                    release_date = date_candidate
-                    live_name = parts[1]
-
-            tracks.append({
-                'file_name': file,
-                'folder_type': 'live',
-                'release_date': release_date,
-                'live_name': live_name
-            })
-        return tracks
+def scan_artist_folder(artist_folder, cache=None):
+    """扫描歌手文件夹下一级子目录，并根据命名调用 extract_tracks"""
+    return list(iter_artist_tracks(artist_folder, cache=cache))
+
+# ---------- 异步扫描：高延迟挂载点 (drvfs / NAS) 上重叠各专辑、各歌手的目录读取 ----------
+async def _gather_tracks(coros):
+    """并发执行多个子目录的扫描，按原顺序返回；已被删除的子目录（缓存过期）跳过"""
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    for result in results:
+        if isinstance(result, FileNotFoundError):
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        yield result
 
-    # album 模式
-    release_date = ''
-    album_name = ''
-    folder_name = os.path.basename(folder_path)
+async def tracks_async(folder_path, fs, folder_type='album', cache=None, grammar=None):
+    """iter_tracks 的异步版本：阻塞调用经 fs (Head_AsyncFs.AsyncFs) 在线程池中执行，返回 Track 列表"""
+    if grammar is None:
+        grammar = get_grammar()
+    entry, sig = await fs.run(folder_path, cache.lookup, folder_path, grammar.key) \
+        if cache is not None else (None, None)
+
+    if folder_type == 'single':
+        if entry is not None:
+            subfolders = entry["dirs"]
+        else:
+            subfolders = await fs.run(folder_path, lambda: list(iter_subdirs(folder_path)))
+            if cache is not None:
+                cache.store(folder_path, sig, dirs=subfolders, salt=grammar.key)
+        parsed, _ = grammar.parse_listing('single_folder', subfolders, folder_path)
+        release_dates = [intern(fields.get('date') or '') if fields else '' for fields in parsed]
+        coros = [tracks_async(os.path.join(folder_path, sub), fs, 'album', cache, grammar) for sub in subfolders]
+        tracks = []
+        # gather 跳过已删除的子目录，需按子目录名对齐日期
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        for subfolder, release_date, result in zip(subfolders, release_dates, results):
+            if isinstance(result, FileNotFoundError):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            tracks.extend(t._replace(parent_folder=subfolder, release_date=release_date, folder_type='single')
+                          for t in result)
+        return tracks
 
-    # 提取日期
-    date_candidate = folder_name.split('_', 1)[0]
-    release_date = date_candidate if len(date_candidate) == 10 and date_candidate.count('.') == 2 else ''
+    if entry is not None:
+        for kind, name in entry.get("unmatched", ()):
+            grammar.unmatched.add(kind, folder_path, [name])
+        tracks = entry["tracks"]
+        if tracks and not isinstance(tracks[0], Track):
+            tracks = entry["tracks"] = [make_track(t) for t in tracks]
+        return tracks
 
-    # 提取专辑名
-    last_underscore_idx = folder_name.rfind('_')
-    if last_underscore_idx != -1:
-        name_part = folder_name[last_underscore_idx + 1:]
+    _, files = await fs.run(folder_path, scan_dir, folder_path)
+    folder_path = intern(folder_path)
+    if folder_type == 'live':
+        tracks, unmatched = _parse_live_files(folder_path, files, grammar)
     else:
-        name_part = folder_name
-    # 去掉末尾方括号及其内容
-    if '[' in name_part:
-        name_part = name_part.split('[', 1)[0].strip()
-    album_name = name_part.strip()
-
-    for file in os.listdir(folder_path):
-        full_path = os.path.join(folder_path, file)
-        if not os.path.isfile(full_path):
-            continue
-        name, ext = os.path.splitext(file)
-        if ext.lower() not in ['.flac', '.mp3', '.wav']:
-            continue
-        if 'cover' in name.lower():
-            continue  # 跳过封面
+        tracks, unmatched = _parse_album_files(folder_path, files, grammar)
+    if cache is not None:
+        cache.store(folder_path, sig, tracks=tracks, salt=grammar.key, unmatched=unmatched)
+    return tracks
 
-        if '.' in name:
-            parts = name.split('.', 1)
-            track_no, track_name = parts[0].strip(), parts[1].strip()
-        else:
-            track_no, track_name = '', name.strip()
+async def scan_artist_folder_async(artist_folder, fs, cache=None):
+    """scan_artist_folder 的异步版本，返回相同顺序的 Track 列表"""
+    grammar = get_grammar(os.path.basename(os.path.normpath(artist_folder)))
+    if cache is not None:
+        cache.add_root(artist_folder)
+        entry, sig = await fs.run(artist_folder, cache.lookup, artist_folder)
+    else:
+        entry, sig = None, None
 
-        tracks.append({
-            'track_no': track_no,
-            'track_name': track_name,
-            'file_name': file,
-            'folder_type': 'album',
-            'release_date': release_date,
-            'album_name': album_name
-        })
+    if entry is not None:
+        subs = entry["dirs"]
+    else:
+        subs = await fs.run(artist_folder, lambda: list(iter_subdirs(artist_folder)))
+        if cache is not None:
+            cache.store(artist_folder, sig, dirs=subs)
 
+    coros = [tracks_async(os.path.join(artist_folder, sub), fs, folder_type_of(sub), cache, grammar)
+             for sub in subs]
+    tracks = []
+    async for result in _gather_tracks(coros):
+        tracks.extend(result)
     return tracks
 
-def scan_artist_folder(artist_folder):
-    """扫描歌手文件夹下一级子目录，并根据命名调用 extract_tracks"""
-    all_tracks = []
-    for sub in os.listdir(artist_folder):
-        sub_path = os.path.join(artist_folder, sub)
-        if not os.path.isdir(sub_path):
+def scan_artists_async(artist_folders, cache=None, io_limit=DEFAULT_IO_LIMIT, device_limits=None):
+    """
+    一次性异步扫描多位歌手，所有目录读取在同一事件循环中重叠进行，
+    每个挂载点同时在途的调用不超过 io_limit（device_limits 可为个别路径所在的挂载点单独设置）。
+    返回 {artist_folder: Track 列表}，扫描出错的歌手值为 None（由调用方按同步方式重试并报告错误）。
+    """
+    async def run():
+        with AsyncFs(artist_folders, io_limit, device_limits) as fs:
+            results = await asyncio.gather(*(scan_artist_folder_async(f, fs, cache) for f in artist_folders),
+                                           return_exceptions=True)
+        return {f: None if isinstance(r, BaseException) else r for f, r in zip(artist_folders, results)}
+
+    return asyncio.run(run())
+
+def joined_tracks(scanned, folders):
+    """同一歌手在各根目录下的异步扫描结果按 folders 顺序拼接；任一目录扫描失败或未扫描时返回 None"""
+    parts = [scanned.get(folder) for folder in folders]
+    if any(part is None for part in parts):
+        return None
+    return [t for part in parts for t in part]
+
+# ---------- 多根目录：各根目录下的同名歌手目录合并为同一个 List/<歌手> ----------
+def as_folders(path):
+    """单个路径或路径列表 → 路径列表"""
+    return [path] if isinstance(path, str) else list(path)
+
+def iter_artist_folders(roots):
+    """各根目录下的歌手目录按名称合并：[(歌手, [各根目录下的同名目录])]，按首次出现的顺序（跳过 CloudMusic）"""
+    folders = {}
+    for root in roots:
+        for artist in iter_subdirs(root):
+            if artist == CLOUD_FOLDER:
+                continue
+            folders.setdefault(artist, []).append(os.path.join(root, artist))
+    return list(folders.items())
+
+def iter_track_roots(tracks, roots):
+    """(Record, 根目录)：曲目所在目录 (Track.folder) 与根目录按路径前缀匹配，匹配不到的记为空"""
+    by_length = sorted(roots, key=len, reverse=True)
+    root_of_folder = {}
+    for t in tracks:
+        root = root_of_folder.get(t.folder)
+        if root is None:
+            root = root_of_folder[t.folder] = next(
+                (r for r in by_length if t.folder == r or t.folder.startswith(r.rstrip(os.sep) + os.sep)), "")
+        yield track_to_record(t), root
+
+def record_roots(tracks, roots):
+    """每条记录来自哪个根目录：{Record: 根目录}，同一条目出现在多个根目录时按 roots 顺序以 | 连接"""
+    order = {root: i for i, root in enumerate(roots)}
+    found = {}
+    for record, root in iter_track_roots(tracks, roots):
+        labels = found.setdefault(record, [])
+        if root not in labels:
+            labels.append(root)
+    return {r: "|".join(sorted(labels, key=lambda root: order.get(root, len(order)))) for r, labels in found.items()}
+
+def merge_root_records(tracks, roots):
+    """
+    多个根目录的扫描结果合并为记录列表：同一条目在多个根目录中各出现一次时只保留一行
+    （行数取各根目录中的最大值，同一根目录内的重复条目与单根目录时一致），顺序按首次出现。
+    """
+    counts = defaultdict(Counter)
+    for record, root in iter_track_roots(tracks, roots):
+        counts[record][root] += 1
+    return [r for r, per_root in counts.items() for _ in range(max(per_root.values()))]
+
+def merge_root_labels(old_roots, new_roots, roots):
+    """
+    Root 列合并：本次扫描到的条目只替换本次扫描的根目录对应的部分，
+    其他根目录（本次未扫描）的标签保留；本次未扫描到的条目保留原值。
+    """
+    merged = dict(old_roots or {})
+    scanned = set(roots)
+    for record, label in new_roots.items():
+        old = merged.get(record)
+        if not old:
+            merged[record] = label
             continue
+        parts = label.split("|")
+        kept = [p for p in old.split("|") if p not in scanned or p in parts]
+        merged[record] = "|".join(kept + [p for p in parts if p not in kept])
+    return merged
+
+# 非交互决策策略：
+#   ask     : 逐个询问（默认，原有行为）
+#   accept  : 全部接受
+#   keep    : 拒绝删除，只追加新增条目
+#   dry-run : 只报告差异，不写任何文件
+DECISION_POLICIES = ("ask", "accept", "keep", "dry-run")
+
+def write_output(path, text, encoding="utf-8", records=None):
+    """
+    内容与已有文件一致时跳过写入（不改变 mtime，不触发同步 / 监听），否则原子写入。
+    返回是否实际写入。
+    """
+    written, size = write_if_changed(path, text, encoding)
+    return count_write(written, size, records)
+
+def count_write(written, size, records=None):
+    """记录一次输出的统计（写入字节 / 记录数，或跳过写入），返回 written"""
+    if written:
+        profile_count("bytes_written", size)
+        if records is not None:
+            profile_count("records_written", records)
+    else:
+        profile_count("writes_skipped")
+    return written
 
-        if sub == '单曲':
-            tracks = extract_tracks(sub_path, folder_type='single')
-        elif sub == '演唱会':
-            tracks = extract_tracks(sub_path, folder_type='live')
-        else:
-            tracks = extract_tracks(sub_path, folder_type='album')
+class _RowSink:
+    """csv.writer 每行调用一次 write：把行尾换行推迟到下一行之前写出，文件末尾不留换行"""
+
+    def __init__(self, out):
+        self.out = out
+        self.pending = ""
 
-        all_tracks.extend(tracks)
-    return all_tracks
+    def write(self, row):
+        self.out.write(self.pending + row[:-2])
+        self.pending = row[-2:]
 
-def generate_csv(all_tracks, artist_folder, scan_mode="Partial"):
+def write_artist_csv(csv_file, records, roots=None, media=None):
+    """
+    流式写入歌手 CSV（UTF-8 BOM，\r\n 换行，末尾无换行），内容未变化时不替换原文件。
+    records 可以是任意可迭代对象（流式差异时为归并中的行流）。
+    roots: 可选 {Record: 根目录}，给出时末尾增加 Root 列（多根目录曲库）
+    media: 可选 {Record: (Duration, Resolution, Codec)}，给出时末尾增加视频信息列（--probe）
+    """
+    count = 0
+    with StreamingWrite(csv_file, "utf-8-sig") as out:
+        writer = csv.writer(_RowSink(out))
+        if roots is None and media is None:
+            writer.writerow(RECORD_FIELDS)
+            for count, r in enumerate(records, 1):
+                writer.writerow(r)
+        elif media is None:
+            writer.writerow(RECORD_FIELDS + [ROOT_FIELD])
+            for count, r in enumerate(records, 1):
+                writer.writerow((*r, roots.get(r, "")))
+        else:
+            writer.writerow(RECORD_FIELDS + ([ROOT_FIELD] if roots is not None else []) + MEDIA_FIELDS)
+            for count, r in enumerate(records, 1):
+                writer.writerow((*r, *((roots.get(r, ""),) if roots is not None else ()), *media.get(r, NO_MEDIA)))
+    return count_write(out.written, out.size, count)
+
+def render_summary_csv(records):
+    """在内存中生成 Summary.csv 文本（\r\n 换行，末尾无换行）"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["Singer", "Name", "From"])
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue()[:-2]
+
+def write_summary_csv(csv_file, records):
+    """写入 Summary.csv（UTF-8 BOM，末尾无换行），内容未变化时不写"""
+    return write_output(csv_file, render_summary_csv(records), "utf-8-sig", len(records))
+
+def generate_csv(all_tracks, artist_folder, scan_mode="Partial", policy="ask", report=None, catalog=None, roots=None,
+                 media=None):
     """生成或更新 CSV，支持增量更新模式。
     scan_mode:
         - "All": 检测新增和删除，按用户选择覆盖 CSV
         - "Partial": 只增加新条目，保留已有条目
+    policy: 见 DECISION_POLICIES，非 ask 时不打印差异、不询问
+    report: 可选 dict，写入 added / removed 差异供汇总报告使用；
+            写入 CSV 时还会放入 records（最终记录），README 直接使用，无需重读 CSV
+    catalog: 可选 Catalog，差异在 SQLite 索引上计算，CSV 由曲库导出
+    roots: 可选，本次运行的根目录列表；多于一个根目录或已有 CSV 带 Root 列时，
+           CSV 的 Root 列记录每行来自哪个根目录（Partial 模式下未重新扫描到的行保留原值）
+    media: 可选，本次探测到的 {Record: (Duration, Resolution, Codec)}；与已有的视频信息列合并后写入
     Album 字段 album 使用 album_name，single/live 用 '-'
     """
-    import os, csv
 
     artist_name = os.path.basename(os.path.normpath(artist_folder))
+    # 目录在实际写入时才创建（write_artist_records），dry-run / plan 不留下空目录
     output_dir = os.path.abspath(os.path.join(os.getcwd(), "..", "List", artist_name))
-    os.makedirs(output_dir, exist_ok=True)
     csv_file = os.path.join(output_dir, f"{artist_name}.csv")
 
-    # ---------- 将新扫描的数据标准化 ----------
-    new_records = []
-    for t in all_tracks:
-        Type = t.get('folder_type', '-') or '-'
-        Date = t.get('release_date', '-') or '-'
-
-        if Type == 'album':
-            Album = t.get('album_name', '-') or '-'
-            No = t.get('track_no', '-') or '-'
-            Name = t.get('track_name', '-') or '-'
-        else:
-            Album = '-'
-            No = '-'
-            if Type == 'single':
-                Name = t.get('track_name', '-') or '-'
-            elif Type == 'live':
-                Name = t.get('live_name', '-') or '-'
+    # ---------- 已有 CSV 的可选列：只读表头判断，带可选列时一次解析得到记录与列值 ----------
+    has_columns = any(has_artist_columns(read_artist_header(csv_file)))
+    csv_records, old_roots, old_media = None, None, None
+    if has_columns:
+        with profile_phase("csv_read", artist_name):
+            csv_records, old_roots, old_media = read_artist_table(csv_file)
+            profile_count("records_read", len(csv_records))
+
+    # ---------- Root 列：记录每行来自哪个根目录 ----------
+    new_roots = None
+    if roots is not None and (len(roots) > 1 or old_roots is not None):
+        all_tracks = list(all_tracks)
+        new_roots = record_roots(all_tracks, roots)
+
+    # ---------- 视频信息列：本次探测结果覆盖已有值 ----------
+    merged_media = None
+    if media is not None:
+        merged_media = dict(old_media or {})
+        merged_media.update(media)
+
+    if catalog is None and _stream_spill_rows is not None and not has_columns and new_roots is None \
+            and merged_media is None:
+        return generate_csv_stream(all_tracks, artist_name, csv_file, scan_mode, policy, report)
+
+    # ---------- 将新扫描的数据标准化（多个根目录下的同一条目只保留一行） ----------
+    if new_roots is not None:
+        new_records = merge_root_records(all_tracks, roots)
+    else:
+        new_records = [track_to_record(t) for t in all_tracks]
+
+    needs_export = False
+    if catalog is not None:
+        # ---------- 曲库模式：首次使用或 CSV 在曲库之外被改动时导入 CSV，差异由 SQL 计算 ----------
+        if catalog.csv_stale(csv_file):
+            if not os.path.exists(csv_file):
+                # CSV 被删除但曲库中仍有该歌手：即使没有差异也由曲库重新导出
+                needs_export = catalog.has_artist(artist_name)
+                if needs_export:
+                    print(f"🔄 {artist_name} 的 CSV 不存在，由曲库重新导出")
             else:
-                Name = '-'
-
-        new_records.append({
-            "Type": Type,
-            "Date": Date,
-            "Album": Album,
-            "No": No,
-            "Name": Name
-        })
-
-    # ---------- 如果旧 CSV 存在，加载旧数据 ----------
-    old_records = []
-    if os.path.exists(csv_file):
-        with open(csv_file, "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                old_records.append(row)
-
-    # ---------- 对比差异 ----------
-    old_set = {(r["Type"], r["Date"], r["Album"], r["No"], r["Name"]) for r in old_records}
-    new_set = {(r["Type"], r["Date"], r["Album"], r["No"], r["Name"]) for r in new_records}
-
-    added = new_set - old_set
-    removed = old_set - new_set
-
-    if added or removed:
-        print(f"⚠️ 检测到 {artist_name} 数据更新：+{len(added)}，-{len(removed)}")
-
-        if added:
-            print("\n🟢 新增条目：")
-            for r in sorted(added):
-                print(f"  + Type: {r[0]}, Date: {r[1]}, Album: {r[2]}, No: {r[3]}, Name: {r[4]}")
-
-        if removed:
-            print("\n🔴 删除条目：")
-            for r in sorted(removed):
-                print(f"  - Type: {r[0]}, Date: {r[1]}, Album: {r[2]}, No: {r[3]}, Name: {r[4]}")
-
-        choice = input("\n是否重新生成 CSV？(y/n): ").strip().lower()
-        if choice != "y":
-            print("⏭️ 跳过 CSV 更新")
-            return "Null"
+                if catalog.has_artist(artist_name):
+                    print(f"🔄 {artist_name} 的 CSV 与曲库不同步（在曲库之外被修改过），重新导入")
+                with profile_phase("csv_read", artist_name):
+                    catalog.import_artist_csv(artist_name, csv_file, records=csv_records)
+        old_records = None
+        with profile_phase("diff", artist_name):
+            added, removed = catalog.diff_artist(artist_name, new_records)
     else:
-        print(f"✅ 没有检测到 {artist_name} 数据更新")
+        # ---------- 如果旧 CSV 存在，加载旧数据 ----------
+        if csv_records is not None:
+            old_records = csv_records
+        else:
+            with profile_phase("csv_read", artist_name):
+                old_records = load_artist_records(csv_file) if os.path.exists(csv_file) else []
+                profile_count("records_read", len(old_records))
+
+        # ---------- 对比差异（Record 本身即 tuple，可直接放入集合） ----------
+        with profile_phase("diff", artist_name):
+            old_set = set(old_records)
+            new_set = set(new_records)
+
+            added = new_set - old_set
+            removed = old_set - new_set
+
+    if report is not None:
+        report["csv"] = csv_file
+        report["added"] = sorted(added)
+        report["removed"] = sorted(removed)
+
+    # 写入的可选列：本次有更新时用合并结果，否则沿用已有 CSV 的值（None 表示不写该列）
+    merged_roots = old_roots
+    if new_roots is not None:
+        merged_roots = merge_root_labels(old_roots, new_roots, roots)
+    if merged_media is None:
+        merged_media = old_media
+
+    scan_mode = confirm_artist_update(artist_name, added, removed, scan_mode, policy)
+    if scan_mode is None:
+        if (new_roots is not None or media is not None or needs_export) and not (added or removed) \
+                and policy != "dry-run":
+            # 条目没有变化，但有条目换了根目录 / 视频信息变化（或首次记录这些列），或 CSV 需要由曲库重新导出
+            if old_records is None:
+                old_records = catalog.artist_records(artist_name)
+            roots_changed = merged_roots is not None and (
+                old_roots is None or any(merged_roots.get(r) != old_roots.get(r) for r in old_records))
+            media_changed = merged_media is not None and (
+                old_media is None or any(merged_media.get(r) != old_media.get(r) for r in old_records))
+            if roots_changed or media_changed or needs_export:
+                if roots_changed:
+                    print(f"📍 {artist_name} 的 Root 列已更新")
+                if media_changed:
+                    print(f"🎬 {artist_name} 的视频信息列已更新")
+                final_records = write_artist_records(artist_name, csv_file, old_records, presorted=True,
+                                                     roots=merged_roots, media=merged_media)
+                if catalog is not None:
+                    catalog.mark_csv(csv_file)
+                if report is not None:
+                    report["records"] = final_records
+                    report["media"] = merged_media
+                return csv_file
         return "Null"
 
     # ---------- 根据 scan_mode 生成最终 CSV ----------
     if scan_mode == "All":
         final_records = new_records
+        presorted = False
     elif scan_mode == "Partial":
-        final_records = old_records + [r for r in new_records if (r["Type"], r["Date"], r["Album"], r["No"], r["Name"]) in added]
+        if old_records is None:
+            old_records = catalog.artist_records(artist_name)
+        # 旧 CSV 已有序：只把新增条目归并进去，不对整表重新排序
+        with profile_phase("sort", artist_name):
+            final_records = merge_sorted_records(old_records, [r for r in new_records if r in added])
+        presorted = True
+
+    final_records = write_artist_records(artist_name, csv_file, final_records, catalog, presorted, merged_roots,
+                                         merged_media)
+    if report is not None:
+        report["records"] = final_records
+        report["media"] = merged_media
+    return csv_file
 
-    # ---------- 分块排序：album -> single -> live, 时间升序 ----------
-    def sort_key(r):
-        type_order = {"album": 0, "single": 1, "live": 2}
-        type_rank = type_order.get(r["Type"], 3)
-        try:
-            date_rank = tuple(int(x) for x in r["Date"].replace("-", ".").split("."))
-        except:
-            date_rank = (9999, 12, 31)
-        try:
-            track_no_rank = int(r["No"]) if r["No"] != '-' else 0
-        except:
-            track_no_rank = 0
-        return (type_rank, date_rank, track_no_rank, r["Name"])
+def confirm_artist_update(artist_name, added, removed, scan_mode, policy):
+    """
+    按 policy 决定是否写入歌手 CSV：ask 时打印差异并询问。
+    返回实际使用的 scan_mode（keep 策略强制 Partial），不写入时返回 None。
+    """
+    if policy != "ask":
+        if not (added or removed) or policy == "dry-run":
+            return None
+        if policy == "keep":
+            if not added:
+                return None
+            return "Partial"
+        return scan_mode
+
+    if not (added or removed):
+        print(f"✅ 没有检测到 {artist_name} 数据更新")
+        return None
 
-    final_records.sort(key=sort_key)
+    print(f"⚠️ 检测到 {artist_name} 数据更新：+{len(added)}，-{len(removed)}")
 
-    # ---------- 写入 CSV ----------
-    with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Type','Date','Album','No','Name'])
-        for r in final_records:
-            writer.writerow([r["Type"], r["Date"], r["Album"], r["No"], r["Name"]])
-
-    # 删除结尾多余换行
-    with open(csv_file, 'rb+') as file:
-        file.seek(-2, os.SEEK_END)
-        file.truncate()
-
-    print(f"✅ CSV 已更新：{csv_file}")
+    if added:
+        print("\n🟢 新增条目：")
+        for r in sorted(added):
+            print(f"  + Type: {r[0]}, Date: {r[1]}, Album: {r[2]}, No: {r[3]}, Name: {r[4]}")
+
+    if removed:
+        print("\n🔴 删除条目：")
+        for r in sorted(removed):
+            print(f"  - Type: {r[0]}, Date: {r[1]}, Album: {r[2]}, No: {r[3]}, Name: {r[4]}")
+
+    choice = input("\n是否重新生成 CSV？(y/n): ").strip().lower()
+    if choice != "y":
+        print("⏭️ 跳过 CSV 更新")
+        return None
+    return scan_mode
+
+def _record_from_fields(fields):
+    return make_record(*fields)
+
+def generate_csv_stream(all_tracks, artist_name, csv_file, scan_mode="Partial", policy="ask", report=None):
+    """
+    generate_csv 的流式版本（--stream-diff，不支持曲库模式）：
+    新扫描结果按 record_sort_key 外部排序（超过 spill_rows 行溢出到临时文件），
+    与已按同一顺序写出的旧 CSV 逐行 merge-join 得到差异；写入时再流式归并到输出文件。
+    内存中只保存差异本身，与曲库规模无关。旧 CSV 无序（手工编辑过）时旧数据同样外部排序。
+    输出与 generate_csv 完全一致；README 与搜索索引随后从写出的 CSV 读取。
+    """
+    new_records = (track_to_record(t) for t in all_tracks)
+    has_csv = os.path.exists(csv_file)
+    with ExitStack() as spills:
+        with profile_phase("sort", artist_name):
+            new_sorted = spills.enter_context(
+                SortedSpill(new_records, record_sort_key, _stream_spill_rows, make_row=_record_from_fields))
+
+        old_sorted = None
+        with profile_phase("diff", artist_name):
+            try:
+                added, removed = collect_diff(
+                    stream_diff(iter_artist_csv(csv_file) if has_csv else (), new_sorted, record_sort_key))
+            except UnsortedInput:
+                old_sorted = spills.enter_context(
+                    SortedSpill(iter_artist_csv(csv_file), record_sort_key, _stream_spill_rows,
+                                make_row=_record_from_fields))
+                added, removed = collect_diff(stream_diff(old_sorted, new_sorted, record_sort_key))
+
+        if report is not None:
+            report["csv"] = csv_file
+            report["added"] = sorted(added)
+            report["removed"] = sorted(removed)
+
+        scan_mode = confirm_artist_update(artist_name, added, removed, scan_mode, policy)
+        if scan_mode is None:
+            return "Null"
+
+        if scan_mode == "All":
+            final_rows = new_sorted
+        else:
+            # added 已按 record_sort_key 有序；heapq.merge 键相同时旧条目在前，与整体稳定排序一致
+            old_rows = old_sorted if old_sorted is not None else iter_artist_csv(csv_file) if has_csv else ()
+            final_rows = heapq.merge(old_rows, added, key=record_sort_key)
+        write_artist_records(artist_name, csv_file, final_rows, presorted=True)
     return csv_file
 
-def csv_to_markdown_grouped(csv_path):
+def write_artist_records(artist_name, csv_file, final_records, catalog=None, presorted=False, roots=None,
+                         media=None):
     """
-    从音乐 CSV 文件生成美化的 README.md。
-    Albums 分块显示曲目列表，Singles/Lives 按时间排序直接列出。
-    CSV 应包含字段: Type, Date, Album, No, Name, Parent_Folder (可选)
+    排序并写入歌手 CSV（曲库模式下先写入曲库再导出），随后增量更新搜索索引。
+    presorted: final_records 已按 record_sort_key 有序（merge_sorted_records 的结果），跳过排序。
+    roots: {Record: 根目录}，写入 Root 列；None 时不写该列
+    media: {Record: (Duration, Resolution, Codec)}，写入视频信息列；None 时不写这些列
+    （调用方读取旧 CSV 时已一并得到这些列，需要保留时原样传入，这里不再重新解析 CSV）
+    返回最终写入的记录（README 直接使用）；final_records 为行流（流式差异）时返回 None。
     """
-    import os
-    import csv
-    from collections import defaultdict
+    if not presorted:
+        with profile_phase("sort", artist_name):
+            final_records.sort(key=record_sort_key)
 
-    output_md_path = os.path.join(os.path.dirname(csv_path), "README.md")
+    # ---------- 写入 CSV ----------
+    with profile_phase("csv_write", artist_name):
+        os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+        if catalog is not None:
+            # 曲库为唯一数据源，CSV 是它的导出视图
+            catalog.replace_artist(artist_name, final_records)
+            final_records = catalog.artist_records(artist_name)
+        written = write_artist_csv(csv_file, final_records, roots, media)
+        if catalog is not None:
+            catalog.mark_csv(csv_file)
+    if not isinstance(final_records, list):
+        final_records = None  # 行流已在写入时消耗，之后从 CSV 重新读取
+    elif written and _pack_enabled:
+        _pack_updates[artist_name] = final_records
+    if _search_index is not None:
+        with profile_phase("index", artist_name):
+            _search_index.update_artist(artist_name,
+                                        final_records if final_records is not None else iter_artist_csv(csv_file))
+
+    if written:
+        print(f"✅ CSV 已更新：{csv_file}")
+    else:
+        print(f"✅ CSV 内容未变化，跳过写入：{csv_file}")
+    return final_records
+
+def format_media(columns):
+    """README Lives 中的视频信息：⏱️ 时长 · 📺 分辨率 · 🎞️ 编码（只列出非空的项）"""
+    duration, resolution, codec = columns
+    parts = [f"⏱️ {duration}" if duration else "", f"📺 {resolution}" if resolution else "",
+             f"🎞️ {codec}" if codec else ""]
+    return " · ".join(p for p in parts if p)
+
+def render_artist_markdown(artist_name, rows, media=None):
+    """由歌手记录在内存中生成 README.md 文本（末尾无换行）；media 为 CSV 的视频信息列，标注在 Lives 中"""
     albums = defaultdict(list)
     singles = []
     lives = []
-    
+    # match 之后：CloudMusic 中也有的曲目标注其来源
+    sources = _cloud_links.for_artist(artist_name) if _cloud_links is not None else {}
+    for row in rows:
+        name = row.Name
+        if row in sources:
+            name = f"{name} ☁️ {', '.join(sources[row])}"
+        if row.Type == 'album':
+            albums[(row.Date, row.Album)].append((row.No.zfill(3), name))
+        elif row.Type == 'single':
+            singles.append((row.Date, name))
+        elif row.Type == 'live':
+            info = format_media(media.get(row, NO_MEDIA)) if media else ""
+            lives.append((row.Date, f"{name} · {info}" if info else name))
+
+    parts = [f"# 🎵 {artist_name} 歌曲列表\n\n"]
+
+    # Albums
+    if albums:
+        parts.append("## 📀 Albums\n\n")
+        for (date, album_name) in sorted(albums.keys()):
+            parts.append(f"### 📁 ({date}) {album_name} \n\n")
+            for no, name in sorted(albums[(date, album_name)], key=lambda x: x[0]):
+                parts.append(f"- **[{no}]** {name}\n")
+            parts.append("\n")
+
+    # Singles
+    if singles:
+        parts.append("## 🎵 Singles\n\n")
+        for date, name in sorted(singles, key=lambda x: x[0]):
+            parts.append(f"- **[{date}]** {name}\n")
+        parts.append("\n")
+
+    # Lives
+    if lives:
+        parts.append("## 🎤 Lives\n\n")
+        for date, name in sorted(lives, key=lambda x: x[0]):
+            display_date = date if date else "-"
+            parts.append(f"- **[{display_date}]** {name}\n")
+        parts.append("\n")
+
+    # 去掉结尾多余的空行
+    return "".join(parts)[:-2]
+
+def csv_to_markdown_grouped(csv_path, records=None, media=None):
+    """
+    从音乐 CSV 文件生成美化的 README.md。
+    Albums 分块显示曲目列表，Singles/Lives 按时间排序直接列出。
+    CSV 应包含字段: Type, Date, Album, No, Name, Parent_Folder (可选)
+    records: 可选，generate_csv 刚写入的记录；给出时不再重新读取 CSV
+    media: 与 records 一同给出的视频信息列 {Record: (Duration, Resolution, Codec)}（没有时为 None）
+    """
     if csv_path is None or csv_path == "Null":
         print("⚠️ csv_path 为 Null，跳过生成 README.md")
         return "Null"
-    
-    # 读取 CSV 并分类
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            type_key = row['Type']
-            if type_key == 'album':
-                release_date = row['Date']
-                album_name = row['Album']
-                albums[(release_date, album_name)].append((row['No'].zfill(3), row['Name']))
-            elif type_key == 'single':
-                release_date = row['Date']
-                track_name = row['Name']
-                singles.append((release_date, track_name))
-            elif type_key == 'live':
-                release_date = row['Date']
-                track_name = row['Name']
-                lives.append((release_date, track_name))
-
-    # 写入 Markdown
-    with open(output_md_path, 'w', encoding='utf-8') as f:
-        artist_name = os.path.splitext(os.path.basename(csv_path))[0]
-        f.write(f"# 🎵 {artist_name} 歌曲列表\n\n")
-
-        # Albums
-        if albums:
-            f.write("## 📀 Albums\n\n")
-            for (date, album_name) in sorted(albums.keys()):
-                f.write(f"### 📁 ({date}) {album_name} \n\n")
-                for no, name in sorted(albums[(date, album_name)], key=lambda x: x[0]):
-                    f.write(f"- **[{no}]** {name}\n")
-                f.write("\n")
-
-        # Singles
-        if singles:
-            f.write("## 🎵 Singles\n\n")
-            for date, name in sorted(singles, key=lambda x: x[0]):
-                f.write(f"- **[{date}]** {name}\n")
-            f.write("\n")
-
-        # Lives
-        if lives:
-            f.write("## 🎤 Lives\n\n")
-            for date, name in sorted(lives, key=lambda x: x[0]):
-                display_date = date if date else "-"
-                f.write(f"- **[{display_date}]** {name}\n")
-            f.write("\n")
-
-    # 删除结尾多余换行
-    with open(output_md_path, 'rb+') as file:
-        file.seek(-2, os.SEEK_END)
-        file.truncate()
-        
-    print(f"README.md 已生成：{output_md_path}")
+
+    output_md_path = os.path.join(os.path.dirname(csv_path), "README.md")
+    if records is None:
+        records, _, media = load_artist_table(csv_path)
+        profile_count("records_read", len(records))
+
+    artist_name = os.path.splitext(os.path.basename(csv_path))[0]
+    if write_output(output_md_path, render_artist_markdown(artist_name, records, media)):
+        print(f"README.md 已生成：{output_md_path}")
+    else:
+        print(f"README.md 内容未变化，跳过写入：{output_md_path}")
     return output_md_path
 
-def process_all_artists_interactive(base_folder, scan_mode):
+def process_all_artists_interactive(base_folder, scan_mode, cache=None, catalog=None, tag_cache=None):
     """
-    遍历 base_folder 下的所有歌手文件夹，
+    遍历 base_folder（一个或多个根目录）下的所有歌手文件夹，
     对每个歌手执行 scan → CSV → Markdown，
     并在交互时让用户选择是否处理。
     """
     results = {}
     process_all = False  # 标志位：如果用户选择全部处理，就跳过交互
+    roots = as_folders(base_folder)
 
-    for artist in os.listdir(base_folder):
-        artist_folder = os.path.join(base_folder, artist)
-        if not os.path.isdir(artist_folder):
-            continue  # 跳过非文件夹
-
+    for artist, artist_folders in iter_artist_folders(roots):
         if not process_all:
             choice = input(f"\n=== 检测到歌手: {artist}，是否处理？(Y/N/A[全部处理]) >>> ").strip().lower()
             if choice == 'n':
@@ -358,13 +970,8 @@ def process_all_artists_interactive(base_folder, scan_mode):
 
         print(f"\n🎶 开始处理歌手: {artist} ...")
         try:
-            all_tracks = scan_artist_folder(artist_folder)
-            csv_path = generate_csv(all_tracks, artist_folder, scan_mode)
-            md_path = csv_to_markdown_grouped(csv_path)
-            results[artist] = {
-                "csv": csv_path,
-                "markdown": md_path
-            }
+            results[artist] = process_artist(artist_folders, scan_mode, cache=cache, catalog=catalog,
+                                             tag_cache=tag_cache, roots=roots)
             print(f"✅ {artist} 处理完成！")
         except Exception as e:
             print(f"❌ {artist} 处理失败: {e}")
@@ -373,59 +980,259 @@ def process_all_artists_interactive(base_folder, scan_mode):
     print("\n🎉 所有歌手处理完成！")
     return results
 
-def scan_and_export_summary(folder_path):
+def process_artist(artist_folder, scan_mode, policy="ask", report=None, cache=None, catalog=None,
+                   tag_cache=None, tracks=None, roots=None):
+    """
+    对单个歌手执行 scan → CSV → Markdown，返回 results 中该歌手的条目。
+    artist_folder: 歌手目录，或多个根目录下同名歌手目录的列表（合并到同一个 List/<歌手>）
+    tag_cache 不为 None 时读取内嵌标签覆盖文件名解析结果；set_video_probe 启用时探测演唱会视频。
+    tracks: 可选，已由 scan_artists_async 扫描好的 Track 列表，给出时跳过扫描
+    roots: 本次运行的根目录列表（Root 列使用），默认为各歌手目录的上级目录
+    """
+    folders = as_folders(artist_folder)
+    artist = os.path.basename(os.path.normpath(folders[0]))
+    if roots is None:
+        roots = [os.path.dirname(os.path.normpath(folder)) for folder in folders]
+    with profile_artist(artist):
+        if tracks is not None:
+            all_tracks = tracks
+        elif _stream_spill_rows is not None and tag_cache is None and catalog is None:
+            # 流式差异：边扫描边外部排序
+            all_tracks = chain.from_iterable(iter_artist_tracks(folder, cache=cache) for folder in folders)
+        else:
+            with profile_phase("scan", artist):
+                all_tracks = [t for folder in folders for t in scan_artist_folder(folder, cache=cache)]
+        if tag_cache is not None:
+            with profile_phase("tags", artist):
+                all_tracks = apply_tags(all_tracks, cache=tag_cache)
+        media = None
+        if _video_cache is not None:
+            all_tracks = list(all_tracks)
+            with profile_phase("probe", artist):
+                media = probe_live_tracks(all_tracks, cache=_video_cache) or None
+        if report is None:
+            report = {}
+        csv_path = generate_csv(all_tracks, folders[0], scan_mode, policy=policy, report=report, catalog=catalog,
+                                roots=roots, media=media)
+        with profile_phase("markdown", artist):
+            md_path = csv_to_markdown_grouped(csv_path, records=report.pop("records", None),
+                                              media=report.pop("media", None))
+    return {
+        "csv": csv_path,
+        "markdown": md_path
+    }
+
+def print_change_report(reports, policy):
+    """打印批量模式的汇总差异报告"""
+    print(f"\n📋 汇总变更报告 (策略: {policy})")
+    changed = 0
+    for artist in sorted(reports):
+        report = reports[artist]
+        added = report.get("added", [])
+        removed = report.get("removed", [])
+        if not (added or removed):
+            continue
+        changed += 1
+        print(f"\n=== {artist}：+{len(added)}，-{len(removed)}")
+        for r in added:
+            print(f"  + Type: {r[0]}, Date: {r[1]}, Album: {r[2]}, No: {r[3]}, Name: {r[4]}")
+        for r in removed:
+            flag = "（保留）" if policy == "keep" else ""
+            print(f"  - Type: {r[0]}, Date: {r[1]}, Album: {r[2]}, No: {r[3]}, Name: {r[4]}{flag}")
+    if changed == 0:
+        print("✅ 所有歌手均没有数据更新")
+    else:
+        print(f"\n共 {changed} 位歌手有更新" + ("（dry-run，未写入文件）" if policy == "dry-run" else ""))
+
+def process_all_artists_batch(base_folder, scan_mode, policy="accept", workers=4, cache=None, catalog=None,
+                              tag_cache=None, io_limit=None, device_limits=None):
+    """
+    非交互批量模式：使用线程池并发处理 base_folder（一个或多个根目录）下的所有歌手，
+    按预设的 policy 决定是否写入，最后打印一份汇总变更报告。
+    io_limit 不为 None 时先用异步扫描器一次扫描所有歌手（每挂载点并发上限 io_limit，
+    device_limits 为个别挂载点单独设置）；多个根目录时默认使用异步扫描，各设备并发扫描、互不阻塞。
+    返回值与 process_all_artists_interactive 相同的 results dict。
+    """
+    if policy not in DECISION_POLICIES or policy == "ask":
+        raise ValueError(f"批量模式不支持策略: {policy}")
+
+    roots = as_folders(base_folder)
+    artists = sorted(iter_artist_folders(roots))
+    if io_limit is None and (len(roots) > 1 or device_limits):
+        io_limit = DEFAULT_IO_LIMIT
+
+    print(f"🚀 批量处理 {len(artists)} 位歌手 (线程数: {workers}, 策略: {policy})")
+    scanned = {}
+    if io_limit is not None:
+        print(f"⚡ 异步扫描 (每个挂载点并发 {io_limit}"
+              + "".join(f"，{path} {n}" for path, n in (device_limits or {}).items()) + ")")
+        with profile_phase("scan_async"):
+            scanned = scan_artists_async([folder for _, folders in artists for folder in folders], cache=cache,
+                                         io_limit=io_limit, device_limits=device_limits)
+    results = {}
+    reports = {artist: {} for artist, _ in artists}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_artist, artist_folders, scan_mode, policy, reports[artist], cache, catalog,
+                        tag_cache, joined_tracks(scanned, artist_folders), roots): artist
+            for artist, artist_folders in artists
+        }
+        for future in as_completed(futures):
+            artist = futures[future]
+            try:
+                results[artist] = future.result()
+            except Exception as e:
+                print(f"❌ {artist} 处理失败: {e}")
+                results[artist] = {"error": str(e)}
+
+    print_change_report(reports, policy)
+    print("\n🎉 所有歌手处理完成！")
+    return results
+
+def _scan_cloud_subfolder(folder_path, subfolder, grammar, manifest=None):
+    """
+    扫描单个 CloudMusic 子目录，返回 (entry, 是否变化)。
+    entry = {"sig", "records": [[Singer, Name, From]], "unmatched": [名称]}；
+    清单中签名一致时直接复用，不再 scandir。
+    """
+    path = os.path.join(folder_path, subfolder)
+    sig = dir_signature(path)
+    entry = manifest.lookup(subfolder, sig) if manifest is not None else None
+    if entry is not None:
+        if entry.get("unmatched"):
+            grammar.unmatched.add("cloud_file", path, entry["unmatched"])
+        return entry, False
+
+    names = [name for name, ext in (os.path.splitext(file) for file in iter_files(path)) if ext.lower() == ".mp3"]
+    parsed, unmatched = grammar.parse_listing("cloud_file", names, path)
+    records = [[f["singer"], f["title"], f["source"]] for f in parsed if f]
+    return {"sig": sig, "records": records, "unmatched": unmatched}, True
+
+def scan_cloud_folders(folder_path, manifest=None, workers=4):
+    """
+    并行扫描 CloudMusic 下的所有子目录（线程池，每个子目录一次 scandir），
+    返回 (子目录顺序, {子目录: entry}, 变化的子目录集合)。
+    变化的子目录包括签名变化 / 新增的子目录，以及清单中有但已被删除的子目录。
+    """
+    grammar = get_grammar()
+    subfolders = list(iter_subdirs(folder_path))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda sub: _scan_cloud_subfolder(folder_path, sub, grammar, manifest), subfolders))
+
+    folders = {}
+    changed = set()
+    for subfolder, (entry, is_changed) in zip(subfolders, results):
+        folders[subfolder] = entry
+        if is_changed:
+            changed.add(subfolder)
+    if manifest is not None:
+        changed |= set(manifest.folders) - set(folders)
+    return subfolders, folders, changed
+
+def scan_and_export_summary(folder_path, policy="ask", report=None, catalog=None, use_cache=True, workers=4):
     """
     扫描给定目录下的子文件夹，收集形如 '歌手-歌名_来源.mp3' 的信息，
     输出 CSV 文件到 ../List/Summary.csv
     支持增量更新：已有 Summary.csv 会与新数据对比，提示新增/删除
     CSV 字段: Singer, Name, From
+    policy / report / catalog: 同 generate_csv（写入时 report["records"] 为最终记录，
+            report["changed_singers"] 为有变化的歌手，README 只重新生成这些歌手的分区）
+    use_cache: 使用 List/.cache/cloud_manifest.json 子目录清单，只重新扫描变化的子目录；
+            Summary.csv 与清单一致时，差异只在变化的子目录上计算
+    workers: 并行扫描子目录的线程数
     """
-    records = []
-
-    def process_file(file):
-        name, ext = os.path.splitext(file)
-        if ext.lower() != ".mp3":
-            return None
-        if "-" not in name or "_" not in name:
-            return None
-        try:
-            singer, rest = name.split("-", 1)
-            track_name, source = rest.rsplit("_", 1)
-            return {"Singer": singer.strip(), "Name": track_name.strip(), "From": source.strip()}
-        except ValueError:
-            return None
+    grammar = get_grammar()
+    manifest = CloudManifest.load(salt=grammar.key) if use_cache else None
 
-    # 扫描文件夹
-    for subfolder in os.listdir(folder_path):
-        subfolder_path = os.path.join(folder_path, subfolder)
-        if os.path.isdir(subfolder_path):
-            for file in os.listdir(subfolder_path):
-                full_path = os.path.join(subfolder_path, file)
-                if os.path.isfile(full_path):
-                    record = process_file(file)
-                    if record:
-                        records.append(record)
+    # 扫描文件夹：各子目录并行扫描，mp3 文件名按规则 cloud_file 解析，未匹配的文件会被报告
+    with profile_phase("scan", CLOUD_FOLDER):
+        subfolders, folders, changed = scan_cloud_folders(folder_path, manifest, workers)
+        records = [{"Singer": singer, "Name": name, "From": source}
+                   for sub in subfolders for singer, name, source in folders[sub]["records"]]
+    if manifest is not None:
+        print(f"{manifest.summary()}，变化 {len(changed)} 个")
 
     # 输出路径
     output_dir = os.path.abspath(os.path.join(os.getcwd(), "..", "List"))
-    os.makedirs(output_dir, exist_ok=True)
     output_csv = os.path.join(output_dir, "Summary.csv")
 
     # ---------- 检查增量更新 ----------
-    old_records = []
-    if os.path.exists(output_csv):
-        with open(output_csv, "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                old_records.append(row)
-
-    old_set = {(r["Singer"], r["Name"], r["From"]) for r in old_records}
-    new_set = {(r["Singer"], r["Name"], r["From"]) for r in records}
-
-    added = new_set - old_set
-    removed = old_set - new_set
-
-    if added or removed:
+    needs_export = False
+    if catalog is not None:
+        if catalog.csv_stale(output_csv):
+            if not os.path.exists(output_csv):
+                needs_export = catalog.has_cloud()
+                if needs_export:
+                    print("🔄 Summary.csv 不存在，由曲库重新导出")
+            else:
+                if catalog.has_cloud():
+                    print("🔄 Summary.csv 与曲库不同步（在曲库之外被修改过），重新导入")
+                catalog.import_cloud_csv(output_csv)
+        old_records = None
+        with profile_phase("diff", CLOUD_FOLDER):
+            added, removed = catalog.diff_cloud(records)
+    elif manifest is not None and manifest.matches_summary(output_csv):
+        # Summary.csv 仍是上次写入的版本：只比较变化子目录的新旧记录（多重集合），不读取 Summary.csv
+        old_records = None
+        with profile_phase("diff", CLOUD_FOLDER):
+            old_changed = Counter(r for sub in changed for r in manifest.records(sub))
+            new_changed = Counter(tuple(r) for sub in changed if sub in folders for r in folders[sub]["records"])
+            added = set(new_changed - old_changed)
+            removed = set(old_changed - new_changed)
+    elif _stream_spill_rows is not None and catalog is None:
+        # 流式差异：新旧记录都外部排序后 merge-join，不在内存中同时保存旧记录与两个集合
+        old_records = None
+        with profile_phase("diff", CLOUD_FOLDER):
+            added, removed = diff_summary_stream(output_csv, records)
+    else:
+        old_records = []
+        with profile_phase("csv_read", CLOUD_FOLDER):
+            if os.path.exists(output_csv):
+                old_records = load_summary_records(output_csv)
+            profile_count("records_read", len(old_records))
+
+        with profile_phase("diff", CLOUD_FOLDER):
+            old_set = {(r["Singer"], r["Name"], r["From"]) for r in old_records}
+            new_set = {(r["Singer"], r["Name"], r["From"]) for r in records}
+
+            added = new_set - old_set
+            removed = old_set - new_set
+
+    if report is not None:
+        report["csv"] = output_csv
+        report["added"] = sorted(added)
+        report["removed"] = sorted(removed)
+
+    kept_removed = False
+
+    def save_manifest():
+        if manifest is not None:
+            manifest.update(folders, output_csv)
+            if kept_removed:
+                # Summary.csv 保留了已删除的条目，与清单中的记录不一致：下次从 Summary.csv 计算差异
+                manifest.summary_sig = None
+            manifest.save()
+
+    if not (added or removed) and policy != "dry-run":
+        save_manifest()  # 内容未变（如子目录仅被 touch），刷新清单中的签名
+
+    if needs_export and not (added or removed):
+        # Summary.csv 被删除但曲库中仍有记录：由曲库重新导出
+        if policy == "dry-run":
+            return "Null"
+        records = catalog.cloud_records()
+    elif policy != "ask":
+        if not (added or removed) or policy == "dry-run":
+            return "Null"
+        if policy == "keep":
+            if not added:
+                return "Null"
+            if old_records is None:
+                old_records = catalog.cloud_records() if catalog is not None else load_summary_records(output_csv)
+            records = old_records + [r for r in records if (r["Singer"], r["Name"], r["From"]) in added]
+            kept_removed = bool(removed)
+            removed = set()
+    elif added or removed:
         print(f"⚠️ 检测到 Summary.csv 数据更新：+{len(added)}，-{len(removed)}")
 
         if added:
@@ -446,38 +1253,105 @@ def scan_and_export_summary(folder_path):
         print(f"✅ 没有检测到 Summary.csv 数据更新")
         return "Null"
 
-    # 写入 CSV（覆盖旧文件）
-    with open(output_csv, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=["Singer", "Name", "From"])
-        writer.writeheader()
-        writer.writerows(records)
-
-    # 删除结尾多余换行
-    with open(output_csv, 'rb+') as file:
-        file.seek(-2, os.SEEK_END)
-        file.truncate()
+    records = write_summary_records(output_csv, records, catalog)
+    save_manifest()
+    if report is not None:
+        report["records"] = records
+        # 重新导出时 README 整体重新生成
+        report["changed_singers"] = None if needs_export else {r[0] for r in added | removed}
 
     return output_csv
 
-def summary_csv_to_markdown(csv_path):
-    """
-    根据 Summary.csv 生成 README.md
-    - 顶部给出“歌手统计”，每位歌手名字可点击跳转到正文
-    - 正文按歌手分区，每首歌按 Name 排序
-    输出地址：与 CSV 同目录的 README.md
-    """
-    if not csv_path or str(csv_path).lower() == "null":
-        print("⚠️ csv_path 为 Null，跳过生成 README.md")
-        output_md = "Null"
-        return output_md
-    
-    # ---------- 读取 CSV ----------
-    records = []
+def write_summary_records(output_csv, records, catalog=None):
+    """写入 Summary.csv（覆盖旧文件，曲库模式下先写入曲库再导出），随后增量更新搜索索引；返回最终记录"""
+    with profile_phase("csv_write", CLOUD_FOLDER):
+        os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+        if catalog is not None:
+            catalog.replace_cloud(records)
+            records = catalog.cloud_records()
+        if not write_summary_csv(output_csv, records):
+            print(f"✅ Summary.csv 内容未变化，跳过写入")
+        elif _pack_enabled:
+            _pack_updates[CLOUD_FOLDER] = [(r["Singer"], r["Name"], r["From"]) for r in records]
+        if catalog is not None:
+            catalog.mark_csv(output_csv)
+    if _search_index is not None:
+        with profile_phase("index", CLOUD_FOLDER):
+            _search_index.update_cloud(records)
+    return records
+
+def read_summary_csv(csv_path):
+    """读取 Summary.csv 为 dict 列表"""
+    with open(csv_path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+def iter_summary_rows(csv_path):
+    """逐行读取 Summary.csv，产出 (Singer, Name, From)"""
     with open(csv_path, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            records.append(row)
+        for r in csv.DictReader(f):
+            yield (r["Singer"], r["Name"], r["From"])
+
+def diff_summary_stream(output_csv, records):
+    """Summary.csv 按扫描顺序写出、并非有序：新旧两侧都外部排序后 merge-join，返回 (新增集合, 删除集合)"""
+    old_rows = iter_summary_rows(output_csv) if os.path.exists(output_csv) else ()
+    new_rows = ((r["Singer"], r["Name"], r["From"]) for r in records)
+    with SortedSpill(old_rows, None, _stream_spill_rows) as old_sorted, \
+            SortedSpill(new_rows, None, _stream_spill_rows) as new_sorted:
+        profile_count("records_read", len(old_sorted))
+        added, removed = collect_diff(stream_diff(old_sorted, new_sorted, None))
+    return set(added), set(removed)
+
+SINGER_HEADER_RE = re.compile(r"^## (.*) \(共 (\d+) 首\)$")
+
+def make_anchor(title):
+    """GitHub 风格锚点：小写，非字母数字替换为 -，连续 - 合并"""
+    anchor = title.strip().lower()
+    anchor = re.sub(r'[^0-9a-zA-Z\u4e00-\u9fff]+', '-', anchor)
+    anchor = re.sub(r'-+', '-', anchor).strip('-')
+    return anchor
+
+def render_singer_section(singer, singer_records):
+    """单个歌手分区的行列表（标题、空行、按 Name 排序的曲目、分段空行）"""
+    lines = [f"## {singer} (共 {len(singer_records)} 首)", ""]
+    for r in sorted(singer_records, key=lambda x: x["Name"]):
+        link = _cloud_links.for_cloud(r) if _cloud_links is not None else None
+        lines.append(f"- {r['Name']} （{r['From']}）" + (format_cloud_link(link) if link else ""))
+    lines.append("")
+    return lines
 
+def format_cloud_link(link):
+    """Summary README 中曲目对应的歌手目录条目（match 子命令的结果），近似匹配标注 ≈"""
+    artist, (Type, Date, Album, No, Name), score = link
+    mark = "↔" if score >= 1.0 else "≈"
+    if Type == "album":
+        return f" {mark} 📀 {artist} · ({Date}) {Album} [{No.zfill(3)}]"
+    return f" {mark} 🎵 {artist} · [{Type}] {Date} {Name}"
+
+def parse_singer_sections(text):
+    """
+    从已生成的 Summary README 中拆出各歌手分区：{歌手: (曲目数, 行列表)}。
+    末尾分区在生成时去掉了结尾空行，这里补回，保证复用后输出与完整生成一致。
+    """
+    sections = {}
+    current = None
+    for line in text.split("\n"):
+        m = SINGER_HEADER_RE.match(line)
+        if m:
+            current = (m.group(1), int(m.group(2)), [])
+            sections[current[0]] = current[1:]
+        if current is not None:
+            current[2].append(line)
+    if current is not None:
+        current[2].append("")
+    return sections
+
+def render_summary_markdown(records, previous=None, changed=None, stats_block=None):
+    """
+    由 Summary 记录在内存中生成 README.md 文本（末尾无换行）。
+    previous / changed: 可选，上一版 README 文本与有变化的歌手集合；
+    未变化且曲目数一致的歌手分区直接复用上一版文本，只重新生成变化的分区。
+    stats_block: 可选，stats 子命令生成的曲库统计分区，放在总计之后、歌手分区之前
+    """
     # ---------- 按歌手分组 ----------
     grouped = defaultdict(list)
     for r in records:
@@ -485,24 +1359,21 @@ def summary_csv_to_markdown(csv_path):
 
     singers = sorted(grouped.keys())
     total_tracks = sum(len(grouped[s]) for s in singers)
+    reusable = parse_singer_sections(previous) if previous is not None and changed is not None else {}
 
     # ---------- 生成正文内容 ----------
     content_lines = []
+    rendered = 0
     for singer in singers:
-        content_lines.append(f"## {singer} (共 {len(grouped[singer])} 首)")
-        content_lines.append("")  # 空行
-        for r in sorted(grouped[singer], key=lambda x: x["Name"]):
-            content_lines.append(f"- {r['Name']} （{r['From']}）")
-        content_lines.append("")  # 分段空行
+        old = reusable.get(singer)
+        if old is not None and singer not in changed and old[0] == len(grouped[singer]):
+            content_lines.extend(old[1])
+        else:
+            content_lines.extend(render_singer_section(singer, grouped[singer]))
+            rendered += 1
+    profile_count("sections_rendered", rendered)
 
     # ---------- 构建统计表，可点击跳转 ----------
-    def make_anchor(title):
-        """GitHub 风格锚点：小写，非字母数字替换为 -，连续 - 合并"""
-        anchor = title.strip().lower()
-        anchor = re.sub(r'[^0-9a-zA-Z\u4e00-\u9fff]+', '-', anchor)
-        anchor = re.sub(r'-+', '-', anchor).strip('-')
-        return anchor
-
     lines = []
     lines.append("# 🎶 歌手歌曲汇总")
     lines.append("")
@@ -514,57 +1385,697 @@ def summary_csv_to_markdown(csv_path):
     lines.append("")
     lines.append(f"**总计：{total_tracks} 首**")
     lines.append("")
+    if stats_block:
+        lines.append(stats_block)
+        lines.append("")
 
     # ---------- 拼接正文 ----------
     lines.extend(content_lines)
+    return "\n".join(lines).strip()
+
+STATS_BEGIN = "<!-- stats:begin -->"
+STATS_END = "<!-- stats:end -->"
+STATS_BLOCK_RE = re.compile(re.escape(STATS_BEGIN) + r".*?" + re.escape(STATS_END), re.DOTALL)
+
+def extract_stats_block(text):
+    m = STATS_BLOCK_RE.search(text)
+    return m.group(0) if m else None
+
+def summary_csv_to_markdown(csv_path, records=None, changed=None):
+    """
+    根据 Summary.csv 生成 README.md
+    - 顶部给出“歌手统计”，每位歌手名字可点击跳转到正文
+    - 正文按歌手分区，每首歌按 Name 排序
+    输出地址：与 CSV 同目录的 README.md
+    records: 可选，scan_and_export_summary 刚写入的记录；给出时不再重新读取 CSV
+    changed: 可选，有变化的歌手集合；给出时只重新生成这些歌手的分区，其余复用已有 README
+    """
+    if not csv_path or str(csv_path).lower() == "null":
+        print("⚠️ csv_path 为 Null，跳过生成 README.md")
+        output_md = "Null"
+        return output_md
+
+    if records is None:
+        records = load_summary_records(csv_path)
+        profile_count("records_read", len(records))
 
-    # ---------- 写入 Markdown 文件 ----------
     output_md = os.path.join(os.path.dirname(csv_path), "README.md")
-    with open(output_md, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines).strip() + "\n")
-       
-    # 删除结尾多余换行
-    with open(output_md, 'rb+') as file:
-        file.seek(-2, os.SEEK_END)
-        file.truncate()
-
-    print(f"✅ README.md 已生成: {output_md}")
+    previous = None
+    if os.path.exists(output_md):
+        with open(output_md, "r", encoding="utf-8") as f:
+            previous = f.read()
+    # stats 子命令写入的统计分区原样保留，直到下一次运行 stats
+    stats_block = extract_stats_block(previous) if previous is not None else None
+    text = render_summary_markdown(records, previous if changed is not None else None, changed, stats_block)
+    if write_output(output_md, text):
+        print(f"✅ README.md 已生成: {output_md}")
+    else:
+        print(f"✅ README.md 内容未变化，跳过写入: {output_md}")
     return output_md
 
-def mode_s(base_folder, scan_mode):
-    print(f"▶️ 启动模式 S，路径：{base_folder}")
-    print(f"▶️ 启动模式 S，扫描方式：{scan_mode}")
-    artist = os.path.basename(base_folder.rstrip("/"))
-    print(f"▶️ 启动模式 S，处理歌手: {artist} (路径: {base_folder})")
+def load_scan_cache(use_cache):
+    """按需加载扫描缓存；use_cache=False 时返回 None"""
+    return ScanCache.load() if use_cache else None
 
-    if not os.path.isdir(base_folder):
-        print(f"❌ 错误: {base_folder} 不是有效文件夹")
+def save_scan_cache(cache):
+    if cache is None:
         return
+    cache.save()
+    print(cache.summary())
+
+def load_tag_cache_if(use_tags):
+    """use_tags=True 时加载标签缓存，否则返回 None（不读取标签）"""
+    return load_tag_cache() if use_tags else None
+
+def save_tag_cache(tag_cache):
+    if tag_cache is None:
+        return
+    tag_cache.save()
+    print(tag_cache.summary("标签"))
+
+def mode_s(base_folder, scan_mode, use_cache=True, catalog=None, use_tags=False, io_limit=None,
+           device_limits=None):
+    """base_folder 可为多个根目录下的同名歌手目录（列表），合并到同一个 List/<歌手>"""
+    folders = [folder.rstrip("/") or "/" for folder in as_folders(base_folder)]
+    print(f"▶️ 启动模式 S，路径：{'、'.join(folders)}")
+    print(f"▶️ 启动模式 S，扫描方式：{scan_mode}")
+    artist = os.path.basename(folders[0])
+    print(f"▶️ 启动模式 S，处理歌手: {artist} (路径: {'、'.join(folders)})")
+
+    for folder in folders:
+        if not os.path.isdir(folder):
+            print(f"❌ 错误: {folder} 不是有效文件夹")
+            return
+    if any(os.path.basename(folder) != artist for folder in folders):
+        print(f"❌ 错误: 多个路径须为同名歌手目录: {'、'.join(folders)}")
+        return
+    if io_limit is None and device_limits:
+        io_limit = DEFAULT_IO_LIMIT
 
     results = {}
+    cache = load_scan_cache(use_cache)
+    tag_cache = load_tag_cache_if(use_tags)
 
     try:
         print(f"\n🎶 开始处理歌手: {artist} ...")
-        all_tracks = scan_artist_folder(base_folder)   # 扫描歌手文件夹
-        csv_path = generate_csv(all_tracks, base_folder, scan_mode)  # 生成 CSV
-        md_path = csv_to_markdown_grouped(csv_path)       # 生成 Markdown
-
-        results[artist] = {
-            "csv": csv_path,
-            "markdown": md_path
-        }
+        tracks = None
+        if io_limit is not None:
+            with profile_phase("scan_async", artist):
+                tracks = joined_tracks(scan_artists_async(folders, cache=cache, io_limit=io_limit,
+                                                          device_limits=device_limits), folders)
+        results[artist] = process_artist(folders, scan_mode, cache=cache, catalog=catalog,
+                                         tag_cache=tag_cache, tracks=tracks)   # 扫描 → CSV → Markdown
         print(f"✅ {artist} 处理完成！")
     except Exception as e:
         print(f"❌ {artist} 处理失败: {e}")
         results[artist] = {"error": str(e)}
 
+    save_scan_cache(cache)
+    save_tag_cache(tag_cache)
+    print_unmatched_report()
     return results
 
-def mode_a(base_folder, scan_mode):
-    print(f"▶️ 启动模式 A：扫描目录 {base_folder}")
-    process_all_artists_interactive(base_folder, scan_mode)
+def mode_a(base_folder, scan_mode, policy="ask", workers=4, use_cache=True, catalog=None, use_tags=False,
+           io_limit=None, device_limits=None):
+    """base_folder 可为多个根目录（列表），各根目录下的同名歌手合并，CSV 的 Root 列记录每行来自哪个根目录"""
+    print(f"▶️ 启动模式 A：扫描目录 {'、'.join(as_folders(base_folder))}")
+    cache = load_scan_cache(use_cache)
+    tag_cache = load_tag_cache_if(use_tags)
+    if policy == "ask":
+        results = process_all_artists_interactive(base_folder, scan_mode, cache=cache, catalog=catalog,
+                                                  tag_cache=tag_cache)
+    else:
+        results = process_all_artists_batch(base_folder, scan_mode, policy=policy, workers=workers,
+                                            cache=cache, catalog=catalog, tag_cache=tag_cache, io_limit=io_limit,
+                                            device_limits=device_limits)
+    save_scan_cache(cache)
+    save_tag_cache(tag_cache)
+    print_unmatched_report()
+    return results
 
-def mode_c(base_folder):
+def mode_c(base_folder, policy="ask", catalog=None, use_cache=True, workers=4):
+    """
+    模式 C：并行扫描 CloudMusic 子目录 → 合并变化的子目录到 Summary.csv → 只重新生成变化的歌手分区
+    """
     print(f"▶️ 启动模式 C：处理 Cloud Music {base_folder}/CloudMusic")
-    csv_path = scan_and_export_summary(f"{base_folder}/CloudMusic")
-    summary_csv_to_markdown(csv_path)
\ No newline at end of file
+    report = {}
+    csv_path = scan_and_export_summary(f"{base_folder}/CloudMusic", policy=policy, report=report, catalog=catalog,
+                                       use_cache=use_cache, workers=workers)
+    with profile_phase("markdown", CLOUD_FOLDER):
+        summary_csv_to_markdown(csv_path, records=report.get("records"), changed=report.get("changed_singers"))
+    print_unmatched_report()
+
+def mode_watch(base_folder, scan_mode, policy="accept", debounce=2.0, poll_interval=5.0,
+               force_poll=False, use_cache=True, catalog=None, use_tags=False):
+    """
+    监听模式：常驻监视音乐根目录，事件在 debounce 秒内合并后，
+    只对发生变化的歌手目录重新执行 scan → CSV → Markdown，
+    CloudMusic 变化时走模式 C 更新 List/Summary.csv。
+    """
+    if policy == "ask":
+        print("⚠️ 监听模式无法交互询问，改用 accept 策略")
+        policy = "accept"
+    cache = load_scan_cache(use_cache)
+    tag_cache = load_tag_cache_if(use_tags)
+
+    def on_change(names):
+        artists = sorted(n for n in names if n != CLOUD_FOLDER)
+        print(f"\n🔔 检测到变化: {', '.join(sorted(names))}")
+        reports = {}
+        for artist in artists:
+            artist_folder = os.path.join(base_folder, artist)
+            if not os.path.isdir(artist_folder):
+                print(f"⏭️ {artist} 已不存在，跳过")
+                continue
+            reports[artist] = {}
+            try:
+                process_artist(artist_folder, scan_mode, policy, reports[artist], cache, catalog, tag_cache)
+            except Exception as e:
+                print(f"❌ {artist} 处理失败: {e}")
+        if reports:
+            print_change_report(reports, policy)
+            save_scan_cache(cache)
+            save_tag_cache(tag_cache)
+            save_video_probe()
+            print_unmatched_report()
+        if CLOUD_FOLDER in names and os.path.isdir(os.path.join(base_folder, CLOUD_FOLDER)):
+            mode_c(base_folder, policy=policy, catalog=catalog, use_cache=use_cache)
+        if policy != "dry-run":
+            refresh_packed_catalog()
+
+    print(f"👀 启动监听模式：{base_folder} (防抖 {debounce}s, 策略: {policy})")
+    watch_library(base_folder, on_change, debounce=debounce,
+                  poll_interval=poll_interval, force_poll=force_poll)
+
+# ---------- 两阶段更新：plan 扫描并生成变更集，apply 按审核后的变更集写入（不重新扫描） ----------
+# 变更集为 JSON Lines：首行为 {"kind": "plan", ...}，其后每行一个有变化的歌手 / CloudMusic：
+#   {"kind": "artist" | "cloud", "name", "csv", "mode": "All" | "Partial", "base": [mtime_ns, size] | null,
+#    "added": [[...]], "removed": [[...]]}
+# 审核时可直接删除不想应用的行或条目；base 为 plan 时 CSV 的签名，apply 时不一致则跳过该行。
+CHANGESET_VERSION = 1
+SUMMARY_FIELDS = ["Singer", "Name", "From"]
+
+def default_changeset_path():
+    return os.path.join(default_cache_dir(), "changeset.jsonl")
+
+def changeset_entry(kind, name, report, mode):
+    return {"kind": kind, "name": name, "csv": report["csv"], "mode": mode,
+            "base": file_signature(report["csv"]),
+            "added": [list(r) for r in report["added"]], "removed": [list(r) for r in report["removed"]]}
+
+def plan_library(base_folder, scan_mode="Partial", out_path=None, workers=4, use_cache=True, catalog=None,
+                 use_tags=False, io_limit=None, include_cloud=True):
+    """
+    扫描所有歌手（及 CloudMusic），只计算差异，不写任何 CSV / README，
+    将有变化的条目写入变更集 out_path（默认 List/.cache/changeset.jsonl）。返回变更集路径。
+    """
+    out_path = out_path or default_changeset_path()
+    cache = load_scan_cache(use_cache)
+    tag_cache = load_tag_cache_if(use_tags)
+    artists = [(artist, os.path.join(base_folder, artist))
+               for artist in sorted(iter_subdirs(base_folder)) if artist != CLOUD_FOLDER]
+    print(f"📝 plan：扫描 {len(artists)} 位歌手 (线程数: {workers}, 扫描方式: {scan_mode})")
+
+    scanned = {}
+    if io_limit is not None:
+        with profile_phase("scan_async"):
+            scanned = scan_artists_async([folder for _, folder in artists], cache=cache, io_limit=io_limit)
+
+    def plan_artist(artist, artist_folder):
+        with profile_artist(artist):
+            tracks = scanned.get(artist_folder)
+            if tracks is None:
+                with profile_phase("scan", artist):
+                    tracks = scan_artist_folder(artist_folder, cache=cache)
+            if tag_cache is not None:
+                with profile_phase("tags", artist):
+                    tracks = apply_tags(tracks, cache=tag_cache)
+            report = {}
+            generate_csv(tracks, artist_folder, scan_mode, policy="dry-run", report=report, catalog=catalog)
+            return report
+
+    entries = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(artist, pool.submit(plan_artist, artist, folder)) for artist, folder in artists]
+        for artist, future in futures:
+            try:
+                report = future.result()
+            except Exception as e:
+                print(f"❌ {artist} 扫描失败: {e}")
+                continue
+            if report["added"] or report["removed"]:
+                entries.append(changeset_entry("artist", artist, report, scan_mode))
+
+    cloud_folder = os.path.join(base_folder, CLOUD_FOLDER)
+    if include_cloud and os.path.isdir(cloud_folder):
+        report = {}
+        scan_and_export_summary(cloud_folder, policy="dry-run", report=report, catalog=catalog,
+                                use_cache=use_cache, workers=workers)
+        if report["added"] or report["removed"]:
+            entries.append(changeset_entry("cloud", CLOUD_FOLDER, report, "All"))
+
+    save_scan_cache(cache)
+    save_tag_cache(tag_cache)
+    print_unmatched_report()
+
+    header = {"kind": "plan", "version": CHANGESET_VERSION, "root": os.path.abspath(base_folder),
+              "mode": scan_mode, "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    lines = [json.dumps(item, ensure_ascii=False, separators=(",", ":")) for item in [header] + entries]
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    write_output(out_path, "\n".join(lines) + "\n")
+
+    print(f"\n📋 变更集 ({len(entries)} 项)：")
+    for entry in entries:
+        removed = len(entry["removed"]) if entry["mode"] == "All" else 0
+        note = "" if removed or not entry["removed"] else f"（Partial：{len(entry['removed'])} 条删除不应用）"
+        print(f"  {entry['name']}: +{len(entry['added'])} -{removed}{note}")
+    print(f"💾 变更集已写入: {out_path}")
+    return out_path
+
+def load_changeset(path):
+    """读取变更集，返回 (首行, 条目列表)；格式不符时抛出 ValueError"""
+    with open(path, "r", encoding="utf-8") as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    if not items or items[0].get("kind") != "plan" or items[0].get("version") != CHANGESET_VERSION:
+        raise ValueError(f"不是有效的变更集: {path}")
+    return items[0], items[1:]
+
+def apply_delta(old_rows, added, removed):
+    """old_rows 中按多重集合去掉 removed，再追加 old_rows 中不存在的 added，保持原有顺序"""
+    pending = Counter(removed)
+    rows = []
+    for row in old_rows:
+        if pending[tuple(row)] > 0:
+            pending[tuple(row)] -= 1
+            continue
+        rows.append(row)
+    existing = set(rows)
+    for row in added:
+        if row not in existing:
+            rows.append(row)
+            existing.add(row)
+    return rows
+
+def _apply_artist_entry(entry, catalog=None):
+    artist, csv_file = entry["name"], entry["csv"]
+    with profile_artist(artist):
+        with profile_phase("csv_read", artist):
+            # CSV 在曲库之外被修改过时以 CSV 为准；CSV 不存在时沿用曲库
+            if catalog is not None and catalog.has_artist(artist) and not (
+                    os.path.exists(csv_file) and catalog.csv_stale(csv_file)):
+                old_records = catalog.artist_records(artist)
+                roots, media = None, None
+                if any(has_artist_columns(read_artist_header(csv_file))):
+                    _, roots, media = read_artist_table(csv_file)
+            else:
+                old_records, roots, media = load_artist_table(csv_file)
+                profile_count("records_read", len(old_records))
+        removed = [tuple(r) for r in entry["removed"]] if entry["mode"] == "All" else []
+        kept = apply_delta(old_records, [], removed)
+        existing = set(kept)
+        additions = [r for r in dict.fromkeys(make_record(*r) for r in entry["added"]) if r not in existing]
+        with profile_phase("sort", artist):
+            final_records = merge_sorted_records(kept, additions)
+        final_records = write_artist_records(artist, csv_file, final_records, catalog, presorted=True,
+                                             roots=roots, media=media)
+        with profile_phase("markdown", artist):
+            csv_to_markdown_grouped(csv_file, records=final_records, media=media)
+
+def _apply_cloud_entry(entry, catalog=None):
+    csv_file = entry["csv"]
+    with profile_phase("csv_read", CLOUD_FOLDER):
+        if catalog is not None and catalog.has_cloud() and not (os.path.exists(csv_file) and catalog.csv_stale(csv_file)):
+            old_records = catalog.cloud_records()
+        elif os.path.exists(csv_file):
+            old_records = load_summary_records(csv_file)
+            profile_count("records_read", len(old_records))
+        else:
+            old_records = []
+    added = [tuple(r) for r in entry["added"]]
+    removed = [tuple(r) for r in entry["removed"]] if entry["mode"] == "All" else []
+    rows = apply_delta([tuple(r[f] for f in SUMMARY_FIELDS) for r in old_records], added, removed)
+    records = write_summary_records(csv_file, [dict(zip(SUMMARY_FIELDS, row)) for row in rows], catalog)
+    with profile_phase("markdown", CLOUD_FOLDER):
+        summary_csv_to_markdown(csv_file, records=records, changed={r[0] for r in added + removed})
+
+def apply_changeset(path=None, catalog=None, force=False):
+    """
+    按变更集写入受影响的 CSV / README，不重新扫描。
+    plan 之后 CSV 已被改动的条目默认跳过，force=True 时仍然应用。
+    """
+    path = path or default_changeset_path()
+    header, entries = load_changeset(path)
+    print(f"▶️ apply：{path} (plan 于 {header.get('created')}，{len(entries)} 项)")
+    applied = skipped = 0
+    for entry in entries:
+        if not force and file_signature(entry["csv"]) != entry["base"]:
+            print(f"⚠️ {entry['name']}: {entry['csv']} 在 plan 之后被修改，跳过（--force 强制应用）")
+            skipped += 1
+            continue
+        try:
+            if entry["kind"] == "artist":
+                _apply_artist_entry(entry, catalog)
+            elif entry["kind"] == "cloud":
+                _apply_cloud_entry(entry, catalog)
+            else:
+                print(f"⚠️ 未知的条目类型: {entry['kind']}，跳过")
+                skipped += 1
+                continue
+        except Exception as e:
+            print(f"❌ {entry['name']} 应用失败: {e}")
+            skipped += 1
+            continue
+        applied += 1
+    print(f"\n🎉 已应用 {applied} 项，跳过 {skipped} 项")
+    return applied, skipped
+
+# ---------- 曲库快照：Merkle 树比较 NAS 与本地副本 ----------
+def snapshot_library(base_folder, out_path=None, workers=4):
+    """为曲库建立 Merkle 快照并保存，返回快照路径"""
+    t0 = time.perf_counter()
+    snapshot = build_snapshot(base_folder, workers)
+    path = save_snapshot(snapshot, out_path)
+    files = count_files(snapshot["tree"])
+    print(f"📸 快照：{snapshot['root']}，{files} 个文件 ({time.perf_counter() - t0:.2f} s)")
+    print(f"💾 已保存: {path} ({os.path.getsize(path)} 字节)")
+    return path
+
+def format_snapshot_change(op, path, detail):
+    """单条快照差异的显示格式"""
+    where = "/".join(path)
+    if op in ("+dir", "-dir"):
+        return f"  {'➕' if op == '+dir' else '➖'} [{layout_label(path)}] {where}/ ({detail} 个文件)"
+    label = layout_label(path[:-1])
+    if op == "~file":
+        (old_size, old_mtime), (new_size, new_mtime) = detail
+        change = f"大小 {old_size} → {new_size}" if old_size != new_size else \
+            f"修改时间 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(old_mtime))} → " \
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(new_mtime))}"
+        return f"  ✏️ [{label}] {where} ({change})"
+    return f"  {'➕' if op == '+file' else '➖'} [{label}] {where}"
+
+def compare_libraries(source_a, source_b, ignore_mtime=False, workers=4, limit=None):
+    """
+    比较两个快照文件或曲库目录（目录会现场建立快照）。
+    只进入哈希不同的子树，耗时与差异规模成正比。返回差异条数。
+    """
+    a = open_snapshot(source_a, workers)
+    b = open_snapshot(source_b, workers)
+    print(f"🔍 比较 A: {a['root']} ({a['created']})")
+    print(f"        B: {b['root']} ({b['created']})" + ("，忽略修改时间" if ignore_mtime else ""))
+
+    stats = {}
+    t0 = time.perf_counter()
+    changes = 0
+    for op, path, detail in diff_trees(a["tree"], b["tree"], ignore_mtime, stats):
+        changes += 1
+        if limit is None or changes <= limit:
+            print(format_snapshot_change(op, path, detail))
+    elapsed = (time.perf_counter() - t0) * 1000
+    if limit is not None and changes > limit:
+        print(f"  ... 另有 {changes - limit} 条差异未显示")
+    if changes == 0:
+        print("✅ 两个副本一致")
+    else:
+        print(f"⚠️ 共 {changes} 条差异（➖ 只在 A，➕ 只在 B，✏️ 两侧不同）")
+    print(f"⏱️ 比较访问 {stats.get('visited', 0)} 个目录 ({elapsed:.1f} ms)")
+    return changes
+
+# ---------- 重复文件：歌手目录与 CloudMusic 之间内容完全相同的文件 ----------
+def collect_catalog_files(base_folder, cache=None):
+    """
+    列出曲库中的媒体文件及其对应的目录行，返回 {path: link}：
+        歌手文件 link = {"kind": "artist", "artist": 歌手, "record": Record}（extract_tracks 的结果）
+        CloudMusic link = {"kind": "cloud", "row": {Singer, Name, From} 或 None}（与 Summary.csv 相同的解析）
+    """
+    links = {}
+    for artist in sorted(iter_subdirs(base_folder)):
+        if artist == CLOUD_FOLDER:
+            continue
+        for t in scan_artist_folder(os.path.join(base_folder, artist), cache=cache):
+            links[os.path.join(t.folder, t.file_name)] = {"kind": "artist", "artist": artist,
+                                                          "record": track_to_record(t)}
+    cloud_folder = os.path.join(base_folder, CLOUD_FOLDER)
+    if os.path.isdir(cloud_folder):
+        grammar = get_grammar()
+        for subfolder, file in iter_cloud_files(cloud_folder):
+            stem, ext = os.path.splitext(file)
+            if ext.lower() not in AUDIO_EXTS | VIDEO_EXTS:
+                continue
+            fields = grammar.parse("cloud_file", stem) if ext.lower() == ".mp3" else None
+            row = {"Singer": fields["singer"], "Name": fields["title"], "From": fields["source"]} if fields else None
+            links[os.path.join(cloud_folder, subfolder, file)] = {"kind": "cloud", "row": row}
+    return links
+
+def format_catalog_link(link):
+    """重复文件对应的目录行（歌手 CSV / Summary.csv 中的一行）"""
+    if link["kind"] == "cloud":
+        r = link["row"]
+        return f"☁️ [cloud] {r['Singer']} · {r['Name']} （{r['From']}）" if r else "☁️ [cloud] (未匹配命名规则)"
+    r = link["record"]
+    if r.Type == "album":
+        return f"🎵 [album] {link['artist']} · ({r.Date}) {r.Album} · [{r.No}] {r.Name}"
+    return f"🎵 [{r.Type}] {link['artist']} · [{r.Date}] {r.Name}"
+
+def link_title(link):
+    if link["kind"] == "cloud":
+        return link["row"]["Name"] if link["row"] else None
+    return link["record"].Name
+
+def format_size(n):
+    """字节数 → 可读大小"""
+    if n < 1024:
+        return f"{n} B"
+    for unit in ("KB", "MB", "GB"):
+        n /= 1024
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}"
+
+def render_duplicates_markdown(base_folder, groups, links, files):
+    """重复文件报告 Markdown（末尾无换行）；内容只取决于重复组，结果不变时不会重写"""
+    wasted = sum(size * (len(paths) - 1) for size, _, paths in groups)
+    parts = ["# 🔁 重复文件报告\n\n",
+             f"{files} 个文件中共 {len(groups)} 组重复，可释放 {format_size(wasted)}\n\n"]
+    for i, (size, digest, paths) in enumerate(groups, 1):
+        title = next((t for t in (link_title(links[p]) for p in paths) if t), os.path.basename(paths[0]))
+        parts.append(f"## {i}. {title} ({len(paths)} 份，每份 {format_size(size)})\n\n")
+        for path in paths:
+            parts.append(f"- {format_catalog_link(links[path])} — `{os.path.relpath(path, base_folder)}`\n")
+        parts.append("\n")
+    return "".join(parts).rstrip("\n")
+
+def find_duplicates(base_folder, out_path=None, workers=4, use_cache=True, min_size=1):
+    """
+    查找歌手目录与 CloudMusic 中内容完全相同的文件（大小 → 首尾哈希 → 全文哈希，进程池计算），
+    报告写入 ../List/Duplicates.md，每个文件关联到它在歌手 CSV / Summary.csv 中的行。
+    哈希按 (path, mtime, size) 缓存在 List/.cache/hashes.json，再次运行几乎不读文件。
+    返回重复组列表。
+    """
+    cache = load_scan_cache(use_cache)
+    hash_cache = load_hash_cache() if use_cache else None
+    with profile_phase("scan"):
+        links = collect_catalog_files(base_folder, cache)
+    stats = {}
+    with profile_phase("hash"):
+        groups = find_duplicate_groups(links, cache=hash_cache, workers=workers, min_size=min_size, stats=stats)
+    save_scan_cache(cache)
+    if hash_cache is not None:
+        hash_cache.save()
+        print(hash_cache.summary("哈希"))
+
+    out_path = out_path or os.path.abspath(os.path.join(os.getcwd(), "..", "List", "Duplicates.md"))
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    write_output(out_path, render_duplicates_markdown(base_folder, groups, links, stats.get("files", 0)))
+    wasted = sum(size * (len(paths) - 1) for size, _, paths in groups)
+    print(f"🔁 {stats.get('files', 0)} 个文件中发现 {len(groups)} 组重复，可释放 {format_size(wasted)}"
+          f"（首尾哈希 {stats.get('edge_hashed', 0)} 个，全文哈希 {stats.get('full_hashed', 0)} 个）")
+    print(f"📄 报告: {out_path}")
+    return groups
+
+# ---------- CloudMusic ↔ 歌手曲目匹配：覆盖报告与 README 标注 ----------
+def load_list_catalogs(list_dir):
+    """读取 List 下所有歌手 CSV：{歌手: [Record]}（跳过 CloudMusic 与 .cache）"""
+    catalogs = {}
+    for artist in sorted(os.listdir(list_dir)):
+        if artist == CLOUD_FOLDER or artist.startswith("."):
+            continue
+        csv_file = os.path.join(list_dir, artist, f"{artist}.csv")
+        if os.path.isfile(csv_file):
+            catalogs[artist] = load_artist_records(csv_file)
+    return catalogs
+
+def render_coverage_markdown(summary_records, links, matcher):
+    """覆盖报告 Markdown（末尾无换行）：每位歌手 CloudMusic 中有多少首已有专辑 / 单曲 / 演唱会收录"""
+    per_singer = defaultdict(lambda: [0, []])
+    missing_artists = defaultdict(int)
+    for r in summary_records:
+        artist = matcher.artist_of(r["Singer"])
+        if artist is None:
+            missing_artists[r["Singer"]] += 1
+            continue
+        entry = per_singer[r["Singer"]]
+        entry[0] += 1
+        if links.for_cloud(r) is None:
+            entry[1].append(r)
+
+    total = len(summary_records)
+    covered = len(links.cloud)
+    in_library = sum(entry[0] for entry in per_singer.values())
+    parts = ["# 🔗 CloudMusic 覆盖报告\n\n",
+             f"CloudMusic 共 {total} 首，{covered} 首已在歌手目录中收录；"
+             f"{total - in_library} 首的歌手没有歌手目录\n\n"]
+    if per_singer:
+        parts.append("## 歌手覆盖\n\n| 歌手 | CloudMusic | 已收录 | 覆盖率 |\n| --- | ---: | ---: | ---: |\n")
+        for singer in sorted(per_singer):
+            count, missing = per_singer[singer]
+            parts.append(f"| {singer} | {count} | {count - len(missing)} | {(count - len(missing)) / count:.0%} |\n")
+        parts.append("\n")
+    uncovered = [singer for singer in sorted(per_singer) if per_singer[singer][1]]
+    if uncovered:
+        parts.append("## 未收录的曲目\n\n")
+        for singer in uncovered:
+            parts.append(f"### {singer}\n\n")
+            for r in sorted(per_singer[singer][1], key=lambda x: (x["Name"], x["From"])):
+                parts.append(f"- {r['Name']} （{r['From']}）\n")
+            parts.append("\n")
+    if missing_artists:
+        parts.append("## 没有歌手目录的歌手\n\n")
+        for singer in sorted(missing_artists):
+            parts.append(f"- {singer}：{missing_artists[singer]} 首\n")
+        parts.append("\n")
+    return "".join(parts).rstrip("\n")
+
+def match_library(min_score=MIN_SCORE, clear=False):
+    """
+    将 Summary.csv 的条目与各歌手 CSV 交叉匹配（按歌手分块 + bigram 候选，接近线性），
+    结果保存到 List/.cache/cloud_links.json，覆盖报告写入 List/Coverage.md，
+    并重新生成所有 README：歌手 README 标注 CloudMusic 来源，Summary README 标注对应的专辑曲目。
+    clear=True 时删除匹配结果并去掉 README 中的标注。
+    """
+    list_dir = os.path.abspath(os.path.join(os.getcwd(), "..", "List"))
+    summary_csv = os.path.join(list_dir, "Summary.csv")
+    if not os.path.isfile(summary_csv):
+        raise ValueError(f"{summary_csv} 不存在，请先运行模式 C")
+
+    t0 = time.perf_counter()
+    catalogs = load_list_catalogs(list_dir)
+    summary_records = load_summary_records(summary_csv)
+    if clear:
+        if os.path.exists(default_links_path()):
+            os.remove(default_links_path())
+        set_cloud_links(None)
+        print("🧹 已删除 CloudMusic 匹配结果")
+    else:
+        matcher = CatalogMatcher(catalogs, min_score)
+        cloud = {}
+        for r in summary_records:
+            found = matcher.match(r["Singer"], r["Name"])
+            if found is not None:
+                artist, record, score = found
+                cloud[(r["Singer"], r["Name"], r["From"])] = (artist, tuple(record), round(score, 3))
+        links = CloudLinks(cloud)
+        links.save()
+        set_cloud_links(links)
+        fuzzy = sum(1 for _, _, score in cloud.values() if score < 1.0)
+        print(f"🔗 {len(summary_records)} 条 CloudMusic 记录中 {len(cloud)} 条匹配到歌手曲目"
+              f"（近似匹配 {fuzzy} 条，{(time.perf_counter() - t0) * 1000:.0f} ms）")
+
+        coverage_md = os.path.join(list_dir, "Coverage.md")
+        if write_output(coverage_md, render_coverage_markdown(summary_records, links, matcher)):
+            print(f"📄 覆盖报告已生成: {coverage_md}")
+        else:
+            print(f"📄 覆盖报告内容未变化，跳过写入: {coverage_md}")
+
+    for artist, records in catalogs.items():
+        csv_file = os.path.join(list_dir, artist, f"{artist}.csv")
+        csv_to_markdown_grouped(csv_file, records=records, media=load_artist_media(csv_file))
+    summary_csv_to_markdown(summary_csv, records=summary_records)
+
+# ---------- 曲库统计：列式加载 + 向量化聚合，写入 Summary README ----------
+def render_stats_block(stats):
+    """曲库统计分区（以 STATS_BEGIN / STATS_END 包围，summary README 重新生成时原样保留）"""
+    totals, lengths = stats["totals"], stats["album_lengths"]
+    parts = [STATS_BEGIN, "## 📊 曲库统计", "",
+             f"歌手 {totals['artists']} 位 · 专辑 {totals['albums']} 张 · 专辑曲目 {totals['album']} 首 · "
+             f"单曲 {totals['single']} 首 · 演唱会 {totals['live']} 场 · CloudMusic {totals['cloud']} 首", ""]
+    if stats["years"]:
+        parts += ["### 按年份", "", "| 年份 | 专辑曲目 | 单曲 | 演唱会 | 新专辑 |", "| --- | ---: | ---: | ---: | ---: |"]
+        parts += [f"| {year} | {album} | {single} | {live} | {new} |" for year, album, single, live, new in stats["years"]]
+        parts.append("")
+    if lengths["count"]:
+        parts += ["### 专辑曲目数", "",
+                  f"平均 {lengths['mean']:.1f} 首 · 中位数 {lengths['median']:g} 首 · 最多 {lengths['max']} 首", "",
+                  "| 曲目数 | 专辑数 |", "| ---: | ---: |"]
+        parts += [f"| {size} | {count} |" for size, count in lengths["histogram"]]
+        parts.append("")
+    if stats["sources"]:
+        parts += ["### CloudMusic 来源", "", "| 来源 | 曲目数 |", "| --- | ---: |"]
+        parts += [f"| {source} | {count} |" for source, count in stats["sources"]]
+        parts.append("")
+    parts.append(STATS_END)
+    return "\n".join(parts)
+
+def write_library_stats(top_sources=10):
+    """
+    读取 List 下所有歌手 CSV 与 Summary.csv 为列式存储，计算曲库统计，
+    写入（或替换）List/README.md 中的统计分区，其余内容不变。
+    """
+    list_dir = os.path.abspath(os.path.join(os.getcwd(), "..", "List"))
+    summary_csv = os.path.join(list_dir, "Summary.csv")
+    if not os.path.isfile(summary_csv):
+        raise ValueError(f"{summary_csv} 不存在，请先运行模式 C")
+
+    t0 = time.perf_counter()
+    with profile_phase("load_columns"):
+        columns = load_library_columns(list_dir)
+    t1 = time.perf_counter()
+    with profile_phase("aggregate"):
+        stats = library_stats(columns, top_sources)
+    t2 = time.perf_counter()
+    print(f"📊 {len(columns)} 条歌手曲目 + {len(columns.cloud_source)} 条 CloudMusic 记录"
+          f"（读取 {(t1 - t0) * 1000:.0f} ms，聚合 {(t2 - t1) * 1000:.1f} ms，{stats_backend()}）")
+
+    block = render_stats_block(stats)
+    output_md = os.path.join(list_dir, "README.md")
+    previous = None
+    if os.path.exists(output_md):
+        with open(output_md, "r", encoding="utf-8") as f:
+            previous = f.read()
+    if previous is not None and extract_stats_block(previous) is not None:
+        text = STATS_BLOCK_RE.sub(lambda m: block, previous, count=1)
+    else:
+        # README 还没有统计分区：按 Summary.csv 重新生成，统计分区放在总计之后
+        text = render_summary_markdown(load_summary_records(summary_csv), stats_block=block)
+    if write_output(output_md, text):
+        print(f"✅ 统计已写入: {output_md}")
+    else:
+        print(f"✅ 统计未变化，跳过写入: {output_md}")
+    return stats
+
+# ---------- 静态网站导出：每位歌手 / 每张专辑一页，附浏览器端分片搜索索引 ----------
+def default_site_dir():
+    return os.path.abspath(os.path.join(os.getcwd(), "..", "List", "site"))
+
+def export_site(out_dir=None, force=False):
+    """
+    由 List 下的歌手 CSV 与 Summary.csv 生成静态网站（默认 List/site）。
+    只重新渲染源数据哈希变化的页面，搜索索引在有页面变化时重建；force=True 时全部重新生成。
+    """
+    list_dir = os.path.abspath(os.path.join(os.getcwd(), "..", "List"))
+    if not os.path.isdir(list_dir):
+        raise ValueError(f"{list_dir} 不存在，请先运行模式 S / A / C")
+    out_dir = os.path.abspath(out_dir or default_site_dir())
+
+    t0 = time.perf_counter()
+    with profile_phase("load"):
+        catalogs = load_list_catalogs(list_dir)
+        summary_csv = os.path.join(list_dir, "Summary.csv")
+        cloud_records = load_summary_records(summary_csv) if os.path.isfile(summary_csv) else []
+    with profile_phase("site"):
+        result = build_site(out_dir, catalogs, cloud_records, _cloud_links, force=force)
+    elapsed = (time.perf_counter() - t0) * 1000
+    index_note = {"full": "，搜索索引已重建", "incremental": "，搜索索引已增量更新"}.get(result["index"], "")
+    print(f"🌐 {result['pages']} 个页面中重新生成 {result['rendered']} 个，写入 {result['written']} 个文件，"
+          f"删除 {result['removed']} 个{index_note}（{elapsed:.0f} ms）")
+    print(f"📄 首页: {os.path.join(out_dir, 'index.html')}")
+    return result
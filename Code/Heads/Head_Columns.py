@@ -0,0 +1,220 @@
+import os
+import csv
+from array import array
+from collections import Counter
+
+from Head_Record import RECORD_FIELDS, date_rank, UNKNOWN_DATE
+from Head_Walk import CLOUD_FOLDER
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：没有 NumPy 时聚合退回纯 Python，结果相同
+    np = None
+
+TYPES = ("album", "single", "live")
+
+def date_code(date):
+    """'2019.03.06' → 20190306，缺少的月 / 日补 0；无法解析的日期为 0"""
+    rank = date_rank(date)
+    if rank == UNKNOWN_DATE or not rank:
+        return 0
+    parts = (list(rank) + [0, 0])[:3]
+    return parts[0] * 10000 + parts[1] * 100 + parts[2]
+
+class StringTable:
+    """字符串表：每个不同的字符串只保存一次，列中只存整数编号"""
+
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+
+    def code(self, s):
+        c = self.codes.get(s)
+        if c is None:
+            c = self.codes[s] = len(self.strings)
+            self.strings.append(s)
+        return c
+
+    def __len__(self):
+        return len(self.strings)
+
+class LibraryColumns:
+    """
+    全曲库的列式存储（List/*/*.csv 与 Summary.csv），不为每行创建 dict：
+        歌手曲目：artist / type / album 为分类编号，date 为 YYYYMMDD 整数，no 为整数曲号，name 为字符串表编号
+        CloudMusic：singer / source 为分类编号，name 为字符串表编号
+    各列为 array，NumPy 可用时零拷贝转为 ndarray 做向量化聚合。
+    """
+
+    def __init__(self):
+        self.artists = StringTable()
+        self.albums = StringTable()
+        self.names = StringTable()
+        self.singers = StringTable()
+        self.sources = StringTable()
+        self.type_codes = {t: i for i, t in enumerate(TYPES)}
+
+        self.artist = array("i")
+        self.type = array("b")
+        self.date = array("i")
+        self.album = array("i")
+        self.no = array("i")
+        self.name = array("i")
+
+        self.cloud_singer = array("i")
+        self.cloud_source = array("i")
+        self.cloud_name = array("i")
+
+    def add_artist_csv(self, artist, csv_file):
+        artist_code = self.artists.code(artist)
+        with open(csv_file, "r", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            idx = [header.index(field) for field in RECORD_FIELDS]
+            for row in reader:
+                if not row:
+                    continue
+                Type, Date, Album, No, Name = (row[i] for i in idx)
+                type_code = self.type_codes.get(Type)
+                if type_code is None:
+                    continue
+                self.artist.append(artist_code)
+                self.type.append(type_code)
+                self.date.append(date_code(Date))
+                self.album.append(self.albums.code(Album) if Album != '-' else -1)
+                self.no.append(int(No) if No.isdigit() else 0)
+                self.name.append(self.names.code(Name))
+
+    def add_summary_csv(self, csv_file):
+        with open(csv_file, "r", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            singer_i, name_i, source_i = (header.index(field) for field in ("Singer", "Name", "From"))
+            for row in reader:
+                if not row:
+                    continue
+                self.cloud_singer.append(self.singers.code(row[singer_i]))
+                self.cloud_source.append(self.sources.code(row[source_i]))
+                self.cloud_name.append(self.names.code(row[name_i]))
+
+    def __len__(self):
+        return len(self.type)
+
+def load_library_columns(list_dir):
+    """读取 List 目录下所有歌手 CSV 与 Summary.csv 为列式存储"""
+    columns = LibraryColumns()
+    for artist in sorted(os.listdir(list_dir)):
+        if artist == CLOUD_FOLDER or artist.startswith("."):
+            continue
+        csv_file = os.path.join(list_dir, artist, f"{artist}.csv")
+        if os.path.isfile(csv_file):
+            columns.add_artist_csv(artist, csv_file)
+    summary_csv = os.path.join(list_dir, "Summary.csv")
+    if os.path.isfile(summary_csv):
+        columns.add_summary_csv(summary_csv)
+    return columns
+
+# ---------- 聚合：NumPy 向量化实现，与等价的纯 Python 实现 ----------
+def backend():
+    return "numpy" if np is not None else "python"
+
+def _nd(column):
+    """array → ndarray（零拷贝），统一为 int64 便于组合编号"""
+    return np.frombuffer(column, dtype=np.dtype(f"i{column.itemsize}")).astype(np.int64)
+
+def _stats_numpy(columns):
+    types, dates = _nd(columns.type), _nd(columns.date)
+    artists, albums = _nd(columns.artist), _nd(columns.album)
+    years = dates // 10000
+    type_counts = np.bincount(types, minlength=len(TYPES)).tolist()
+
+    # 每年各类型曲目数：(年份偏移, 类型) 组合编号后一次 bincount
+    dated = years > 0
+    year_type, first_year = {}, 0
+    if dated.any():
+        first_year = int(years[dated].min())
+        span = int(years[dated].max()) - first_year + 1
+        grid = np.bincount((years[dated] - first_year) * len(TYPES) + types[dated],
+                           minlength=span * len(TYPES)).reshape(span, len(TYPES))
+        year_type = {first_year + int(y): grid[y].tolist() for y in np.nonzero(grid.sum(axis=1))[0]}
+
+    # 专辑：(歌手, 专辑) 组合编号分组，曲目数 = 组大小，发行年份 = 组内最早年份
+    is_album = (types == 0) & (albums >= 0)
+    group = artists[is_album] * max(1, len(columns.albums)) + albums[is_album]
+    lengths = np.zeros(0, np.int64)
+    new_albums = {}
+    if len(group):
+        _, inverse, lengths = np.unique(group, return_inverse=True, return_counts=True)
+        album_years = np.where(years[is_album] > 0, years[is_album], np.iinfo(np.int64).max)
+        first = np.full(len(lengths), np.iinfo(np.int64).max)
+        np.minimum.at(first, inverse, album_years)
+        released, counts = np.unique(first[first != np.iinfo(np.int64).max], return_counts=True)
+        new_albums = dict(zip(released.tolist(), counts.tolist()))
+
+    if len(lengths):
+        sizes, size_counts = np.unique(lengths, return_counts=True)
+        album_lengths = {"count": int(len(lengths)), "mean": float(lengths.mean()),
+                         "median": float(np.median(lengths)), "max": int(lengths.max()),
+                         "histogram": list(zip(sizes.tolist(), size_counts.tolist()))}
+    else:
+        album_lengths = None
+
+    source_counts = np.bincount(_nd(columns.cloud_source), minlength=len(columns.sources)).tolist() \
+        if len(columns.cloud_source) else [0] * len(columns.sources)
+    return type_counts, year_type, new_albums, album_lengths, source_counts
+
+def _stats_python(columns):
+    type_counts = [0] * len(TYPES)
+    year_type = {}
+    album_sizes = Counter()
+    album_first = {}
+    for t, date, artist, album in zip(columns.type, columns.date, columns.artist, columns.album):
+        type_counts[t] += 1
+        year = date // 10000
+        if year > 0:
+            year_type.setdefault(year, [0] * len(TYPES))[t] += 1
+        if t == 0 and album >= 0:
+            key = (artist, album)
+            album_sizes[key] += 1
+            if year > 0 and (key not in album_first or year < album_first[key]):
+                album_first[key] = year
+    new_albums = dict(Counter(album_first.values()))
+
+    lengths = sorted(album_sizes.values())
+    if lengths:
+        mid = len(lengths) // 2
+        median = lengths[mid] if len(lengths) % 2 else (lengths[mid - 1] + lengths[mid]) / 2
+        album_lengths = {"count": len(lengths), "mean": sum(lengths) / len(lengths), "median": float(median),
+                         "max": lengths[-1], "histogram": sorted(Counter(lengths).items())}
+    else:
+        album_lengths = None
+
+    source_counts = [0] * len(columns.sources)
+    for code in columns.cloud_source:
+        source_counts[code] += 1
+    return type_counts, year_type, new_albums, album_lengths, source_counts
+
+def library_stats(columns, top_sources=10):
+    """
+    曲库统计（NumPy 可用时全部为列上的向量化运算）：
+        totals       : 各类型曲目数、CloudMusic 条目数、歌手数、专辑数
+        years        : [(年份, 专辑曲目数, 单曲数, 演唱会数, 新专辑数)]，无日期的条目不计入
+        album_lengths: 专辑曲目数分布 {"count", "mean", "median", "max", "histogram": [(曲目数, 专辑数)]}
+        sources      : CloudMusic 来源 (From) 的前 top_sources 名 [(来源, 条目数)]
+    """
+    compute = _stats_numpy if np is not None else _stats_python
+    type_counts, year_type, new_albums, album_lengths, source_counts = compute(columns)
+
+    years = [(year, *year_type.get(year, [0] * len(TYPES)), new_albums.get(year, 0))
+             for year in sorted(set(year_type) | set(new_albums))]
+    sources = sorted(((columns.sources.strings[i], n) for i, n in enumerate(source_counts) if n),
+                     key=lambda item: (-item[1], item[0]))[:top_sources]
+    totals = {t: type_counts[i] for i, t in enumerate(TYPES)}
+    totals.update({"cloud": len(columns.cloud_source), "artists": len(columns.artists),
+                   "albums": album_lengths["count"] if album_lengths else 0})
+    return {"totals": totals, "years": years, "sources": sources,
+            "album_lengths": album_lengths or {"count": 0, "mean": 0.0, "median": 0.0, "max": 0, "histogram": []}}
@@ -0,0 +1,118 @@
+import os
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from Head_Cache import FileCache
+
+# 首尾各读取的字节数；不超过两倍的文件首尾哈希即覆盖全文
+EDGE_BYTES = 64 * 1024
+CHUNK_BYTES = 1 << 20
+
+def load_hash_cache():
+    """哈希缓存：(path, mtime, size) → {"edge": 首尾哈希, "full": 全文哈希}"""
+    return FileCache.load("hashes")
+
+def edge_hash(path):
+    """文件首尾各 EDGE_BYTES 字节的哈希（进程池中执行）；读取失败返回 None"""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            h.update(f.read(EDGE_BYTES))
+            size = os.fstat(f.fileno()).st_size
+            if size > EDGE_BYTES:
+                f.seek(max(EDGE_BYTES, size - EDGE_BYTES))
+                h.update(f.read(EDGE_BYTES))
+    except OSError:
+        return None
+    return h.hexdigest()
+
+def full_hash(path):
+    """全文哈希（进程池中执行）；读取失败返回 None"""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+def _hash_many(func, paths, workers):
+    """在进程池中计算哈希（读取与哈希都不受 GIL 限制），workers <= 1 时在本进程内计算"""
+    if workers <= 1 or len(paths) < 2:
+        return [func(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+def _cached_hashes(kind, func, stats_by_path, entries, cache, workers, stats):
+    """
+    读取 / 计算一批文件的 kind 哈希，命中缓存的文件不再读取；返回 {path: 哈希}。
+    entries 为本次运行中已查过的缓存条目（首尾哈希与全文哈希两轮共用，每个文件只查一次缓存）。
+    """
+    result, pending = {}, {}
+    for path, st in stats_by_path.items():
+        if path not in entries:
+            entries[path] = (cache.get(path, st) if cache is not None else None) or {}
+        entry = entries[path]
+        if entry.get(kind):
+            result[path] = entry[kind]
+        else:
+            pending[path] = entry
+    stats[f"{kind}_hashed"] = stats.get(f"{kind}_hashed", 0) + len(pending)
+    for path, digest in zip(pending, _hash_many(func, list(pending), workers)):
+        if digest is None:
+            continue
+        result[path] = digest
+        entries[path] = {**pending[path], kind: digest}
+        if cache is not None:
+            cache.put(path, stats_by_path[path], entries[path])
+    return result
+
+def find_duplicate_groups(paths, cache=None, workers=4, min_size=1, stats=None):
+    """
+    在 paths 中查找内容完全相同的文件：
+        1. 按文件大小分组，大小唯一的文件直接排除
+        2. 同大小的文件计算首尾哈希，再次分组
+        3. 首尾哈希仍相同的文件计算全文哈希（不超过 2 × EDGE_BYTES 的文件首尾哈希即全文，无需再读）
+    哈希在进程池中计算，结果按 (path, mtime, size) 缓存在 cache (FileCache) 中。
+    返回 [(size, 哈希, [path, ...])]，按浪费的空间从大到小排序。
+    stats: 可选 dict，记录 files / edge_hashed / full_hashed 数量
+    """
+    stats = stats if stats is not None else {}
+    by_size = defaultdict(dict)
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_size >= min_size:
+            by_size[st.st_size][path] = st
+    stats["files"] = sum(len(group) for group in by_size.values())
+
+    candidates = {path: st for group in by_size.values() if len(group) > 1 for path, st in group.items()}
+    entries = {}
+    edges = _cached_hashes("edge", edge_hash, candidates, entries, cache, workers, stats)
+
+    by_edge = defaultdict(list)
+    for path, digest in edges.items():
+        by_edge[(candidates[path].st_size, digest)].append(path)
+
+    groups = []
+    need_full = {}
+    for (size, digest), group in by_edge.items():
+        if len(group) < 2:
+            continue
+        if size <= 2 * EDGE_BYTES:
+            groups.append((size, digest, sorted(group)))
+        else:
+            need_full.update((path, candidates[path]) for path in group)
+
+    fulls = _cached_hashes("full", full_hash, need_full, entries, cache, workers, stats)
+    by_full = defaultdict(list)
+    for path, digest in fulls.items():
+        by_full[(need_full[path].st_size, digest)].append(path)
+    groups.extend((size, digest, sorted(group)) for (size, digest), group in by_full.items() if len(group) > 1)
+
+    groups.sort(key=lambda g: (-(g[0] * (len(g[2]) - 1)), g[2]))
+    return groups
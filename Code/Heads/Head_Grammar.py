@@ -0,0 +1,171 @@
+import os
+import re
+import json
+import hashlib
+import threading
+
+# 日期前缀：YYYY.MM.DD
+DATE = r"\d{4}\.\d{2}\.\d{2}"
+
+# 各类名称的默认命名规则（按顺序尝试，整串匹配，命名分组即解析出的字段）：
+#   album_folder : 专辑目录      YYYY.MM.DD_类型_专辑名[FLAC]
+#   track_file   : 曲目文件名    NNN.曲名 / 曲名（不含扩展名）
+#   single_folder: 单曲子目录    YYYY.MM.DD_Single_曲名
+#   live_file    : 演唱会文件名  YYYY.MM.DD-演唱会名 / 演唱会名
+#   cloud_file   : CloudMusic    歌手-歌名_来源
+DEFAULT_RULES = {
+    "album_folder": [rf"(?:(?P<date>{DATE})_)?(?:.*?_)?(?P<album>[^_\[]*)(?:\[.*)?"],
+    "track_file": [r"\s*(?P<no>\d+(?:-\d+)?)\s*\.(?P<title>.+)", r"(?P<title>[^.]+)"],
+    "single_folder": [rf"(?:(?P<date>{DATE})_)?.*"],
+    "live_file": [rf"(?P<date>{DATE})-(?P<live>.+)", r"(?P<live>.+)"],
+    "cloud_file": [r"(?P<singer>[^-]*)-(?P<title>.*)_(?P<source>[^_]*)"],
+}
+
+# 每类规则必须提供的字段
+REQUIRED_FIELDS = {
+    "album_folder": {"album"},
+    "track_file": {"title"},
+    "single_folder": set(),
+    "live_file": {"live"},
+    "cloud_file": {"singer", "title", "source"},
+}
+
+# live_file 的演唱会名保留原样（与旧版解析一致），其余字段去掉首尾空白
+KEEP_SPACES = {"live"}
+
+_GROUP_RE = re.compile(r"\(\?P<(\w+)>")
+_BACKREF_RE = re.compile(r"\(\?P=(\w+)\)")
+
+def default_grammar_path():
+    """命名规则配置：与 CSV 输出一致，位于 ../List/grammar.json"""
+    return os.path.abspath(os.path.join(os.getcwd(), "..", "List", "grammar.json"))
+
+def compile_rules(kind, patterns):
+    """
+    将同一类的多条规则编译为一个整串匹配的正则：
+    (?P<r0>规则0)|(?P<r1>规则1)|...，各规则的命名分组加前缀 r{i}_ 避免重名。
+    一次 fullmatch 即可按顺序找到第一条匹配的规则。
+    返回 (正则, [(规则分组名, [(字段, 分组名)])])。
+    """
+    parts = []
+    rules = []
+    for i, pattern in enumerate(patterns):
+        try:
+            compiled = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"{kind} 规则无效: {pattern!r} ({e})")
+        fields = list(compiled.groupindex)
+        missing = REQUIRED_FIELDS[kind] - set(fields)
+        if missing:
+            raise ValueError(f"{kind} 规则缺少字段 {sorted(missing)}: {pattern!r}")
+        prefixed = _GROUP_RE.sub(rf"(?P<r{i}_\1>", pattern)
+        prefixed = _BACKREF_RE.sub(rf"(?P=r{i}_\1)", prefixed)
+        parts.append(f"(?P<r{i}>{prefixed})")
+        rules.append((f"r{i}", [(field, f"r{i}_{field}") for field in fields]))
+    return re.compile("|".join(parts)), dict(rules)
+
+class Grammar:
+    """
+    编译后的一套命名规则。extra 为 {类别: [正则, ...]}，优先于默认规则尝试。
+    未匹配任何规则的名称记录到 unmatched（由 GrammarBook 汇总报告）。
+    """
+
+    def __init__(self, extra=None, unmatched=None):
+        extra = extra or {}
+        unknown = set(extra) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"未知的命名规则类别: {sorted(unknown)}")
+        self.patterns = {kind: list(extra.get(kind, [])) + defaults for kind, defaults in DEFAULT_RULES.items()}
+        self.compiled = {kind: compile_rules(kind, patterns) for kind, patterns in self.patterns.items()}
+        # 规则指纹：扫描缓存用它判断缓存的解析结果是否仍然有效
+        self.key = hashlib.sha1(json.dumps(self.patterns, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.unmatched = unmatched if unmatched is not None else UnmatchedLog()
+
+    def parse(self, kind, name):
+        """解析单个名称，返回 {字段: 值}；未匹配返回 None"""
+        regex, rules = self.compiled[kind]
+        m = regex.fullmatch(name)
+        if m is None:
+            return None
+        fields = {}
+        for field, group in rules[m.lastgroup]:
+            value = m.group(group) or ''
+            fields[field] = value if field in KEEP_SPACES else value.strip()
+        return fields
+
+    def parse_listing(self, kind, names, where=''):
+        """
+        一次性解析整个目录列表，返回与 names 一一对应的字段列表（未匹配为 None）和未匹配的名称列表；
+        未匹配的名称同时记录到 unmatched，where 为所在目录，用于报告。
+        """
+        parse = self.parse
+        results = [parse(kind, name) for name in names]
+        unmatched = [name for name, fields in zip(names, results) if fields is None]
+        if unmatched:
+            self.unmatched.add(kind, where, unmatched)
+        return results, unmatched
+
+class UnmatchedLog:
+    """线程安全的未匹配名称记录：[(类别, 目录, 名称)]"""
+
+    def __init__(self):
+        self.items = []
+        self._lock = threading.Lock()
+
+    def add(self, kind, where, names):
+        with self._lock:
+            self.items.extend((kind, where, name) for name in names)
+
+    def take(self):
+        """取出并清空已记录的条目"""
+        with self._lock:
+            items, self.items = self.items, []
+        return items
+
+class GrammarBook:
+    """
+    命名规则配置：全局 default 规则 + 按歌手追加的规则。
+    配置文件格式（JSON）：
+        {
+          "default": {"track_file": ["(?P<no>\\d+) - (?P<title>.+)"]},
+          "artists": {"宇多田光": {"track_file": ["(?P<no>\\d{3}) (?P<title>.+)"]}}
+        }
+    歌手规则优先于 default 规则，default 规则优先于内置规则。
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.unmatched = UnmatchedLog()
+        self.default_extra = config.get("default", {})
+        self.default = Grammar(self.default_extra, self.unmatched)
+        self.artists = {}
+        for artist, extra in config.get("artists", {}).items():
+            merged = {kind: list(extra.get(kind, [])) + list(self.default_extra.get(kind, []))
+                      for kind in set(extra) | set(self.default_extra)}
+            try:
+                self.artists[artist] = Grammar(merged, self.unmatched)
+            except ValueError as e:
+                raise ValueError(f"歌手 {artist}: {e}")
+
+    def for_artist(self, artist):
+        return self.artists.get(artist, self.default)
+
+def load_grammar_book(path=None):
+    """
+    读取命名规则配置；未指定 path 时使用 ../List/grammar.json（不存在则只用内置规则）。
+    规则无效时抛出 ValueError。
+    """
+    explicit = path is not None
+    path = path or default_grammar_path()
+    if not os.path.exists(path):
+        if explicit:
+            raise ValueError(f"命名规则配置不存在: {path}")
+        return GrammarBook()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"命名规则配置读取失败: {path} ({e})")
+    book = GrammarBook(config)
+    print(f"📐 已加载命名规则配置: {path}")
+    return book
@@ -0,0 +1,192 @@
+import os
+import re
+import json
+import unicodedata
+from collections import defaultdict, Counter
+
+from Head_Cache import default_cache_dir
+
+# 低于该相似度（bigram Dice 系数）的候选不算匹配
+MIN_SCORE = 0.8
+TYPE_PREFERENCE = {"album": 0, "single": 1, "live": 2}
+
+# 标题末尾的括号注释：(Live) / [Remaster] / 【MV】 / 「TV size」 等，可连续多个
+BRACKET_SUFFIX_RE = re.compile(r"\s*[(\[（【〔「『<〈][^()\[\]（）【】〔〕「」『』<>〈〉]*[)\]）】〕」』>〉]\s*$")
+# 标题末尾的版本说明：- Live / ~acoustic ver.~ / -TV size- 等
+VERSION_SUFFIX_RE = re.compile(
+    r"\s*[-~〜‐–—]\s*(live|acoustic|instrumental|off vocal|inst\.?|tv\s*size|.*\bver(sion|\.)?)\s*[-~〜‐–—]?\s*$",
+    re.IGNORECASE)
+# 合唱 / 合作歌手的分隔符
+SINGER_SPLIT_RE = re.compile(r"\s*(?:[&,、/;・×]|\bfeat\.?|\bft\.|\bwith\b)\s*", re.IGNORECASE)
+
+def fold_kana(text):
+    """片假名 → 平假名（ァ..ヶ），长音符等其余字符不变"""
+    return "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in text)
+
+def normalize_text(text):
+    """NFKC（全角 / 半角统一）+ casefold + 片假名折叠为平假名"""
+    return fold_kana(unicodedata.normalize("NFKC", text).casefold())
+
+def title_key(name):
+    """
+    曲名的比较键：归一化后去掉末尾的括号注释与版本说明，只保留文字与数字。
+    汉字与假名之间无法在没有读音词典的情况下互转，汉字写法与假名写法不同的曲名仍视为不同。
+    """
+    text = normalize_text(name).strip()
+    while True:
+        stripped = VERSION_SUFFIX_RE.sub("", BRACKET_SUFFIX_RE.sub("", text))
+        if stripped == text or not stripped:
+            break
+        text = stripped
+    return "".join(c for c in text if unicodedata.category(c)[0] in "LN")
+
+def singer_keys(singer):
+    """歌手名 → 比较键列表（合作歌手拆开），例: 'milet × Aimer' → ['milet', 'aimer']"""
+    keys = []
+    for part in SINGER_SPLIT_RE.split(normalize_text(singer)):
+        key = "".join(c for c in part if unicodedata.category(c)[0] in "LN")
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+def key_grams(key):
+    """比较键的字符 bigram 多重集合（单字键使用自身），重复的 bigram 分别计数"""
+    if len(key) < 2:
+        return Counter([key] if key else [])
+    return Counter(key[i:i + 2] for i in range(len(key) - 1))
+
+class CatalogMatcher:
+    """
+    CloudMusic 条目 → 歌手曲目的匹配器。
+    按歌手分块（Summary 的 Singer 与歌手目录名归一化后相同才比较），
+    块内以比较键精确匹配，其次用 bigram 倒排表取候选、按 Dice 系数打分，
+    每条查询只检查与它共享 bigram 的曲目，整体接近线性。
+    """
+
+    def __init__(self, catalogs, min_score=MIN_SCORE):
+        """catalogs: {歌手目录名: [Record]}"""
+        self.min_score = min_score
+        self.blocks = {}
+        for artist, records in catalogs.items():
+            for key in singer_keys(artist):
+                self.blocks.setdefault(key, artist)
+        self.exact = {}
+        self.keys = {}
+        self.key_grams = {}
+        self.grams = {}
+        for artist, records in catalogs.items():
+            exact = defaultdict(list)
+            grams = defaultdict(set)
+            for r in records:
+                key = title_key(r.Name)
+                if not key:
+                    continue
+                exact[key].append(r)
+            keys = list(exact)
+            counted = [key_grams(key) for key in keys]
+            for i, key_counts in enumerate(counted):
+                for gram in key_counts:
+                    grams[gram].add(i)
+            self.exact[artist] = exact
+            self.keys[artist] = keys
+            self.key_grams[artist] = counted
+            self.grams[artist] = grams
+
+    @staticmethod
+    def _best_record(records):
+        """同名曲目优先取专辑中的版本，其次单曲、演唱会，日期最早者优先"""
+        return min(records, key=lambda r: (TYPE_PREFERENCE.get(r.Type, 3), r.Date, r.Album, r.No))
+
+    def _match_in(self, artist, key):
+        exact = self.exact[artist].get(key)
+        if exact:
+            return self._best_record(exact), 1.0
+        grams = key_grams(key)
+        size = sum(grams.values())
+        candidates = set()
+        for gram in grams:
+            candidates.update(self.grams[artist].get(gram, ()))
+        best, best_score = None, 0.0
+        keys, counted = self.keys[artist], self.key_grams[artist]
+        for i in candidates:
+            # 多重集合上的 Dice 系数：2·|A∩B| / (|A| + |B|)
+            common = sum((grams & counted[i]).values())
+            score = 2 * common / (size + sum(counted[i].values()))
+            if score > best_score or (score == best_score and best is not None and keys[i] < best):
+                best, best_score = keys[i], score
+        if best is None or best_score < self.min_score:
+            return None
+        return self._best_record(self.exact[artist][best]), best_score
+
+    def artist_of(self, singer):
+        """Summary 的 Singer 对应的歌手目录（取第一个命中的合作歌手），不在曲库中返回 None"""
+        for key in singer_keys(singer):
+            if key in self.blocks:
+                return self.blocks[key]
+        return None
+
+    def match(self, singer, name):
+        """返回 (歌手目录名, Record, 相似度)；未匹配返回 None"""
+        key = title_key(name)
+        if not key:
+            return None
+        for skey in singer_keys(singer):
+            artist = self.blocks.get(skey)
+            if artist is None:
+                continue
+            found = self._match_in(artist, key)
+            if found is not None:
+                return (artist,) + found
+        return None
+
+# ---------- 匹配结果：README 标注使用 ----------
+def default_links_path():
+    return os.path.join(default_cache_dir(), "cloud_links.json")
+
+class CloudLinks:
+    """
+    match 子命令的结果：
+        cloud : (Singer, Name, From) → (歌手目录名, Record 字段元组, 相似度)
+        artist: 歌手目录名 → {Record 字段元组: [来源 From, ...]}
+    """
+
+    def __init__(self, cloud=None):
+        self.cloud = cloud or {}
+        self.artist = defaultdict(dict)
+        for (singer, name, source), (artist, record, score) in self.cloud.items():
+            self.artist[artist].setdefault(record, []).append(source)
+        for sources in (s for records in self.artist.values() for s in records.values()):
+            sources.sort()
+
+    def for_cloud(self, row):
+        return self.cloud.get((row["Singer"], row["Name"], row["From"]))
+
+    def for_artist(self, artist):
+        return self.artist.get(artist, {})
+
+    def save(self, path=None):
+        path = path or default_links_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = {"version": 1, "links": [[list(k), artist, list(record), score]
+                                        for k, (artist, record, score) in sorted(self.cloud.items())]}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """读取匹配结果；文件不存在或损坏时返回 None"""
+        path = path or default_links_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != 1:
+                return None
+            return cls({tuple(k): (artist, tuple(record), score) for k, artist, record, score in data["links"]})
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"⚠️ CloudMusic 匹配结果损坏，忽略: {path}")
+            return None
@@ -0,0 +1,138 @@
+import os
+import io
+import stat
+import hashlib
+import tempfile
+
+# 进程的 umask 只能"设置并取回"，导入时读取一次，避免之后在线程中修改
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def file_digest(path, chunk_size=1 << 20):
+    """分块计算已有文件的哈希，不把整个文件读入内存"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.digest()
+
+def file_matches(path, data):
+    """已有文件与 data 完全一致时返回 True：先比大小，大小相同再比哈希"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return content_digest(f.read()) == content_digest(data)
+    except OSError:
+        return False
+
+def _replace_keep_mode(tmp_path, path):
+    """
+    mkstemp 创建的临时文件权限为 0600，os.replace 会把它带到目标上。
+    替换前改为目标原有的权限；目标不存在时按普通 open() 的默认权限 0666 & ~umask。
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+def atomic_write(path, data):
+    """写入同目录临时文件后 os.replace，读者不会看到写了一半的文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        _replace_keep_mode(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def write_if_changed(path, text, encoding="utf-8"):
+    """
+    text 与已有文件内容相同则不写（mtime 保持不变），否则原子写入。
+    返回 (是否写入, 字节数)。
+    """
+    data = text.encode(encoding)
+    if file_matches(path, data):
+        return False, len(data)
+    atomic_write(path, data)
+    return True, len(data)
+
+def file_signature(path):
+    """文件签名 [mtime_ns, size]；文件不存在时返回 None（变更集用它判断 plan 之后文件是否被改动）"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+class _HashingRaw(io.RawIOBase):
+    """写入底层文件的同时累计哈希与字节数"""
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.f.write(b)
+        self.hash.update(b)
+        self.size += len(b)
+        return len(b)
+
+class StreamingWrite:
+    """
+    流式版 write_if_changed：文本边编码边写入同目录临时文件并计算哈希，
+    结束时与已有文件比较（先比大小，再比哈希），一致则丢弃临时文件、不改变 mtime，否则 os.replace。
+    无需先在内存中拼出完整文本。
+
+        with StreamingWrite(path, "utf-8-sig") as out:
+            out.write(text)
+        out.written, out.size
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.written = False
+        self.size = 0
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+        self._file = os.fdopen(fd, "wb")
+        self._raw = _HashingRaw(self._file)
+        self._text = io.TextIOWrapper(io.BufferedWriter(self._raw), encoding=self.encoding, newline="")
+        return self
+
+    def write(self, text):
+        return self._text.write(text)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._text.close()
+            self._file.close()
+            if exc_type is not None:
+                return False
+            self.size = self._raw.size
+            try:
+                same = os.path.getsize(self.path) == self.size and file_digest(self.path) == self._raw.hash.digest()
+            except OSError:
+                same = False
+            if not same:
+                _replace_keep_mode(self._tmp_path, self.path)
+                self.written = True
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.unlink(self._tmp_path)
+        return False
@@ -0,0 +1,249 @@
+import os
+import csv
+import mmap
+import zlib
+import struct
+from array import array
+from itertools import repeat
+
+from Head_Cache import default_cache_dir
+from Head_Output import atomic_write, file_signature
+from Head_Record import Record, read_artist_csv
+from Head_Walk import CLOUD_FOLDER
+
+# 二进制曲库快照：List/*/*.csv 与 Summary.csv 的紧凑副本，读者 mmap 打开后按需取用，无需解析 CSV。
+#
+#   头部   : magic, version, 分区数, 名称区字节数, 目录校验和 (crc32)
+#   目录   : 每个分区（歌手 / CloudMusic）一项：分区偏移, 行数, 每行字段数, 字符串数, 字符串区字节数,
+#            CSV 签名 (mtime_ns, size), 分区校验和 (crc32)；其后为 \0 分隔的分区名称
+#   分区   : 定长行表（每个字段一个 u32 字符串编号）+ 字符串偏移表 (u32) + 字符串区（UTF-8，\0 结尾，分区内去重）
+#
+# 打开时只校验并读取目录；分区在第一次访问时才校验，整段读取时一次解码 + split 取出全部字符串，
+# 单行读取时只解码该行引用的字符串。
+# 签名与 CSV 当前的 (mtime_ns, size) 不一致的分区视为过期，版本不符或校验和错误时作废，读者都退回读取 CSV。
+PACK_MAGIC = b"MPAK"
+PACK_VERSION = 2
+HEADER = struct.Struct("<4sHHIII")
+ENTRY = struct.Struct("<QIIIIqqI")
+NO_SIGNATURE = (-1, -1)
+SEP = "\0"
+
+def default_pack_path():
+    return os.path.join(default_cache_dir(), "catalog.pack")
+
+def build_section(rows):
+    """一个分区的字节串：行表 + 字符串偏移表 + 字符串区；返回 (字节串, 字符串数, 字符串区字节数)"""
+    codes = {}
+    ids = array("I")
+    for row in rows:
+        for s in row:
+            code = codes.get(s)
+            if code is None:
+                code = codes[s] = len(codes)
+            ids.append(code)
+    encoded = [s.encode("utf-8", "surrogateescape") + b"\0" for s in codes]
+    offsets = array("I", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    strings = b"".join(encoded)
+    return ids.tobytes() + offsets.tobytes() + strings, len(codes), len(strings)
+
+def build_pack(sections):
+    """
+    生成快照字节串。
+    sections: [(名称, 每行字段数, CSV 签名, 行)]；歌手分区的行为 Record，CloudMusic 分区为 (Singer, Name, From)
+    """
+    entries, bodies, names = [], [], []
+    offset = 0
+    for name, fields, signature, rows in sections:
+        rows = list(rows)
+        body, n_strings, strings_len = build_section(rows)
+        entries.append((offset, len(rows), fields, n_strings, strings_len, *(signature or NO_SIGNATURE),
+                        zlib.crc32(body)))
+        bodies.append(body)
+        names.append(name)
+        offset += len(body)
+    name_blob = SEP.join(names).encode("utf-8", "surrogateescape")
+    base = HEADER.size + ENTRY.size * len(entries) + len(name_blob)
+    directory = b"".join(ENTRY.pack(off + base, *rest) for off, *rest in entries) + name_blob
+    header = HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(entries), len(name_blob), zlib.crc32(directory))
+    return b"".join([header, directory] + bodies)
+
+class PackedRecords:
+    """
+    一个分区的行视图（序列）：len / 下标访问 / 迭代。
+    迭代时一次解码整个字符串区；下标访问只解码该行用到的字符串。
+    """
+
+    def __init__(self, mm, entry, row_type):
+        self.mm = mm
+        offset, self.count, self.fields, self.n_strings, self.strings_len = entry[:5]
+        self.ids_offset = offset
+        self.offsets_offset = offset + self.count * self.fields * 4
+        self.strings_offset = self.offsets_offset + (self.n_strings + 1) * 4
+        self.row_type = row_type
+        self._strings = None
+
+    def __len__(self):
+        return self.count
+
+    def _ids(self, start, stop):
+        ids = array("I")
+        ids.frombytes(self.mm[self.ids_offset + start * self.fields * 4:self.ids_offset + stop * self.fields * 4])
+        return ids
+
+    def _string(self, code):
+        start, end = struct.unpack_from("<II", self.mm, self.offsets_offset + code * 4)
+        return self.mm[self.strings_offset + start:self.strings_offset + end - 1].decode("utf-8", "surrogateescape")
+
+    def strings(self):
+        """分区内全部字符串（下标即编号），第一次调用时解码"""
+        if self._strings is None:
+            data = self.mm[self.strings_offset:self.strings_offset + self.strings_len]
+            strings = data.decode("utf-8", "surrogateescape").split(SEP)[:-1]
+            if len(strings) != self.n_strings:  # 字段本身含 \0：按偏移表逐个解码
+                strings = [self._string(code) for code in range(self.n_strings)]
+            self._strings = strings
+        return self._strings
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        lookup = self._strings.__getitem__ if self._strings is not None else self._string
+        return tuple.__new__(self.row_type, map(lookup, self._ids(i, i + 1)))
+
+    def __iter__(self):
+        values = map(self.strings().__getitem__, self._ids(0, self.count))
+        return map(tuple.__new__, repeat(self.row_type), zip(*[values] * self.fields))
+
+class PackedCatalog:
+    """只读的二进制曲库快照（mmap）；打开时只读取目录，分区按需校验与解码"""
+
+    def __init__(self, path, f, mm, sections):
+        self.path = path
+        self._file = f
+        self.mm = mm
+        self.sections = sections
+        self._verified = set()
+
+    @classmethod
+    def open(cls, path=None):
+        """打开快照；文件不存在、版本不符或目录校验失败时返回 None（读者退回 CSV）"""
+        path = path or default_pack_path()
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # 空文件无法 mmap
+            f.close()
+            return None
+        try:
+            magic, version, _, count, names_len, crc = HEADER.unpack_from(mm, 0)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                raise ValueError("version")
+            end = HEADER.size + ENTRY.size * count + names_len
+            if zlib.crc32(mm[HEADER.size:end]) != crc:
+                print(f"⚠️ 二进制曲库快照校验失败，改为读取 CSV: {path}")
+                raise ValueError("checksum")
+            names = mm[end - names_len:end].decode("utf-8", "surrogateescape").split(SEP) if count else []
+            entries = ENTRY.iter_unpack(mm[HEADER.size:end - names_len])
+            return cls(path, f, mm, dict(zip(names, entries)))
+        except (struct.error, ValueError):
+            mm.close()
+            f.close()
+            return None
+
+    def close(self):
+        self.mm.close()
+        self._file.close()
+
+    def artists(self):
+        return [name for name in self.sections if name != CLOUD_FOLDER]
+
+    def signature(self, name):
+        entry = self.sections.get(name)
+        if entry is None or entry[5] == -1:
+            return None
+        return [entry[5], entry[6]]
+
+    def section(self, name, csv_file=None, row_type=tuple):
+        """
+        分区的行视图 (PackedRecords)；不在快照中、csv_file 的签名与快照不一致，
+        或分区校验失败时返回 None。每个分区只在第一次访问时校验。
+        """
+        entry = self.sections.get(name)
+        if entry is None:
+            return None
+        if csv_file is not None and file_signature(csv_file) != self.signature(name):
+            return None
+        if name not in self._verified:
+            offset, count, fields, n_strings, strings_len = entry[:5]
+            size = (count * fields + n_strings + 1) * 4 + strings_len
+            if zlib.crc32(self.mm[offset:offset + size]) != entry[7]:
+                print(f"⚠️ 二进制曲库快照中 {name} 的分区校验失败，改为读取 CSV")
+                return None
+            self._verified.add(name)
+        return PackedRecords(self.mm, entry, row_type)
+
+    def artist_records(self, artist, csv_file=None):
+        """该歌手的 Record 视图，条件同 section"""
+        return self.section(artist, csv_file, Record)
+
+    def cloud_rows(self, csv_file=None):
+        """Summary.csv 的 (Singer, Name, From) 行视图，条件同 section"""
+        return self.section(CLOUD_FOLDER, csv_file, tuple)
+
+def read_cloud_rows(csv_file):
+    with open(csv_file, "r", encoding="utf-8-sig") as f:
+        return [(r["Singer"], r["Name"], r["From"]) for r in csv.DictReader(f)]
+
+def refresh_pack(list_dir, old=None, updated=None, cloud=None, path=None):
+    """
+    按 List 目录的当前内容重新生成快照（原子替换），返回是否写入。
+    old    : 已打开的旧快照 (PackedCatalog)，没有或已失效时为 None；函数返回前关闭
+    updated: {歌手: [Record]}，本次运行刚写入 CSV 的记录（无需再读 CSV）
+    cloud  : 本次运行刚写入 Summary.csv 的 (Singer, Name, From) 行
+    其余分区签名未变时直接沿用旧快照中的行，否则读取 CSV。
+    """
+    path = path or default_pack_path()
+    updated = dict(updated or {})
+    if cloud is not None:
+        updated[CLOUD_FOLDER] = cloud
+
+    sources = []
+    for artist in sorted(os.listdir(list_dir)):
+        if artist == CLOUD_FOLDER or artist.startswith("."):
+            continue
+        csv_file = os.path.join(list_dir, artist, f"{artist}.csv")
+        if os.path.isfile(csv_file):
+            sources.append((artist, len(Record._fields), csv_file, read_artist_csv, Record))
+    summary_csv = os.path.join(list_dir, "Summary.csv")
+    if os.path.isfile(summary_csv):
+        sources.append((CLOUD_FOLDER, 3, summary_csv, read_cloud_rows, tuple))
+
+    changed = old is None or set(old.sections) != {source[0] for source in sources}
+    sections = []
+    for name, fields, csv_file, read_csv, row_type in sources:
+        rows = updated.get(name)
+        if rows is not None:
+            changed = True
+        elif old is not None:
+            rows = old.section(name, csv_file, row_type)
+        if rows is None:
+            rows = read_csv(csv_file)
+            changed = True
+        sections.append((name, fields, file_signature(csv_file), rows))
+
+    if not changed:
+        old.close()
+        return False
+    data = build_pack(sections)
+    if old is not None:
+        old.close()  # 行已全部编码进 data，关闭 mmap 后才能替换文件
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, data)
+    return True
@@ -0,0 +1,365 @@
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from Head_Cache import FileCache
+from Head_Record import track_to_record
+
+# 演唱会视频的容器头探测（纯 Python）：只读取元数据所在的几个小块，其余部分直接 seek 跳过，
+# 多 GB 的视频通常只需几 KB 的读取。
+#   MP4      : 顶层 box 只读 8 / 16 字节头部（mdat 不读），在 moov 内沿 trak/mdia/minf/stbl 下行，
+#              只读取 mvhd / tkhd / hdlr / stsd 的前几十字节，采样表 (stts / stsz / stco) 不读。
+#              顶层遍历失败（mdat 大小为 0、头部损坏）时，从文件末尾按上限逐次放大的窗口查找 moov。
+#   Matroska : EBML 头 → Segment，按 SeekHead 直接跳到 Info (时长) 与 Tracks (编码 / 分辨率)，
+#              遇到 Cluster 即停止。
+MAX_LEAF_BYTES = 256                    # mvhd / tkhd / hdlr / stsd 只需前几十字节
+TAIL_WINDOW = 1 << 20                   # 末尾查找 moov 的初始窗口
+MAX_TAIL_WINDOW = 32 << 20              # 末尾查找的上限
+MAX_EBML_ELEMENT = 8 << 20              # Info / Tracks / SeekHead 的读取上限
+
+MP4_CODECS = {
+    "avc1": "H.264", "avc3": "H.264", "hvc1": "HEVC", "hev1": "HEVC", "av01": "AV1", "vp09": "VP9",
+    "mp4v": "MPEG-4", "mp4a": "AAC", "ac-3": "AC-3", "ec-3": "E-AC-3", "Opus": "Opus", "fLaC": "FLAC",
+    ".mp3": "MP3", "alac": "ALAC", "lpcm": "PCM", "sowt": "PCM", "twos": "PCM", "dtsc": "DTS",
+}
+MKV_CODECS = [  # CodecID 前缀 → 名称（按顺序匹配，较长的前缀在前）
+    ("V_MPEG4/ISO/AVC", "H.264"), ("V_MPEGH/ISO/HEVC", "HEVC"), ("V_MPEG4/ISO/", "MPEG-4"), ("V_MPEG2", "MPEG-2"),
+    ("V_AV1", "AV1"), ("V_VP9", "VP9"), ("V_VP8", "VP8"),
+    ("A_AAC", "AAC"), ("A_EAC3", "E-AC-3"), ("A_AC3", "AC-3"), ("A_DTS", "DTS"), ("A_TRUEHD", "TrueHD"),
+    ("A_FLAC", "FLAC"), ("A_OPUS", "Opus"), ("A_VORBIS", "Vorbis"), ("A_MPEG/L3", "MP3"), ("A_PCM", "PCM"),
+]
+
+# ---------- MP4 ----------
+def _box_header(f, pos, end):
+    """读取 pos 处的 box 头部：(类型, 数据起点, box 终点)；越界或损坏时返回 None"""
+    f.seek(pos)
+    head = f.read(8)
+    if len(head) < 8:
+        return None
+    size, kind = struct.unpack(">I4s", head)
+    header = 8
+    if size == 1:
+        ext = f.read(8)
+        if len(ext) < 8:
+            return None
+        size, header = struct.unpack(">Q", ext)[0], 16
+    elif size == 0:
+        size = end - pos  # 延伸到末尾
+    if size < header or pos + size > end:
+        return None
+    return kind, pos + header, pos + size
+
+def _children(f, start, end):
+    pos = start
+    while pos + 8 <= end:
+        box = _box_header(f, pos, end)
+        if box is None:
+            return
+        yield box
+        pos = box[2]
+
+def _leaf(f, start, end):
+    f.seek(start)
+    return f.read(min(end - start, MAX_LEAF_BYTES))
+
+def _find_child(f, start, end, kind):
+    for child in _children(f, start, end):
+        if child[0] == kind:
+            return child
+    return None
+
+def _parse_trak(f, start, end):
+    """trak → {"handler", "codec", "width", "height"}"""
+    track = {}
+    for kind, s, e in _children(f, start, end):
+        if kind == b"tkhd":
+            data = _leaf(f, s, e)
+            offset = 88 if data[0] == 1 else 76
+            if len(data) >= offset + 8:
+                width, height = struct.unpack_from(">II", data, offset)
+                track["width"], track["height"] = width >> 16, height >> 16
+        elif kind == b"mdia":
+            for kind2, s2, e2 in _children(f, s, e):
+                if kind2 == b"hdlr":
+                    track["handler"] = _leaf(f, s2, e2)[8:12].decode("latin-1")
+                elif kind2 == b"minf":
+                    stbl = _find_child(f, s2, e2, b"stbl")
+                    stsd = stbl and _find_child(f, stbl[1], stbl[2], b"stsd")
+                    if stsd:
+                        data = _leaf(f, stsd[1], stsd[2])
+                        if len(data) >= 16:
+                            track["codec"] = data[12:16].decode("latin-1")
+                        if len(data) >= 44 and not track.get("width"):
+                            # VisualSampleEntry 中的编码尺寸（tkhd 为 0 时使用）
+                            track["width"], track["height"] = struct.unpack_from(">HH", data, 40)
+    return track
+
+def _parse_moov(f, start, end):
+    info = {}
+    for kind, s, e in _children(f, start, end):
+        if kind == b"mvhd":
+            data = _leaf(f, s, e)
+            if data[:1] == b"\x01" and len(data) >= 32:
+                timescale, duration = struct.unpack_from(">IQ", data, 20)
+            elif len(data) >= 20:
+                timescale, duration = struct.unpack_from(">II", data, 12)
+            else:
+                continue
+            if timescale:
+                info["duration"] = duration / timescale
+        elif kind == b"trak":
+            track = _parse_trak(f, s, e)
+            codec = MP4_CODECS.get(track.get("codec"), track.get("codec"))
+            if track.get("handler") == "vide" and "video" not in info:
+                info["video"] = codec
+                if track.get("width"):
+                    info["width"], info["height"] = track["width"], track["height"]
+            elif track.get("handler") == "soun" and "audio" not in info:
+                info["audio"] = codec
+    return info
+
+def _tail_moov(f, size):
+    """
+    从文件末尾查找 moov（头部为 4 字节大小 + 'moov'，且整个 box 落在文件内）：
+    窗口从 TAIL_WINDOW 开始每次 ×4，最多读取 MAX_TAIL_WINDOW。返回 (数据起点, 终点) 或 None。
+    """
+    window = TAIL_WINDOW
+    while True:
+        window = min(window, size, MAX_TAIL_WINDOW)
+        f.seek(size - window)
+        data = f.read(window)
+        i = data.rfind(b"moov")
+        while i >= 4:
+            box_size = struct.unpack_from(">I", data, i - 4)[0]
+            start = size - window + i - 4
+            if box_size >= 8 and start + box_size <= size:
+                return start + 8, start + box_size
+            i = data.rfind(b"moov", 0, i)
+        if window >= min(size, MAX_TAIL_WINDOW):
+            return None
+        window *= 4
+
+def probe_mp4(f, size):
+    moov = None
+    for kind, s, e in _children(f, 0, size):
+        if kind == b"moov":
+            moov = (s, e)
+            break
+    if moov is None:
+        moov = _tail_moov(f, size)
+    return _parse_moov(f, *moov) if moov else None
+
+# ---------- Matroska ----------
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD, SEEK, SEEK_ID, SEEK_POSITION = 0x114D9B74, 0x4DBB, 0x53AB, 0x53AC
+INFO, TIMECODE_SCALE, DURATION = 0x1549A966, 0x2AD7B1, 0x4489
+TRACKS, TRACK_ENTRY, TRACK_TYPE, CODEC_ID = 0x1654AE6B, 0xAE, 0x83, 0x86
+VIDEO, PIXEL_WIDTH, PIXEL_HEIGHT = 0xE0, 0xB0, 0xBA
+CLUSTER = 0x1F43B675
+
+def _vint(data, pos, keep_marker):
+    """EBML 变长整数：返回 (值, 新位置)；大小全为 1 表示未知大小，返回 None"""
+    first = data[pos]
+    length = 8 - first.bit_length() + 1
+    if length > 8 or pos + length > len(data):
+        raise ValueError("vint")
+    value = first if keep_marker else first & (0xFF >> length)
+    for b in data[pos + 1:pos + length]:
+        value = (value << 8) | b
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = None
+    return value, pos + length
+
+def _ebml_header(f, pos):
+    """文件中 pos 处的元素头：(ID, 数据起点, 数据大小或 None)"""
+    f.seek(pos)
+    data = f.read(12)
+    if not data:
+        return None
+    element_id, i = _vint(data, 0, True)
+    size, i = _vint(data, i, False)
+    return element_id, pos + i, size
+
+def _elements(data, start, end):
+    """内存中的元素序列：逐个产出 (ID, 数据起点, 数据终点)"""
+    pos = start
+    while pos < end:
+        element_id, pos = _vint(data, pos, True)
+        size, pos = _vint(data, pos, False)
+        stop = end if size is None else min(pos + size, end)
+        yield element_id, pos, stop
+        pos = stop
+
+def _uint(data, s, e):
+    return int.from_bytes(data[s:e], "big")
+
+def _read_element(f, start, size):
+    f.seek(start)
+    return f.read(min(size, MAX_EBML_ELEMENT))
+
+def _parse_info(data, info):
+    scale, duration = 1000000, None
+    for element_id, s, e in _elements(data, 0, len(data)):
+        if element_id == TIMECODE_SCALE:
+            scale = _uint(data, s, e)
+        elif element_id == DURATION:
+            duration = struct.unpack(">f" if e - s == 4 else ">d", data[s:e])[0]
+    if duration is not None:
+        info["duration"] = duration * scale / 1e9
+
+def _mkv_codec(codec_id):
+    for prefix, name in MKV_CODECS:
+        if codec_id.startswith(prefix):
+            return name
+    return codec_id
+
+def _parse_tracks(data, info):
+    for element_id, s, e in _elements(data, 0, len(data)):
+        if element_id != TRACK_ENTRY:
+            continue
+        track_type, codec, width, height = None, None, None, None
+        for child_id, s2, e2 in _elements(data, s, e):
+            if child_id == TRACK_TYPE:
+                track_type = _uint(data, s2, e2)
+            elif child_id == CODEC_ID:
+                codec = _mkv_codec(data[s2:e2].rstrip(b"\0").decode("ascii", "replace"))
+            elif child_id == VIDEO:
+                for video_id, s3, e3 in _elements(data, s2, e2):
+                    if video_id == PIXEL_WIDTH:
+                        width = _uint(data, s3, e3)
+                    elif video_id == PIXEL_HEIGHT:
+                        height = _uint(data, s3, e3)
+        if track_type == 1 and "video" not in info:
+            info["video"] = codec
+            if width and height:
+                info["width"], info["height"] = width, height
+        elif track_type == 2 and "audio" not in info:
+            info["audio"] = codec
+
+def _parse_seek_head(data, segment_start):
+    """SeekHead → {元素 ID: 文件偏移}"""
+    positions = {}
+    for element_id, s, e in _elements(data, 0, len(data)):
+        if element_id != SEEK:
+            continue
+        target, position = None, None
+        for child_id, s2, e2 in _elements(data, s, e):
+            if child_id == SEEK_ID:
+                target = _uint(data, s2, e2)
+            elif child_id == SEEK_POSITION:
+                position = _uint(data, s2, e2)
+        if target is not None and position is not None:
+            positions.setdefault(target, segment_start + position)
+    return positions
+
+def probe_matroska(f, size):
+    header = _ebml_header(f, 0)
+    if header is None or header[0] != EBML_HEADER or header[2] is None:
+        return None
+    segment = _ebml_header(f, header[1] + header[2])
+    if segment is None or segment[0] != SEGMENT:
+        return None
+    segment_start = segment[1]
+    segment_end = size if segment[2] is None else min(size, segment_start + segment[2])
+
+    info, parsed, positions = {}, set(), {}
+    pos = segment_start
+    while pos < segment_end and not {INFO, TRACKS} <= parsed:
+        element = _ebml_header(f, pos)
+        if element is None:
+            break
+        element_id, start, length = element
+        if element_id == CLUSTER or length is None:
+            break  # 媒体数据：剩下的元数据按 SeekHead 直接跳转
+        if element_id in (INFO, TRACKS, SEEK_HEAD) and element_id not in parsed:
+            data = _read_element(f, start, length)
+            if element_id == INFO:
+                _parse_info(data, info)
+            elif element_id == TRACKS:
+                _parse_tracks(data, info)
+            else:
+                positions = _parse_seek_head(data, segment_start)
+            parsed.add(element_id)
+        pos = start + length
+
+    for element_id in (INFO, TRACKS):
+        if element_id in parsed or element_id not in positions:
+            continue
+        element = _ebml_header(f, positions[element_id])
+        if element is None or element[0] != element_id or element[2] is None:
+            continue
+        data = _read_element(f, element[1], element[2])
+        (_parse_info if element_id == INFO else _parse_tracks)(data, info)
+    return info
+
+# ---------- 入口 ----------
+def probe_stream(f, size):
+    """按文件头判断容器类型并探测；无法识别时返回 None"""
+    f.seek(0)
+    head = f.read(12)
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return probe_matroska(f, size)
+    if head[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip"):
+        return probe_mp4(f, size)
+    return None
+
+def probe_video(path):
+    """
+    读取视频的时长 / 分辨率 / 编码：{"duration": 秒, "width", "height", "video": 视频编码, "audio": 音频编码}，
+    只包含能读到的字段；不是 MP4 / Matroska 或文件损坏时返回 {}。
+    """
+    try:
+        with open(path, "rb") as f:
+            return probe_stream(f, os.fstat(f.fileno()).st_size) or {}
+    except (OSError, ValueError, IndexError, struct.error):
+        return {}
+
+# ---------- CSV / README 中的视频信息列 ----------
+NO_MEDIA = ("", "", "")
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def media_columns(info):
+    """探测结果 → (Duration, Resolution, Codec) 三列文本"""
+    duration = format_duration(info["duration"]) if info.get("duration") else ""
+    resolution = f"{info['width']}x{info['height']}" if info.get("width") else ""
+    codec = "/".join(c for c in (info.get("video"), info.get("audio")) if c)
+    return (duration, resolution, codec)
+
+def probe_live_tracks(tracks, cache=None, workers=8):
+    """
+    探测演唱会曲目的视频文件：{Record: (Duration, Resolution, Codec)}。
+    同一条目对应多个文件时取文件名排序后第一个可识别的文件；cache 为 FileCache，按 (path, mtime, size) 缓存。
+    """
+    files = sorted({(os.path.join(t.folder, t.file_name), track_to_record(t))
+                    for t in tracks if t.folder_type == 'live' and t.folder})
+
+    def lookup(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return {}
+        if cache is not None:
+            info = cache.get(path, st)
+            if info is not None:
+                return info
+        info = probe_video(path)
+        if cache is not None:
+            cache.put(path, st, info)
+        return info
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        infos = list(pool.map(lookup, [path for path, _ in files]))
+
+    media = {}
+    for (_, record), info in zip(files, infos):
+        columns = media_columns(info)
+        if columns != NO_MEDIA and record not in media:
+            media[record] = columns
+    return media
+
+def load_video_cache():
+    return FileCache.load("video")
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import pstats
+import builtins
+import cProfile
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+
+# 统计的文件系统调用（os.path.isdir / isfile / exists 内部走 os.stat，同样计入）
+FS_CALLS = [(os, "scandir"), (os, "listdir"), (os, "stat"), (builtins, "open")]
+
+class FsCallCounter:
+    """
+    临时替换 os.scandir / os.listdir / os.stat / open，统计调用次数。
+    on_call 可选回调 on_call(name)，用于把调用归到当前阶段。
+    """
+
+    def __init__(self, on_call=None):
+        self.counts = {name: 0 for _, name in FS_CALLS}
+        self.on_call = on_call
+        self._originals = {}
+
+    def __enter__(self):
+        for module, name in FS_CALLS:
+            original = getattr(module, name)
+            self._originals[(module, name)] = original
+
+            def wrapper(*args, _original=original, _name=name, **kwargs):
+                self.counts[_name] += 1
+                if self.on_call is not None:
+                    self.on_call(_name)
+                return _original(*args, **kwargs)
+            setattr(module, name, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for (module, name), original in self._originals.items():
+            setattr(module, name, original)
+        self._originals = {}
+
+class Profiler:
+    """
+    Collect.py 运行的分阶段统计：
+      - 每个阶段 / 每位歌手的耗时
+      - 文件系统调用次数（fs.scandir / fs.listdir / fs.stat / fs.open）
+      - 读取 / 写入的记录数与写入字节数，内容未变化而跳过的写入次数
+    可选 cProfile：对每位歌手单独采样，保留最耗时那位歌手的 profile。
+    """
+
+    def __init__(self, cprofile=False):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.other_counts = defaultdict(int)
+        self.use_cprofile = cprofile
+        self.hot_artist = None
+        self.hot_seconds = 0.0
+        self.hot_stats = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._fs_counter = None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # ---------- 采集 ----------
+    def start(self):
+        """开始统计文件系统调用"""
+        self._fs_counter = FsCallCounter(on_call=lambda name: self.count(f"fs.{name}"))
+        self._fs_counter.__enter__()
+
+    def stop(self):
+        if self._fs_counter is not None:
+            self._fs_counter.__exit__(None, None, None)
+            self._fs_counter = None
+
+    @contextmanager
+    def phase(self, name, artist=None):
+        """记录一个阶段；嵌套阶段未指定 artist 时继承外层的 artist"""
+        stack = self._stack()
+        if artist is None and stack:
+            artist = stack[-1]["artist"]
+        span = {"name": name, "artist": artist, "start": time.perf_counter(),
+                "tid": threading.get_ident(), "counts": defaultdict(int)}
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span["seconds"] = time.perf_counter() - span["start"]
+            with self._lock:
+                self.spans.append(span)
+
+    def count(self, key, n=1):
+        """计数归入当前线程最内层的阶段"""
+        stack = self._stack()
+        if stack:
+            stack[-1]["counts"][key] += n
+        else:
+            with self._lock:
+                self.other_counts[key] += n
+
+    @contextmanager
+    def artist_profile(self, artist):
+        """启用 cProfile 时对单个歌手采样，只保留最耗时的一位"""
+        if not self.use_cprofile:
+            yield
+            return
+        profile = cProfile.Profile()
+        t0 = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                if elapsed > self.hot_seconds:
+                    self.hot_artist, self.hot_seconds, self.hot_stats = artist, elapsed, profile
+
+    # ---------- 汇总 ----------
+    def totals(self, by):
+        """按 'name'（阶段）或 'artist' 汇总耗时与计数"""
+        result = defaultdict(lambda: {"seconds": 0.0, "calls": 0, "counts": defaultdict(int)})
+        for span in self.spans:
+            row = result[span[by] or "-"]
+            row["seconds"] += span["seconds"]
+            row["calls"] += 1
+            for key, value in span["counts"].items():
+                row["counts"][key] += value
+        return result
+
+    def print_summary(self):
+        wall = time.perf_counter() - self.origin
+        columns = ["fs.scandir", "fs.listdir", "fs.stat", "fs.open", "records_read", "records_written", "bytes_written",
+                   "writes_skipped"]
+        headers = ["scandir", "listdir", "stat", "open", "读记录", "写记录", "写字节", "跳过写"]
+
+        def print_table(title, totals, limit=None):
+            print(f"\n{title}")
+            print(f"  {'名称':<16}{'耗时(s)':>10}{'次数':>7}" + "".join(f"{h:>10}" for h in headers))
+            rows = sorted(totals.items(), key=lambda kv: kv[1]["seconds"], reverse=True)
+            for key, row in rows[:limit]:
+                print(f"  {str(key):<16}{row['seconds']:>10.3f}{row['calls']:>7}"
+                      + "".join(f"{row['counts'].get(c, 0):>10}" for c in columns))
+
+        print(f"\n⏱️ 性能统计（总耗时 {wall:.3f}s）")
+        print_table("按阶段：", self.totals("name"))
+        print_table("按歌手（前 20）：", self.totals("artist"), limit=20)
+        if self.other_counts:
+            print("  阶段外调用: " + ", ".join(f"{k}={v}" for k, v in sorted(self.other_counts.items())))
+        if self.hot_artist is not None:
+            print(f"\n🔥 最耗时歌手: {self.hot_artist} ({self.hot_seconds:.3f}s)")
+
+    def to_json(self):
+        return {
+            "wall_seconds": time.perf_counter() - self.origin,
+            "phases": {k: {**v, "counts": dict(v["counts"])} for k, v in self.totals("name").items()},
+            "artists": {k: {**v, "counts": dict(v["counts"])} for k, v in self.totals("artist").items()},
+            "other_counts": dict(self.other_counts),
+            "hot_artist": self.hot_artist,
+        }
+
+    def to_chrome_trace(self):
+        """Chrome trace 格式（chrome://tracing / Perfetto 可直接打开）"""
+        events = []
+        for span in self.spans:
+            events.append({
+                "name": span["name"], "cat": "collect", "ph": "X",
+                "ts": (span["start"] - self.origin) * 1e6, "dur": span["seconds"] * 1e6,
+                "pid": os.getpid(), "tid": span["tid"],
+                "args": {"artist": span["artist"], **span["counts"]},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path, fmt=None):
+        """fmt 为 'json' 或 'chrome'；未指定时 *.trace.json 视为 chrome 格式"""
+        if fmt is None:
+            fmt = "chrome" if path.endswith(".trace.json") else "json"
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        print(f"💾 性能数据已保存 ({fmt}): {path}")
+
+    def dump_cprofile(self, path):
+        if self.hot_stats is None:
+            print("⚠️ 没有 cProfile 数据")
+            return
+        self.hot_stats.dump_stats(path)
+        print(f"💾 最耗时歌手 {self.hot_artist} 的 cProfile 已保存: {path}")
+        pstats.Stats(self.hot_stats).sort_stats("cumulative").print_stats(15)
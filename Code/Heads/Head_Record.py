@@ -0,0 +1,181 @@
+import sys
+import csv
+from bisect import bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+
+intern = sys.intern
+_tuple_new = tuple.__new__
+
+class Track(NamedTuple):
+    """
+    扫描得到的单个文件记录（替代原来的每文件一个 dict）。
+    folder_type / release_date / album_name 在同一目录内共享同一个 intern 字符串。
+    """
+    folder_type: str
+    release_date: str
+    album_name: str
+    track_no: str
+    track_name: str
+    file_name: str
+    parent_folder: str = ''
+    live_name: str = ''
+    folder: str = ''
+
+class Record(NamedTuple):
+    """歌手 CSV 的一行；本身就是 tuple，可直接作为差异比较的 key 和 csv.writer 的行"""
+    Type: str
+    Date: str
+    Album: str
+    No: str
+    Name: str
+
+RECORD_FIELDS = list(Record._fields)
+
+def make_track(values):
+    """从缓存中的列表恢复 Track，重复出现的字段做 intern"""
+    (folder_type, release_date, album_name, track_no, track_name,
+     file_name, parent_folder, live_name, folder) = values
+    return _tuple_new(Track, (intern(folder_type), intern(release_date), intern(album_name), track_no,
+                              track_name, file_name, intern(parent_folder), live_name, intern(folder)))
+
+def make_record(Type, Date, Album, No, Name):
+    """构造 Record，Type / Date / Album / No 做 intern（大量行共享）"""
+    return _tuple_new(Record, (intern(Type), intern(Date), intern(Album), intern(No), Name))
+
+def track_to_record(t):
+    """将扫描结果标准化为 CSV 行：album 使用 album_name，single/live 的 Album/No 用 '-'"""
+    Type = t.folder_type or '-'
+    Date = t.release_date or '-'
+
+    if Type == 'album':
+        return make_record(Type, Date, t.album_name or '-', t.track_no or '-', t.track_name or '-')
+    if Type == 'single':
+        Name = t.track_name or '-'
+    elif Type == 'live':
+        Name = t.live_name or '-'
+    else:
+        Name = '-'
+    return make_record(Type, Date, '-', '-', Name)
+
+def iter_artist_csv(csv_file):
+    """逐行读取歌手 CSV，产出 Record（流式差异使用，不把整个文件读入内存）"""
+    with open(csv_file, "r", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        if header == RECORD_FIELDS:
+            for row in reader:
+                if row:
+                    yield make_record(*row)
+        else:
+            idx = [header.index(name) for name in RECORD_FIELDS]
+            for row in reader:
+                if row:
+                    yield make_record(*(row[i] for i in idx))
+
+def read_artist_csv(csv_file):
+    """读取歌手 CSV 为 Record 列表"""
+    return list(iter_artist_csv(csv_file))
+
+# 多根目录曲库：歌手 CSV 末尾可带 Root 列，记录每行来自哪个根目录（同一条目在多个根目录上时以 | 分隔）
+ROOT_FIELD = "Root"
+# --probe：演唱会视频的时长 / 分辨率 / 编码，位于 Root 列之后（其余类型的行为空）
+MEDIA_FIELDS = ["Duration", "Resolution", "Codec"]
+
+def read_artist_header(csv_file):
+    """只读取歌手 CSV 的表头（判断是否带可选列时无需解析整个文件）；文件不存在或为空时返回 None"""
+    try:
+        with open(csv_file, "r", encoding="utf-8-sig") as f:
+            return next(csv.reader(f), None)
+    except OSError:
+        return None
+
+def has_artist_columns(header):
+    """(是否带 Root 列, 是否带视频信息列)"""
+    if header is None:
+        return False, False
+    return ROOT_FIELD in header, all(field in header for field in MEDIA_FIELDS)
+
+def read_artist_table(csv_file):
+    """
+    一次解析歌手 CSV，同时得到记录与可选列：(records, roots, media)。
+    roots {Record: 根目录} / media {Record: (Duration, Resolution, Codec)} 在 CSV 没有对应列时为 None；
+    文件不存在时返回 ([], None, None)。
+    """
+    try:
+        f = open(csv_file, "r", encoding="utf-8-sig")
+    except OSError:
+        return [], None, None
+    with f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return [], None, None
+        has_root, has_media = has_artist_columns(header)
+        idx = [header.index(name) for name in RECORD_FIELDS]
+        root_idx = header.index(ROOT_FIELD) if has_root else None
+        media_idx = [header.index(name) for name in MEDIA_FIELDS] if has_media else None
+        records = []
+        roots = {} if has_root else None
+        media = {} if has_media else None
+        for row in reader:
+            if not row:
+                continue
+            record = make_record(*(row[i] for i in idx))
+            records.append(record)
+            if has_root:
+                roots[record] = row[root_idx]
+            if has_media:
+                media[record] = tuple(row[i] for i in media_idx)
+    return records, roots, media
+
+# ---------- 排序：album -> single -> live，日期、曲号升序 ----------
+TYPE_ORDER = {"album": 0, "single": 1, "live": 2}
+UNKNOWN_DATE = (9999, 12, 31)
+
+@lru_cache(maxsize=4096)
+def date_rank(date):
+    """'2019.03.06' / '2019-03-06' → (2019, 3, 6)；无法解析的日期排在最后（日期在大量行间共享，结果缓存）"""
+    try:
+        return tuple(int(x) for x in date.replace("-", ".").split("."))
+    except ValueError:
+        return UNKNOWN_DATE
+
+@lru_cache(maxsize=4096)
+def track_rank(no):
+    """曲号 → 整数，'-' 与无法解析的曲号为 0"""
+    if no == '-':
+        return 0
+    try:
+        return int(no)
+    except ValueError:
+        return 0
+
+def record_sort_key(r):
+    """分块排序：album -> single -> live, 时间升序"""
+    return (TYPE_ORDER.get(r.Type, 3), date_rank(r.Date), track_rank(r.No), r.Name)
+
+def merge_sorted_records(old_records, additions):
+    """
+    将 additions 归并进已按 record_sort_key 有序的 old_records（本工具写出的 CSV 总是有序），
+    每行只计算一次排序键，旧条目整段切片复制，新增条目按二分位置插入：O(n + k log n)。
+    键相同时旧条目在前，与 (old_records + additions) 整体稳定排序的结果完全一致；
+    old_records 无序（如手工编辑过）时退回整体排序。
+    """
+    old_keys = [record_sort_key(r) for r in old_records]
+    if any(a > b for a, b in zip(old_keys, old_keys[1:])):
+        merged = list(old_records) + list(additions)
+        merged.sort(key=record_sort_key)
+        return merged
+
+    merged = []
+    start = 0
+    for key, r in sorted(((record_sort_key(r), r) for r in additions), key=lambda item: item[0]):
+        end = bisect_right(old_keys, key, start)
+        merged.extend(old_records[start:end])
+        merged.append(r)
+        start = end
+    merged.extend(old_records[start:])
+    return merged
@@ -0,0 +1,232 @@
+import os
+import csv
+import sqlite3
+import threading
+import unicodedata
+
+from Head_Cache import default_cache_dir
+from Head_Record import read_artist_csv
+
+# kind='artist'：歌手 CSV 的条目，索引 Name / Album
+# kind='cloud' ：Summary.csv 的条目，索引 Singer / Name / From
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id     INTEGER PRIMARY KEY,
+    kind   TEXT NOT NULL,
+    source TEXT NOT NULL,
+    type   TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    album  TEXT NOT NULL,
+    no     TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    text   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_source ON docs (kind, source);
+
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    doc  INTEGER NOT NULL,
+    PRIMARY KEY (gram, doc)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# 字段末尾补位字符：每个字符都是某个 bigram 的首字符，单字查询可按前缀范围检索
+PAD = "\x00"
+# 归一化后各字段在 docs.text 中的分隔符
+FIELD_SEP = "\n"
+
+def default_search_path():
+    return os.path.join(default_cache_dir(), "search.sqlite3")
+
+def normalize(text):
+    """NFKC（全角 / 半角、兼容字符统一）+ casefold，查询与索引使用同一规则"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+def field_grams(text):
+    """单个字段的字符 bigram（末尾补位），中日文无需分词即可子串匹配"""
+    if not text:
+        return set()
+    grams = {text[i:i + 2] for i in range(len(text) - 1)}
+    grams.add(text[-1] + PAD)
+    return grams
+
+def doc_grams(text):
+    grams = set()
+    for field in text.split(FIELD_SEP):
+        grams |= field_grams(field)
+    return grams
+
+def artist_doc(artist, r):
+    """歌手条目 → docs 行（不含 id）"""
+    text = FIELD_SEP.join(normalize(f) for f in (r.Name, r.Album) if f and f != '-')
+    return ("artist", artist, r.Type, r.Date, r.Album, r.No, r.Name, text)
+
+def cloud_doc(r):
+    """Summary 条目 → docs 行：album 列保存来源 (From)，source 列保存歌手 (Singer)"""
+    text = FIELD_SEP.join(normalize(f) for f in (r["Name"], r["Singer"], r["From"]) if f)
+    return ("cloud", r["Singer"], "cloud", "", r["From"], "", r["Name"], text)
+
+class SearchIndex:
+    """
+    跨歌手全文检索：docs 保存条目，grams 为 (bigram, doc) 倒排表。
+    查询先按 bigram 求候选交集，再用子串校验去掉误命中，不需要读取任何 CSV。
+    generate_csv / scan_and_export_summary 写入后按歌手增量更新。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_search_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---------- 更新 ----------
+    def _replace_source(self, kind, sources, docs):
+        """
+        将 kind 下 sources 的条目更新为 docs：只删除消失的条目、插入新增的条目，
+        未变化的条目及其倒排项保持不动。返回 (新增数, 删除数)。
+        """
+        placeholders = ",".join("?" * len(sources))
+        with self._lock, self.conn:
+            old = {}
+            if sources:
+                for row in self.conn.execute(
+                        f"SELECT id, kind, source, type, date, album, no, name, text FROM docs "
+                        f"WHERE kind = ? AND source IN ({placeholders})", (kind, *sources)):
+                    old.setdefault(row[1:], []).append(row[0])
+            new = {}
+            for doc in docs:
+                new[doc] = new.get(doc, 0) + 1
+
+            removed_ids = []
+            for doc, ids in old.items():
+                keep = new.get(doc, 0)
+                removed_ids.extend((doc[-1], doc_id) for doc_id in ids[keep:])
+            added = []
+            for doc, count in new.items():
+                added.extend([doc] * max(0, count - len(old.get(doc, ()))))
+
+            for text, doc_id in removed_ids:
+                self.conn.executemany("DELETE FROM grams WHERE gram = ? AND doc = ?",
+                                      ((g, doc_id) for g in doc_grams(text)))
+            self.conn.executemany("DELETE FROM docs WHERE id = ?", ((doc_id,) for _, doc_id in removed_ids))
+            for doc in added:
+                doc_id = self.conn.execute(
+                    "INSERT INTO docs (kind, source, type, date, album, no, name, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", doc).lastrowid
+                self.conn.executemany("INSERT OR IGNORE INTO grams VALUES (?, ?)",
+                                      ((g, doc_id) for g in doc_grams(doc[-1])))
+        return len(added), len(removed_ids)
+
+    def update_artist(self, artist, records):
+        """歌手 CSV 写入后调用，records 为最终写入的 Record 列表"""
+        return self._replace_source("artist", [artist], [artist_doc(artist, r) for r in records])
+
+    def update_cloud(self, records):
+        """Summary.csv 写入后调用，records 为 {Singer, Name, From} 列表"""
+        with self._lock:
+            singers = [r[0] for r in self.conn.execute("SELECT DISTINCT source FROM docs WHERE kind = 'cloud'")]
+        singers = sorted(set(singers) | {r["Singer"] for r in records})
+        return self._replace_source("cloud", singers, [cloud_doc(r) for r in records])
+
+    def rebuild(self, list_dir):
+        """从 List 目录下已有的歌手 CSV 与 Summary.csv 重建整个索引"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM grams")
+            self.conn.execute("DELETE FROM docs")
+        artists = 0
+        for artist in sorted(os.listdir(list_dir)):
+            csv_file = os.path.join(list_dir, artist, f"{artist}.csv")
+            if os.path.isfile(csv_file):
+                self.update_artist(artist, read_artist_csv(csv_file))
+                artists += 1
+        summary_csv = os.path.join(list_dir, "Summary.csv")
+        if os.path.isfile(summary_csv):
+            with open(summary_csv, "r", encoding="utf-8-sig") as f:
+                self.update_cloud(list(csv.DictReader(f)))
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', '1')")
+        return artists
+
+    def is_built(self):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    def ensure_built(self, list_dir):
+        """索引从未建立时，从已有 CSV 完整建立一次；之后由写入路径增量维护"""
+        if not self.is_built() and os.path.isdir(list_dir):
+            artists = self.rebuild(list_dir)
+            print(f"🔎 已从 {artists} 个歌手 CSV 与 Summary.csv 建立搜索索引")
+
+    # ---------- 查询 ----------
+    def _term_query(self, term):
+        """单个查询词 → 候选 doc 的 SQL 子查询"""
+        if len(term) == 1:
+            # 单字：所有以该字开头的 bigram（含末尾补位）
+            return "SELECT doc FROM grams WHERE gram >= ? AND gram < ?", [term, chr(ord(term) + 1)]
+        grams = sorted(field_grams(term) - {term[-1] + PAD})
+        placeholders = ",".join("?" * len(grams))
+        return (f"SELECT doc FROM grams WHERE gram IN ({placeholders}) "
+                f"GROUP BY doc HAVING COUNT(*) = {len(grams)}", grams)
+
+    def search(self, query, limit=50, types=None, artist=None):
+        """
+        子串检索：query 按空白拆分为多个词，全部命中才返回。
+        types: 可选类型集合 (album / single / live / cloud)；artist: 只查某位歌手（含 CloudMusic 的 Singer）
+        返回 dict 列表，字段 Kind / Artist / Type / Date / Album / No / Name（cloud 条目 Album 为来源）。
+        """
+        terms = normalize(query).split()
+        if not terms:
+            return []
+        subqueries, params = [], []
+        for term in terms:
+            sql, term_params = self._term_query(term)
+            subqueries.append(sql)
+            params.extend(term_params)
+        sql = ("SELECT kind, source, type, date, album, no, name, text FROM docs "
+               f"WHERE id IN ({' INTERSECT '.join(subqueries)})")
+        if artist:
+            sql += " AND source = ?"
+            params.append(artist)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+        results = []
+        for kind, source, type_, date, album, no, name, text in rows:
+            if types and type_ not in types:
+                continue
+            if not all(term in text for term in terms):
+                continue  # bigram 都命中但不连续
+            norm_name = normalize(name)
+            rank = 0 if norm_name == terms[0] else 1 if norm_name.startswith(terms[0]) else \
+                2 if terms[0] in norm_name else 3
+            results.append((rank, source, date, no, {
+                "Kind": kind, "Artist": source, "Type": type_, "Date": date,
+                "Album": album, "No": no, "Name": name,
+            }))
+        results.sort(key=lambda r: r[:4])
+        return [r[-1] for r in results[:limit]]
+
+    def stats(self):
+        with self._lock:
+            docs = self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            grams = self.conn.execute("SELECT COUNT(*) FROM grams").fetchone()[0]
+        return docs, grams
+
+def open_search_index(path=None, list_dir=None):
+    """打开搜索索引，首次使用时从 ../List 下的 CSV 建立"""
+    index = SearchIndex(path)
+    index.ensure_built(list_dir or os.path.dirname(default_cache_dir()))
+    return index
@@ -0,0 +1,556 @@
+import os
+import re
+import json
+import hashlib
+from html import escape
+from urllib.parse import quote
+from collections import defaultdict
+
+from Head_Output import write_if_changed, atomic_write
+from Head_Search import normalize, field_grams, FIELD_SEP
+
+# 静态网站导出：首页 + 每位歌手一页 + 每张专辑一页 + CloudMusic 每位歌手一页，
+# 以及供浏览器端检索的分片 JSON 索引（search/）。
+#
+#   增量生成：每位歌手 / 每位 CloudMusic 歌手为一个源，源与其中每个页面的内容哈希只由用到的行
+#             （与模板版本）决定，记录在输出目录的 .manifest.json。源哈希未变时整个源跳过；
+#             变化的源只重新渲染哈希变化的页面。搜索索引就地更新：内容不变的文档保留编号，
+#             只改动新增 / 删除文档涉及的分片。
+#   搜索索引：与 Head_Search 相同的归一化与字符 bigram（末尾补位）。
+#             search/g<k>.json  : {bigram: [doc 编号]}，k = bigram 首字符码位 % 分片数
+#             search/d<k>.json  : 第 k 段文档 [标签, 标题, 副标题, 链接, 归一化文本]
+#             search/meta.json  : 版本、分片数、每段文档数、文档总数
+#             浏览器只按查询词的 bigram 取对应的几个分片，不必下载整个索引。
+SITE_VERSION = 1
+SEARCH_SHARDS = 64
+DOCS_PER_SHARD = 512
+MANIFEST_NAME = ".manifest.json"
+
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+def safe_name(name):
+    """文件名中不能出现的字符替换为 _（不以 . 开头，避免成为隐藏文件）"""
+    name = _UNSAFE_CHARS.sub("_", name).strip() or "_"
+    return "_" + name[1:] if name.startswith(".") else name
+
+def artist_page_path(artist):
+    return f"artist/{safe_name(artist)}.html"
+
+def album_page_path(artist, date, album):
+    return f"album/{safe_name(artist)}/{safe_name(f'{date} {album}')}.html"
+
+def cloud_page_path(singer):
+    return f"cloud/{safe_name(singer)}.html"
+
+def link(path, prefix=""):
+    """站内相对链接（逐段 URL 编码）"""
+    return prefix + "/".join(quote(part) for part in path.split("/"))
+
+def rows_digest(*parts):
+    """页面源数据（及模板版本）的内容哈希"""
+    data = json.dumps([SITE_VERSION, parts], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+# ---------- 页面渲染 ----------
+STYLE_CSS = """body { font-family: system-ui, sans-serif; max-width: 960px; margin: 0 auto; padding: 1em; line-height: 1.5; }
+a { color: #0b66c3; text-decoration: none; }
+a:hover { text-decoration: underline; }
+nav { margin-bottom: 1em; color: #666; }
+table { border-collapse: collapse; }
+th, td { padding: 0.2em 0.8em; border-bottom: 1px solid #ddd; text-align: left; }
+td.n { text-align: right; }
+.no { color: #888; font-family: monospace; }
+.cloud { color: #888; font-size: 0.9em; }
+#q { width: 100%; font-size: 1.1em; padding: 0.4em; box-sizing: border-box; }
+#results li small { color: #666; }
+"""
+
+SEARCH_JS = """// 浏览器端检索：按查询词的 bigram 只取对应的分片（规则与 Head_Search 一致）
+const cache = {};
+let meta = null;
+
+function load(path) {
+  if (!(path in cache)) cache[path] = fetch(path).then(r => (r.ok ? r.json() : {}));
+  return cache[path];
+}
+
+// casefold 与 toLowerCase 结果不同的字符（ß → ss、ς → σ 等），由 Head_Site.casefold_table 生成
+const FOLD = __CASEFOLD__;
+
+function normalize(text) {
+  // 大小写折叠与上下文无关，逐字符查表即可复现 Python 的 casefold
+  return Array.from(text.normalize("NFKC"), c => FOLD[c] ?? c.toLowerCase()).join("");
+}
+
+function postings(gram) {
+  return load(`search/g${gram.codePointAt(0) % meta.shards}.json`);
+}
+
+async function termDocs(term) {
+  const chars = Array.from(term);
+  if (chars.length === 1) {
+    // 单字：所有以该字开头的 bigram（含末尾补位）
+    const shard = await postings(term);
+    const found = new Set();
+    for (const [gram, ids] of Object.entries(shard)) {
+      if (Array.from(gram)[0] === chars[0]) ids.forEach(id => found.add(id));
+    }
+    return found;
+  }
+  let found = null;
+  for (let i = 0; i + 1 < chars.length; i++) {
+    const gram = chars[i] + chars[i + 1];
+    const ids = new Set((await postings(gram))[gram] || []);
+    found = found === null ? ids : new Set([...found].filter(id => ids.has(id)));
+    if (found.size === 0) break;
+  }
+  return found;
+}
+
+async function search(query, limit) {
+  if (meta === null) meta = await load("search/meta.json");
+  const terms = normalize(query).split(/\\s+/).filter(Boolean);
+  if (!terms.length) return [];
+  let ids = null;
+  for (const term of terms) {
+    const found = await termDocs(term);
+    ids = ids === null ? found : new Set([...ids].filter(id => found.has(id)));
+    if (ids.size === 0) return [];
+  }
+  const results = [];
+  for (const id of ids) {
+    const docs = await load(`search/d${Math.floor(id / meta.per_shard)}.json`);
+    const doc = docs[id % meta.per_shard];
+    if (!doc) continue;  // 已删除的文档（编号待复用）
+    const [label, title, subtitle, url, text] = doc;
+    if (!terms.every(term => text.includes(term))) continue;  // bigram 都命中但不连续
+    const name = normalize(title);
+    const rank = name === terms[0] ? 0 : name.startsWith(terms[0]) ? 1 : name.includes(terms[0]) ? 2 : 3;
+    results.push({rank, id, label, title, subtitle, url});
+  }
+  results.sort((a, b) => a.rank - b.rank || a.id - b.id);
+  return results.slice(0, limit);
+}
+
+function escapeHtml(text) {
+  return text.replace(/[&<>"']/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c]));
+}
+
+const input = document.getElementById("q");
+const list = document.getElementById("results");
+let pending = 0;
+input.addEventListener("input", async () => {
+  const ticket = ++pending;
+  const results = await search(input.value, 50);
+  if (ticket !== pending) return;  // 已有更新的输入
+  list.innerHTML = results.map(r =>
+    `<li>${r.label} <a href="${r.url}">${escapeHtml(r.title)}</a> <small>${escapeHtml(r.subtitle)}</small></li>`
+  ).join("");
+});
+"""
+
+def casefold_table():
+    """casefold 与 lower 结果不同的字符 → casefold 结果（目前全部在 BMP 内，扫描约 20 ms）"""
+    return {c: c.casefold() for c in map(chr, range(0x10000)) if c.casefold() != c.lower()}
+
+def search_js():
+    """浏览器端检索脚本：嵌入 casefold 差异表，使查询与 Head_Search.normalize 归一化结果一致"""
+    return SEARCH_JS.replace("__CASEFOLD__", json.dumps(casefold_table(), sort_keys=True, separators=(",", ":")))
+
+def render_page(title, body, prefix=""):
+    return (f'<!DOCTYPE html>\n<html lang="zh">\n<head>\n<meta charset="utf-8">\n'
+            f'<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+            f'<title>{escape(title)}</title>\n<link rel="stylesheet" href="{prefix}style.css">\n'
+            f'</head>\n<body>\n{body}\n</body>\n</html>\n')
+
+def cloud_note(sources):
+    return f' <span class="cloud">☁️ {escape(", ".join(sources))}</span>' if sources else ""
+
+def group_artist_rows(rows, sources):
+    """歌手记录 → (albums {(Date, Album): [(No, Name, 来源)]}, singles, lives)，与歌手 README 的分组一致"""
+    albums = defaultdict(list)
+    singles, lives = [], []
+    for row in rows:
+        srcs = sources.get(row, [])
+        if row.Type == 'album':
+            albums[(row.Date, row.Album)].append((row.No.zfill(3), row.Name, srcs))
+        elif row.Type == 'single':
+            singles.append((row.Date, row.Name, srcs))
+        elif row.Type == 'live':
+            lives.append((row.Date, row.Name, srcs))
+    for tracks in albums.values():
+        tracks.sort(key=lambda x: x[0])
+    singles.sort(key=lambda x: x[0])
+    lives.sort(key=lambda x: x[0])
+    return dict(sorted(albums.items())), singles, lives
+
+def render_artist_page(artist, albums, singles, lives):
+    parts = [f'<nav><a href="../index.html">🏠 首页</a></nav>', f"<h1>🎵 {escape(artist)}</h1>"]
+    if albums:
+        parts.append('<h2 id="albums">📀 Albums</h2>\n<table>\n<tr><th>日期</th><th>专辑</th><th>曲目数</th></tr>')
+        for (date, album), tracks in albums.items():
+            href = link(album_page_path(artist, date, album), "../")
+            parts.append(f'<tr><td>{escape(date)}</td><td><a href="{href}">{escape(album)}</a></td>'
+                         f'<td class="n">{len(tracks)}</td></tr>')
+        parts.append("</table>")
+    for anchor, heading, items in (("singles", "🎵 Singles", singles), ("lives", "🎤 Lives", lives)):
+        if items:
+            parts.append(f'<h2 id="{anchor}">{heading}</h2>\n<ul>')
+            parts += [f'<li><span class="no">[{escape(date or "-")}]</span> {escape(name)}{cloud_note(srcs)}</li>'
+                      for date, name, srcs in items]
+            parts.append("</ul>")
+    return render_page(f"{artist} 歌曲列表", "\n".join(parts), "../")
+
+def render_album_page(artist, date, album, tracks):
+    artist_href = link(artist_page_path(artist), "../../")
+    parts = [f'<nav><a href="../../index.html">🏠 首页</a> / <a href="{artist_href}">{escape(artist)}</a></nav>',
+             f"<h1>📁 {escape(album)}</h1>", f"<p>{escape(artist)} · {escape(date)} · {len(tracks)} 首</p>", "<ol>"]
+    parts += [f'<li><span class="no">[{escape(no)}]</span> {escape(name)}{cloud_note(srcs)}</li>'
+              for no, name, srcs in tracks]
+    parts.append("</ol>")
+    return render_page(f"{album} - {artist}", "\n".join(parts), "../../")
+
+def render_index_page(artists, singers, cloud_total):
+    """artists: [(歌手, 专辑数, 专辑曲目数, 单曲数, 演唱会数)]；singers: [(CloudMusic 歌手, 曲目数)]"""
+    parts = ["<h1>🎵 曲库</h1>",
+             '<input id="q" type="search" placeholder="🔎 检索曲名 / 专辑 / 歌手 / 来源" autofocus>',
+             '<ul id="results"></ul>', "<h2>歌手</h2>",
+             "<table>\n<tr><th>歌手</th><th>专辑</th><th>专辑曲目</th><th>单曲</th><th>演唱会</th></tr>"]
+    for artist, n_albums, n_tracks, n_singles, n_lives in artists:
+        parts.append(f'<tr><td><a href="{link(artist_page_path(artist))}">{escape(artist)}</a></td>'
+                     f'<td class="n">{n_albums}</td><td class="n">{n_tracks}</td>'
+                     f'<td class="n">{n_singles}</td><td class="n">{n_lives}</td></tr>')
+    parts.append("</table>")
+    if singers:
+        parts.append(f"<h2>☁️ CloudMusic（共 {cloud_total} 首）</h2>\n<ul>")
+        parts += [f'<li><a href="{link(cloud_page_path(singer))}">{escape(singer)}</a> ({count})</li>'
+                  for singer, count in singers]
+        parts.append("</ul>")
+    parts.append('<script src="search.js"></script>')
+    return render_page("曲库", "\n".join(parts))
+
+def render_cloud_page(singer, rows):
+    """rows: [(Name, From, 对应的专辑 / 单曲页链接或 None, 标注文字)]"""
+    parts = [f'<nav><a href="../index.html">🏠 首页</a></nav>', f"<h1>☁️ {escape(singer)} (共 {len(rows)} 首)</h1>", "<ul>"]
+    for name, source, target, note in rows:
+        annotation = f' <a class="cloud" href="{link(target, "../")}">{escape(note)}</a>' if target else ""
+        parts.append(f"<li>{escape(name)} （{escape(source)}）{annotation}</li>")
+    parts.append("</ul>")
+    return render_page(f"{singer} - CloudMusic", "\n".join(parts), "../")
+
+# ---------- 页面规划：每位歌手、每位 CloudMusic 歌手为一个源，源的哈希不变时跳过它的全部页面 ----------
+def cloud_target(link_value):
+    """CloudMusic 条目的匹配结果 → (目标页面, 标注文字)"""
+    artist, (Type, Date, Album, No, Name), score = link_value
+    mark = "↔" if score >= 1.0 else "≈"
+    if Type == "album":
+        return album_page_path(artist, Date, Album), f"{mark} 📀 {artist} · ({Date}) {Album} [{No.zfill(3)}]"
+    return artist_page_path(artist), f"{mark} 🎵 {artist} · [{Type}] {Date} {Name}"
+
+def plan_artist(artist, rows, sources):
+    """
+    一位歌手的 (pages, docs, summary)：
+        pages  : [(相对路径, 源数据哈希, 渲染函数)]
+        docs   : 搜索文档 [标签, 标题, 副标题, 链接, 归一化文本]
+        summary: 首页一行 (专辑数, 专辑曲目数, 单曲数, 演唱会数)
+    """
+    albums, singles, lives = group_artist_rows(rows, sources)
+    pages = [(artist_page_path(artist), rows_digest("artist", artist, list(albums.items()), singles, lives),
+              lambda: render_artist_page(artist, albums, singles, lives))]
+    docs = []
+    artist_text = FIELD_SEP + normalize(artist)  # 网页上没有按歌手筛选，歌手名也参与检索
+    for (date, album), tracks in albums.items():
+        path = album_page_path(artist, date, album)
+        pages.append((path, rows_digest("album", artist, date, album, tracks),
+                      lambda d=date, al=album, t=tracks: render_album_page(artist, d, al, t)))
+        href, suffix = link(path), FIELD_SEP + normalize(album) + artist_text
+        docs += [["📀", name, f"{artist} · ({date}) {album} [{no}]", href, normalize(name) + suffix]
+                 for no, name, _ in tracks]
+    page = link(artist_page_path(artist))
+    docs += [["🎵", name, f"{artist} · [single] {date}", page + "#singles", normalize(name) + artist_text]
+             for date, name, _ in singles]
+    docs += [["🎤", name, f"{artist} · [live] {date or '-'}", page + "#lives", normalize(name) + artist_text]
+             for date, name, _ in lives]
+    summary = [len(albums), sum(len(t) for t in albums.values()), len(singles), len(lives)]
+    return pages, docs, summary
+
+def plan_cloud_singer(singer, rows):
+    """一位 CloudMusic 歌手的 (pages, docs, summary)；rows 为 [(Name, From, 目标页面, 标注文字)]"""
+    path = cloud_page_path(singer)
+    pages = [(path, rows_digest("cloud", singer, rows), lambda: render_cloud_page(singer, rows))]
+    href = link(path)
+    docs = [["☁️", name, f"{singer} · {source}", href,
+             FIELD_SEP.join(normalize(f) for f in (name, singer, source) if f)] for name, source, _, _ in rows]
+    return pages, docs, [len(rows)]
+
+def plan_sources(catalogs, cloud_records, links=None):
+    """{源: (源数据哈希, 规划函数)}；源为 'artist:<歌手>' 或 'cloud:<CloudMusic 歌手>'"""
+    plans = {}
+    for artist, rows in catalogs.items():
+        sources = links.for_artist(artist) if links is not None else {}
+        marks = sorted([list(record), srcs] for record, srcs in sources.items())
+        plans[f"artist:{artist}"] = (rows_digest("artist", artist, rows, marks),
+                                     lambda a=artist, r=rows, s=sources: plan_artist(a, r, s))
+    by_singer = defaultdict(list)
+    for r in cloud_records:
+        found = links.for_cloud(r) if links is not None else None
+        by_singer[r["Singer"]].append((r["Name"], r["From"], *(cloud_target(found) if found else (None, None))))
+    for singer in sorted(by_singer):
+        rows = sorted(by_singer[singer], key=lambda x: (x[0], x[1]))
+        plans[f"cloud:{singer}"] = (rows_digest("cloud", singer, rows), lambda s=singer, r=rows: plan_cloud_singer(s, r))
+    return plans
+
+# ---------- 分片搜索索引 ----------
+def shard_of(gram):
+    return ord(gram[0]) % SEARCH_SHARDS
+
+def text_grams(text):
+    grams = set()
+    for field in text.split(FIELD_SEP):
+        grams |= field_grams(field)
+    return grams
+
+def dump_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+def build_search_files(docs):
+    """全部搜索文档（下标即编号）→ {相对路径: JSON 文本}"""
+    postings = defaultdict(list)
+    grams_of = {}  # 相同的归一化文本（同名曲目）只切分一次
+    for doc_id, doc in enumerate(docs):
+        grams = grams_of.get(doc[4])
+        if grams is None:
+            grams = grams_of[doc[4]] = text_grams(doc[4])
+        for gram in grams:
+            postings[gram].append(doc_id)
+
+    shards = defaultdict(dict)
+    for gram, ids in postings.items():
+        shards[shard_of(gram)][gram] = ids
+    files = {f"search/g{k}.json": dump_json(shards.get(k, {})) for k in range(SEARCH_SHARDS)}
+    for start in range(0, len(docs), DOCS_PER_SHARD):
+        files[f"search/d{start // DOCS_PER_SHARD}.json"] = dump_json(docs[start:start + DOCS_PER_SHARD])
+    files["search/meta.json"] = dump_json({"version": SITE_VERSION, "shards": SEARCH_SHARDS,
+                                           "per_shard": DOCS_PER_SHARD, "docs": len(docs)})
+    return files
+
+class SearchShards:
+    """增量更新时按需读取、修改并写回的索引分片（g<k> 为 bigram 倒排表，d<k> 为文档段）"""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.loaded = {}
+        self.dirty = set()
+
+    def get(self, name, default):
+        if name not in self.loaded:
+            try:
+                with open(os.path.join(self.out_dir, "search", f"{name}.json"), "r", encoding="utf-8") as f:
+                    self.loaded[name] = json.load(f)
+            except (OSError, ValueError):
+                self.loaded[name] = default
+        return self.loaded[name]
+
+    def doc(self, doc_id):
+        docs = self.get(f"d{doc_id // DOCS_PER_SHARD}", [])
+        i = doc_id % DOCS_PER_SHARD
+        return docs[i] if i < len(docs) else None
+
+    def set_doc(self, doc_id, doc):
+        name = f"d{doc_id // DOCS_PER_SHARD}"
+        docs = self.get(name, [])
+        i = doc_id % DOCS_PER_SHARD
+        if i >= len(docs):
+            docs.extend([None] * (i + 1 - len(docs)))
+        docs[i] = doc
+        while docs and docs[-1] is None:
+            docs.pop()
+        self.dirty.add(name)
+
+    def update_postings(self, removed, added):
+        """removed / added: {bigram: {doc 编号}}；只读写涉及到的 g 分片"""
+        for gram in set(removed) | set(added):
+            name = f"g{shard_of(gram)}"
+            shard = self.get(name, {})
+            ids = set(shard.get(gram, ())) - removed.get(gram, set()) | added.get(gram, set())
+            if ids:
+                shard[gram] = sorted(ids)
+            else:
+                shard.pop(gram, None)
+            self.dirty.add(name)
+
+    def save(self, out_dir):
+        return sum(_write(out_dir, f"search/{name}.json", dump_json(self.loaded[name])) for name in sorted(self.dirty))
+
+def update_search_index(out_dir, state, changes):
+    """
+    就地更新搜索索引：changes 为 {源: (旧文档编号, 新文档)}。
+    内容不变的文档保留原编号，只有新增 / 删除的文档改动倒排表，其余分片不读不写。
+    返回 (新的索引状态, {源: 文档编号}, 写入文件数)。
+    """
+    shards = SearchShards(out_dir)
+    free = list(state["free"])
+    next_id = state["next"]
+    removed, added = defaultdict(set), defaultdict(set)
+    assigned, pending = {}, []
+    for key, (old_ids, docs) in changes.items():
+        kept = defaultdict(list)
+        for doc_id in old_ids:
+            doc = shards.doc(doc_id)
+            if doc is not None:
+                kept[tuple(doc)].append(doc_id)
+        ids = assigned[key] = []
+        for doc in docs:
+            same = kept.get(tuple(doc))
+            if same:
+                ids.append(same.pop())
+            else:
+                pending.append((ids, doc))
+        for doc_ids in kept.values():
+            for doc_id in doc_ids:
+                for gram in text_grams(shards.doc(doc_id)[4]):
+                    removed[gram].add(doc_id)
+                shards.set_doc(doc_id, None)
+                free.append(doc_id)
+
+    free.sort(reverse=True)  # 优先复用小编号
+    for ids, doc in pending:
+        if free:
+            doc_id = free.pop()
+        else:
+            doc_id, next_id = next_id, next_id + 1
+        ids.append(doc_id)
+        shards.set_doc(doc_id, doc)
+        for gram in text_grams(doc[4]):
+            added[gram].add(doc_id)
+    shards.update_postings(removed, added)
+    written = shards.save(out_dir)
+    written += _write(out_dir, "search/meta.json", dump_json({"version": SITE_VERSION, "shards": SEARCH_SHARDS,
+                                                              "per_shard": DOCS_PER_SHARD, "docs": next_id}))
+    return {"next": next_id, "free": sorted(free)}, assigned, written
+
+# ---------- 输出 ----------
+def empty_manifest():
+    return {"sources": {}, "index_page": None, "search": None}
+
+def load_manifest(out_dir):
+    """
+    {"sources": {源: {"digest", "pages": {路径: 哈希}, "summary", "docs": [文档编号]}},
+     "index_page": 首页哈希, "search": {"next", "free"}}；不存在、损坏或版本不符时为空
+    """
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == SITE_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return empty_manifest()
+
+def save_manifest(out_dir, manifest):
+    manifest["version"] = SITE_VERSION
+    atomic_write(os.path.join(out_dir, MANIFEST_NAME), dump_json(manifest).encode("utf-8"))
+
+def _write(out_dir, path, text):
+    full = os.path.join(out_dir, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    return write_if_changed(full, text)[0]
+
+def _remove(out_dir, path):
+    """删除已不存在的页面，并清理因此变空的目录"""
+    full = os.path.join(out_dir, path)
+    if os.path.exists(full):
+        os.remove(full)
+    directory = os.path.dirname(full)
+    while os.path.abspath(directory) != os.path.abspath(out_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+def build_site(out_dir, catalogs, cloud_records, links=None, force=False):
+    """
+    生成 / 增量更新静态网站。
+    catalogs: {歌手: [Record]}；cloud_records: Summary.csv 的 dict 行；links: CloudLinks（match 的结果）或 None
+    源数据哈希与清单一致的歌手不做任何处理；变化的歌手只重新渲染哈希变化的页面，搜索索引就地更新。
+    清单缺失、首页不存在或 force=True 时全部重新生成。
+    返回 {"pages", "rendered", "written", "removed", "index"}：
+        rendered 为重新渲染的页面数，written 为内容确有变化而写入的文件数，index 为 "full" / "incremental" / None。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    old = load_manifest(out_dir)
+    if force or not os.path.exists(os.path.join(out_dir, "index.html")) or \
+            not os.path.exists(os.path.join(out_dir, "search", "meta.json")):
+        old = empty_manifest()
+    rebuild_index = old["search"] is None
+    result = {"pages": 1, "rendered": 0, "written": 0, "removed": 0, "index": None}
+
+    entries, changes, all_docs = {}, {}, {}
+    for key, (digest, plan) in plan_sources(catalogs, cloud_records, links).items():
+        entry = old["sources"].get(key)
+        changed = entry is None or entry["digest"] != digest
+        if not changed and not rebuild_index:
+            entries[key] = entry
+            result["pages"] += len(entry["pages"])
+            continue
+        pages, docs, summary = plan()
+        all_docs[key] = docs
+        old_pages = entry["pages"] if entry is not None else {}
+        for path, page_digest, render in pages:
+            if old_pages.get(path) == page_digest:
+                continue
+            result["rendered"] += 1
+            result["written"] += _write(out_dir, path, render())
+        new_pages = {path: page_digest for path, page_digest, _ in pages}
+        for path in set(old_pages) - set(new_pages):
+            _remove(out_dir, path)
+            result["removed"] += 1
+        result["pages"] += len(new_pages)
+        entries[key] = {"digest": digest, "pages": new_pages, "summary": summary,
+                        "docs": entry["docs"] if entry is not None else []}
+        if changed:
+            changes[key] = (entries[key]["docs"], docs)
+    for key in set(old["sources"]) - set(entries):
+        for path in old["sources"][key]["pages"]:
+            _remove(out_dir, path)
+            result["removed"] += 1
+        changes[key] = (old["sources"][key]["docs"], [])
+
+    artists = [(key[len("artist:"):], *entry["summary"]) for key, entry in entries.items() if key.startswith("artist:")]
+    singers = [(key[len("cloud:"):], *entry["summary"]) for key, entry in entries.items() if key.startswith("cloud:")]
+    index_digest = rows_digest("index", artists, singers)
+    if index_digest != old["index_page"]:
+        result["rendered"] += 1
+        result["written"] += _write(out_dir, "index.html",
+                                    render_index_page(artists, singers, sum(count for _, count in singers)))
+    for path, text in (("style.css", STYLE_CSS), ("search.js", search_js())):
+        result["written"] += _write(out_dir, path, text)
+
+    search = old["search"]
+    if rebuild_index:
+        docs, next_id = [], 0
+        for key, entry in entries.items():
+            entry["docs"] = list(range(next_id, next_id + len(all_docs[key])))
+            next_id += len(all_docs[key])
+            docs += all_docs[key]
+        files = build_search_files(docs)
+        for path, text in files.items():
+            result["written"] += _write(out_dir, path, text)
+        search_dir = os.path.join(out_dir, "search")
+        for name in os.listdir(search_dir):
+            if f"search/{name}" not in files:
+                os.remove(os.path.join(search_dir, name))
+        search = {"next": next_id, "free": []}
+        result["index"] = "full"
+    elif changes:
+        search, assigned, written = update_search_index(out_dir, search, changes)
+        for key, ids in assigned.items():
+            if key in entries:
+                entries[key]["docs"] = ids
+        result["written"] += written
+        result["index"] = "incremental"
+
+    if changes or rebuild_index or index_digest != old["index_page"]:
+        save_manifest(out_dir, {"sources": entries, "index_page": index_digest, "search": search})
+    return result
@@ -0,0 +1,147 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from Head_Cache import default_cache_dir
+from Head_Output import atomic_write
+from Head_Walk import folder_type_of, CLOUD_FOLDER
+
+SNAPSHOT_VERSION = 1
+# NAS / 操作系统生成的索引与回收站文件，不参与比较
+IGNORED_NAMES = {"@eaDir", "#recycle", ".DS_Store", "Thumbs.db", "desktop.ini"}
+
+# 树节点：[hash, size_hash, {子目录名: 节点}, {文件名: [size, mtime]}]
+#   hash     : 名称 + 大小 + mtime（秒）自底向上的 Merkle 哈希
+#   size_hash: 只含名称 + 大小，--ignore-mtime 比较使用（复制时未保留 mtime 的副本）
+HASH, SIZE_HASH, DIRS, FILES = range(4)
+
+def default_snapshot_path():
+    return os.path.join(default_cache_dir(), "snapshot.json.gz")
+
+def _digest(lines):
+    h = hashlib.blake2b(digest_size=16)
+    for line in lines:
+        h.update(line.encode("utf-8", "surrogateescape"))
+    return h.hexdigest()
+
+def make_node(dirs, files):
+    """由子目录节点与文件 (size, mtime) 计算本目录的两个哈希（按名称排序，与遍历顺序无关）"""
+    full, sized = [], []
+    for name in sorted(dirs):
+        child = dirs[name]
+        full.append(f"d\0{name}\0{child[HASH]}\n")
+        sized.append(f"d\0{name}\0{child[SIZE_HASH]}\n")
+    for name in sorted(files):
+        size, mtime = files[name]
+        full.append(f"f\0{name}\0{size}\0{mtime}\n")
+        sized.append(f"f\0{name}\0{size}\n")
+    return [_digest(full), _digest(sized), dirs, files]
+
+def _read_dir(path):
+    """单次 scandir：返回 (子目录名列表, {文件名: [size, mtime]})"""
+    dirs, files = [], {}
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name in IGNORED_NAMES:
+                continue
+            try:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    st = entry.stat()
+                    # mtime 取整秒：NAS / exFAT 的时间精度不同，亚秒部分不可靠
+                    files[entry.name] = [st.st_size, int(st.st_mtime)]
+            except OSError:
+                continue  # 条目在遍历过程中被删除或无权限
+    return dirs, files
+
+def snapshot_dir(path):
+    """递归读取目录，自底向上返回 Merkle 树节点"""
+    names, files = _read_dir(path)
+    return make_node({name: snapshot_dir(os.path.join(path, name)) for name in names}, files)
+
+def build_snapshot(root, workers=4):
+    """
+    为整个曲库建立快照：根目录下的每个子目录（歌手 / CloudMusic）在线程池中并行遍历。
+    返回 {"version", "root", "created", "tree"}。
+    """
+    root = os.path.abspath(root)
+    names, files = _read_dir(root)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        dirs = dict(zip(names, pool.map(lambda name: snapshot_dir(os.path.join(root, name)), names)))
+    return {"version": SNAPSHOT_VERSION, "root": root,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "tree": make_node(dirs, files)}
+
+def save_snapshot(snapshot, path=None):
+    """保存为 gzip 压缩的紧凑 JSON（原子写入），返回路径"""
+    path = path or default_snapshot_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8", "surrogateescape")
+    atomic_write(path, gzip.compress(data, compresslevel=6))
+    return path
+
+def load_snapshot(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    snapshot = json.loads(data.decode("utf-8", "surrogateescape"))
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的快照版本: {path}")
+    return snapshot
+
+def open_snapshot(source, workers=4):
+    """source 为快照文件时读取，为目录时现场建立快照"""
+    if os.path.isdir(source):
+        return build_snapshot(source, workers)
+    return load_snapshot(source)
+
+def count_files(node):
+    return len(node[FILES]) + sum(count_files(child) for child in node[DIRS].values())
+
+def diff_trees(a, b, ignore_mtime=False, stats=None, path=()):
+    """
+    比较两棵 Merkle 树，只进入哈希不同的子树，产出差异：
+        ("+dir", 路径, 文件数) / ("-dir", 路径, 文件数)   只在一侧存在的目录（整棵子树）
+        ("+file", 路径, (size, mtime)) / ("-file", 路径, (size, mtime))
+        ("~file", 路径, ((size, mtime), (size, mtime)))  两侧都有但大小（或 mtime）不同
+    路径为名称元组；stats 为可选 dict，累计实际访问的目录数 (visited)。
+    """
+    key = SIZE_HASH if ignore_mtime else HASH
+    if a[key] == b[key]:
+        return
+    if stats is not None:
+        stats["visited"] = stats.get("visited", 0) + 1
+
+    a_dirs, b_dirs = a[DIRS], b[DIRS]
+    for name in sorted(a_dirs.keys() | b_dirs.keys()):
+        if name not in b_dirs:
+            yield "-dir", path + (name,), count_files(a_dirs[name])
+        elif name not in a_dirs:
+            yield "+dir", path + (name,), count_files(b_dirs[name])
+        else:
+            yield from diff_trees(a_dirs[name], b_dirs[name], ignore_mtime, stats, path + (name,))
+
+    a_files, b_files = a[FILES], b[FILES]
+    for name in sorted(a_files.keys() | b_files.keys()):
+        if name not in b_files:
+            yield "-file", path + (name,), tuple(a_files[name])
+        elif name not in a_files:
+            yield "+file", path + (name,), tuple(b_files[name])
+        else:
+            old, new = a_files[name], b_files[name]
+            if old[0] != new[0] or (not ignore_mtime and old[1] != new[1]):
+                yield "~file", path + (name,), (tuple(old), tuple(new))
+
+def layout_label(path):
+    """按曲库布局给出差异所在的类别：歌手 / album / single / live / cloud"""
+    if not path:
+        return "root"
+    if path[0] == CLOUD_FOLDER:
+        return "cloud"
+    if len(path) == 1:
+        return "artist"
+    return folder_type_of(path[1])
@@ -0,0 +1,131 @@
+import os
+import csv
+import heapq
+import tempfile
+from itertools import groupby
+
+from Head_Cache import default_cache_dir
+
+# 每段在内存中排序的行数，超过后写入临时文件
+SPILL_ROWS = 100_000
+
+class UnsortedInput(ValueError):
+    """stream_diff 的旧数据流没有按 key 排序（例如 CSV 被手工编辑过）"""
+
+class SortedSpill:
+    """
+    外部排序：按 key 稳定排序任意长的行流。
+    每累计 spill_rows 行排序一次并写入临时 CSV（一个 run），迭代时用 heapq.merge 归并所有 run，
+    内存中只有一段 run 加上每个 run 的当前行；总行数不超过 spill_rows 时不落盘。
+    行须为字符串元组，make_row 把读回的字段列表还原为行（如 Record）。
+    可多次迭代（差异计算一次、写入 CSV 一次）；以 with 使用，退出时删除临时文件。
+    临时文件默认放在 List/.cache 下（/tmp 可能是 tmpfs，落盘等于仍占内存）。
+    """
+
+    def __init__(self, rows, key, spill_rows=SPILL_ROWS, make_row=tuple, tmp_dir=None):
+        self.key = key
+        self.make_row = make_row
+        self.tmp_dir = tmp_dir or default_cache_dir()
+        self.runs = []
+        self.count = 0
+        self._memory = []
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= spill_rows:
+                self._spill(chunk)
+                chunk = []
+        chunk.sort(key=key)
+        if self.runs and chunk:
+            self._spill(chunk)
+        else:
+            self._memory = chunk
+            self.count += len(chunk)
+
+    def _spill(self, chunk):
+        chunk.sort(key=self.key)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=".spill_", suffix=".csv", dir=self.tmp_dir)
+        self.runs.append(path)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(chunk)
+        self.count += len(chunk)
+
+    def _iter_run(self, path):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for fields in csv.reader(f):
+                yield self.make_row(fields)
+
+    def __iter__(self):
+        if not self.runs:
+            return iter(self._memory)
+        # heapq.merge 在键相同时先取靠前的 run，各 run 按输入顺序生成，因此整体仍是稳定排序
+        return heapq.merge(*(self._iter_run(path) for path in self.runs), key=self.key)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        for path in self.runs:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self.runs = []
+        self._memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def stream_diff(old_rows, new_rows, key):
+    """
+    两个按 key 有序的行流做 merge-join，逐个产出 ("+", 行) / ("-", 行)。
+    语义与 set(new) - set(old) / set(old) - set(new) 相同（重复行只算一次）。
+    key 相同的一组行（通常只有一两行）在组内按集合比较，因此 key 不必区分所有字段，
+    内存只与最大的一组有关，与总行数无关。
+    old_rows 未按 key 排序时抛出 UnsortedInput（已产出的结果应丢弃）。
+    """
+    old_groups = groupby(old_rows, key)
+    new_groups = groupby(new_rows, key)
+    old = next(old_groups, None)
+    new = next(new_groups, None)
+    last_old_key = None
+
+    def next_old():
+        nonlocal last_old_key
+        last_old_key = old[0]
+        following = next(old_groups, None)
+        if following is not None and not last_old_key < following[0]:
+            raise UnsortedInput("旧数据未按规范顺序排列")
+        return following
+
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            for row in dict.fromkeys(old[1]):
+                yield "-", row
+            old = next_old()
+        elif old is None or new[0] < old[0]:
+            for row in dict.fromkeys(new[1]):
+                yield "+", row
+            new = next(new_groups, None)
+        else:
+            old_set = dict.fromkeys(old[1])
+            new_set = dict.fromkeys(new[1])
+            for row in new_set:
+                if row not in old_set:
+                    yield "+", row
+            for row in old_set:
+                if row not in new_set:
+                    yield "-", row
+            old = next_old()
+            new = next(new_groups, None)
+
+def collect_diff(changes):
+    """把 stream_diff 的结果收集为 (新增列表, 删除列表)，差异本身通常远小于曲库"""
+    added, removed = [], []
+    for sign, row in changes:
+        (added if sign == "+" else removed).append(row)
+    return added, removed
@@ -0,0 +1,191 @@
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from Head_Cache import FileCache
+from Head_Record import intern
+
+# 单个文本帧 / 注释的读取上限，超过的帧（封面图片等）直接 seek 跳过
+MAX_FIELD_BYTES = 64 * 1024
+
+ID3_TEXT_FRAMES = {
+    'TIT2': 'title', 'TT2': 'title',
+    'TALB': 'album', 'TAL': 'album',
+    'TRCK': 'track', 'TRK': 'track',
+    'TDRC': 'date', 'TYER': 'year', 'TYE': 'year', 'TDAT': 'daymonth', 'TDA': 'daymonth',
+}
+VORBIS_KEYS = {'TITLE': 'title', 'ALBUM': 'album', 'TRACKNUMBER': 'track', 'DATE': 'date'}
+
+def read_flac_tags(f):
+    """
+    读取 FLAC 的 VORBIS_COMMENT 块：逐个读取 4 字节块头，
+    非注释块（STREAMINFO / PICTURE / PADDING ...）直接 seek 跳过，不读音频数据。
+    """
+    if f.read(4) != b'fLaC':
+        return None
+    tags = {}
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            break
+        is_last = header[0] & 0x80
+        block_type = header[0] & 0x7F
+        length = int.from_bytes(header[1:], 'big')
+        if block_type != 4:
+            f.seek(length, os.SEEK_CUR)
+        else:
+            block = f.read(min(length, MAX_FIELD_BYTES * 4))
+            vendor_len = struct.unpack_from('<I', block, 0)[0]
+            pos = 4 + vendor_len
+            count = struct.unpack_from('<I', block, pos)[0]
+            pos += 4
+            for _ in range(count):
+                if pos + 4 > len(block):
+                    break
+                size = struct.unpack_from('<I', block, pos)[0]
+                pos += 4
+                key, _, value = block[pos:pos + size].decode('utf-8', 'replace').partition('=')
+                pos += size
+                field = VORBIS_KEYS.get(key.upper())
+                if field and field not in tags:
+                    tags[field] = value.strip()
+            break
+        if is_last:
+            break
+    return tags
+
+def _syncsafe(data):
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+def _decode_text(data):
+    """解码 ID3 文本帧：首字节为编码 (0=latin1, 1=UTF-16 BOM, 2=UTF-16BE, 3=UTF-8)"""
+    if not data:
+        return ''
+    encoding = {0: 'latin-1', 1: 'utf-16', 2: 'utf-16-be', 3: 'utf-8'}.get(data[0], 'latin-1')
+    text = data[1:].decode(encoding, 'replace')
+    return text.split('\x00', 1)[0].strip()
+
+def read_id3_tags(f):
+    """
+    读取 MP3 的 ID3v2.2 / 2.3 / 2.4 标签：只读取标签区域内的文本帧，
+    APIC 等大帧按帧长 seek 跳过。
+    """
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b'ID3':
+        return None
+    major = header[3]
+    flags = header[5]
+    tag_end = 10 + _syncsafe(header[6:10])
+    if flags & 0x40 and major >= 3:
+        # 扩展头
+        ext = f.read(4)
+        ext_size = _syncsafe(ext) if major == 4 else int.from_bytes(ext, 'big') + 4
+        f.seek(10 + ext_size)
+
+    id_len, header_len = (3, 6) if major == 2 else (4, 10)
+    tags = {}
+    while f.tell() + header_len <= tag_end:
+        frame_header = f.read(header_len)
+        frame_id = frame_header[:id_len]
+        if not frame_id.strip(b'\x00'):
+            break  # 进入 padding
+        if major == 2:
+            size = int.from_bytes(frame_header[3:6], 'big')
+        elif major == 4:
+            size = _syncsafe(frame_header[4:8])
+        else:
+            size = int.from_bytes(frame_header[4:8], 'big')
+        field = ID3_TEXT_FRAMES.get(frame_id.decode('latin-1'))
+        if field and size <= MAX_FIELD_BYTES:
+            tags.setdefault(field, _decode_text(f.read(size)))
+        else:
+            f.seek(size, os.SEEK_CUR)
+
+    if 'date' not in tags and tags.get('year'):
+        # ID3v2.3：TYER=YYYY，TDAT=DDMM
+        date = tags['year']
+        daymonth = tags.get('daymonth', '')
+        if len(daymonth) == 4 and daymonth.isdigit():
+            date = f"{date}-{daymonth[2:]}-{daymonth[:2]}"
+        tags['date'] = date
+    tags.pop('year', None)
+    tags.pop('daymonth', None)
+    return tags
+
+def read_tags(path):
+    """按文件头判断格式，返回 {title, album, track, date} 中能读到的字段；不支持的格式返回 {}"""
+    try:
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+            f.seek(0)
+            if magic == b'fLaC':
+                return read_flac_tags(f) or {}
+            if magic[:3] == b'ID3':
+                return read_id3_tags(f) or {}
+    except (OSError, struct.error, IndexError):
+        pass
+    return {}
+
+def normalize_date(value):
+    """标签日期 (YYYY / YYYY-MM-DD / YYYY-MM-DDThh:mm) 转为目录命名使用的 YYYY.MM.DD"""
+    value = value.strip()[:10].replace('-', '.').replace('/', '.')
+    parts = value.split('.')
+    if not parts[0].isdigit() or len(parts[0]) != 4:
+        return ''
+    return '.'.join(p.zfill(2) for p in parts if p.isdigit())
+
+def normalize_track_no(value, width):
+    """'3/12' → '003'（宽度沿用文件名中的编号宽度，默认 3）"""
+    number = value.split('/', 1)[0].strip()
+    if not number.isdigit():
+        return ''
+    return number.zfill(width)
+
+def apply_tags(tracks, cache=None, workers=8):
+    """
+    读取 album / single 曲目的内嵌标签并覆盖文件名解析出的字段，读不到的字段保留文件名解析结果。
+    标签读取在线程池中进行，结果按 (path, mtime, size) 缓存。
+    """
+    def lookup(track):
+        if track.folder_type == 'live' or not track.folder:
+            return {}
+        path = os.path.join(track.folder, track.file_name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return {}
+        if cache is not None:
+            tags = cache.get(path, st)
+            if tags is not None:
+                return tags
+        tags = read_tags(path)
+        if cache is not None:
+            cache.put(path, st, tags)
+        return tags
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        all_tags = list(pool.map(lookup, tracks))
+
+    result = []
+    for t, tags in zip(tracks, all_tags):
+        if not tags:
+            result.append(t)
+            continue
+        changes = {}
+        if tags.get('title'):
+            changes['track_name'] = tags['title']
+        if tags.get('album'):
+            changes['album_name'] = intern(tags['album'])
+        if tags.get('track'):
+            width = len(t.track_no) if t.track_no.isdigit() else 3
+            track_no = normalize_track_no(tags['track'], width)
+            if track_no:
+                changes['track_no'] = track_no
+        date = normalize_date(tags.get('date', ''))
+        if len(date) == 10 or (date and not t.release_date):
+            changes['release_date'] = intern(date)
+        result.append(t._replace(**changes) if changes else t)
+    return result
+
+def load_tag_cache():
+    return FileCache.load("tags")
@@ -0,0 +1,62 @@
+import os
+
+# 歌手目录下的特殊子目录，其余子目录都按专辑处理
+SINGLE_FOLDER = '单曲'
+LIVE_FOLDER = '演唱会'
+# 音乐根目录下的 CloudMusic 目录，由模式 C 处理
+CLOUD_FOLDER = 'CloudMusic'
+
+def scan_dir(path):
+    """
+    单次 os.scandir 遍历目录，返回 (子目录名列表, 文件名列表)。
+    使用 DirEntry 自带的类型信息，不再对每个条目调用 os.path.isdir / isfile。
+    """
+    dirs = []
+    files = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue  # 条目在遍历过程中被删除或无权限
+    return dirs, files
+
+def iter_subdirs(path):
+    """逐个产出 path 下的子目录名"""
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    yield entry.name
+            except OSError:
+                continue
+
+def iter_files(path, exts=None):
+    """逐个产出 path 下的文件名；exts 为小写扩展名集合时只保留匹配的文件"""
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if exts is not None and os.path.splitext(entry.name)[1].lower() not in exts:
+                continue
+            yield entry.name
+
+def folder_type_of(sub):
+    """根据歌手目录下子目录名判断布局类型：single / live / album"""
+    if sub == SINGLE_FOLDER:
+        return 'single'
+    if sub == LIVE_FOLDER:
+        return 'live'
+    return 'album'
+
+def iter_cloud_files(folder_path):
+    """遍历 CloudMusic 目录：每个子目录一次 scandir，产出 (子目录名, 文件名)"""
+    for subfolder in iter_subdirs(folder_path):
+        for file in iter_files(os.path.join(folder_path, subfolder)):
+            yield subfolder, file
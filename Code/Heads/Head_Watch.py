@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+
+from Head_Walk import iter_subdirs
+
+# ---------- inotify 常量 (linux/inotify.h) ----------
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE
+              | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+def iter_tree_dirs(root):
+    """深度优先产出 root 及其下所有子目录"""
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        yield path
+        try:
+            stack.extend(os.path.join(path, d) for d in iter_subdirs(path))
+        except OSError:
+            continue
+
+class InotifyWatcher:
+    """基于 inotify 的递归目录监听（仅 Linux），新建的子目录会自动加入监听"""
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.wd_paths = {}
+        for path in iter_tree_dirs(root):
+            self._add_watch(path)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == 28:  # ENOSPC：max_user_watches 不足
+                raise OSError(err, "inotify 监听数量超过 fs.inotify.max_user_watches")
+            return
+        self.wd_paths[wd] = path
+
+    def wait(self, timeout=None):
+        """阻塞最多 timeout 秒，返回发生变化的路径集合"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，无法知道具体变化，视为整个根目录变化
+                changed.update(os.path.join(self.root, d) for d in iter_subdirs(self.root))
+                continue
+            if mask & IN_IGNORED:
+                self.wd_paths.pop(wd, None)
+                continue
+            parent = self.wd_paths.get(wd)
+            if parent is None:
+                continue
+            path = os.path.join(parent, os.fsdecode(name)) if name else parent
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                for sub in iter_tree_dirs(path):
+                    self._add_watch(sub)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """轮询监听：定期比较所有目录的 (mtime, size, inode) 签名，适用于 drvfs / SMB 等不支持 inotify 的挂载"""
+
+    def __init__(self, root, interval=5.0):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in iter_tree_dirs(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return snapshot
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._take_snapshot()
+        changed = {p for p in snapshot.keys() | self.snapshot.keys()
+                   if snapshot.get(p) != self.snapshot.get(p)}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+def make_watcher(root, poll_interval=5.0, force_poll=False):
+    """优先使用 inotify，不可用时退回轮询"""
+    if not force_poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify 不可用 ({e})，改用轮询")
+    return PollingWatcher(root, poll_interval)
+
+def top_level_names(root, paths):
+    """把变化路径映射为根目录下的一级目录名（歌手名或 CloudMusic）"""
+    names = set()
+    for path in paths:
+        rel = os.path.relpath(path, root)
+        if rel == "." or rel.startswith(".."):
+            continue
+        name = rel.split(os.sep, 1)[0]
+        if os.sep in rel or os.path.isdir(os.path.join(root, name)) or not os.path.exists(path):
+            names.add(name)
+    return names
+
+def watch_library(root, on_change, debounce=2.0, poll_interval=5.0, force_poll=False):
+    """
+    监听 root，事件在 debounce 秒内没有新变化时批量回调 on_change(names)，
+    names 为发生变化的一级目录名集合。Ctrl+C 退出。
+    """
+    watcher = make_watcher(root, poll_interval, force_poll)
+    print(f"👀 监听方式: {'inotify' if isinstance(watcher, InotifyWatcher) else f'轮询 (间隔 {poll_interval}s)'}")
+    pending = set()
+    last_event = 0.0
+    try:
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, debounce - (time.monotonic() - last_event))
+            changed = watcher.wait(timeout)
+            if changed:
+                pending |= top_level_names(root, changed)
+                last_event = time.monotonic()
+                continue
+            if pending and time.monotonic() - last_event >= debounce:
+                names, pending = pending, set()
+                on_change(names)
+    except KeyboardInterrupt:
+        print("\n⏹️ 停止监听")
+    finally:
+        watcher.close()
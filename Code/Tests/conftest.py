@@ -0,0 +1,57 @@
+"""
+回归测试：在临时目录中构造小型曲库（与 Bench_Library 相同的目录布局），
+以子进程运行 Collect.py（工作目录为 <tmp>/Code，输出写入 <tmp>/List），检查写出的 CSV / README / 索引。
+
+用法：
+    python3 -m pytest -q Code/Tests
+"""
+import os
+import sys
+import csv
+import subprocess
+
+import pytest
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADS_DIR = os.path.join(CODE_DIR, "Heads")
+sys.path.append(HEADS_DIR)
+
+def touch(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+class Workspace:
+    """<tmp>/Code 为 Collect.py 的工作目录，<tmp>/List 为输出目录"""
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.code = os.path.join(self.root, "Code")
+        self.list = os.path.join(self.root, "List")
+        os.makedirs(self.code)
+        os.makedirs(self.list)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def run(self, *args):
+        """运行 Collect.py（无交互输入），返回标准输出；非零退出时测试失败"""
+        env = dict(os.environ, PYTHONIOENCODING="utf-8")
+        result = subprocess.run([sys.executable, os.path.join(CODE_DIR, "Collect.py"), *map(str, args)],
+                                cwd=self.code, stdin=subprocess.DEVNULL, capture_output=True,
+                                text=True, encoding="utf-8", env=env, timeout=120)
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout
+
+    def rows(self, *parts):
+        """List 下 CSV 的所有行（含表头）"""
+        with open(os.path.join(self.list, *parts), "r", encoding="utf-8-sig", newline="") as f:
+            return [row for row in csv.reader(f) if row]
+
+    def text(self, *parts):
+        with open(os.path.join(self.list, *parts), "r", encoding="utf-8") as f:
+            return f.read()
+
+@pytest.fixture
+def workspace(tmp_path):
+    return Workspace(tmp_path)
@@ -0,0 +1,50 @@
+"""--db 曲库模式：CSV 为曲库的导出视图，在曲库之外被修改或删除后仍与曲库保持一致"""
+import os
+
+from conftest import touch
+
+def make_library(workspace):
+    lib = workspace.path("lib")
+    touch(f"{lib}/歌手001/2001.01.01_Album_X/001.a.flac")
+    touch(f"{lib}/歌手001/2001.01.01_Album_X/002.b.flac")
+    return lib
+
+def test_deleted_csv_is_exported_again(workspace):
+    lib = make_library(workspace)
+    workspace.run(lib, "-a", "--policy", "accept", "--db")
+    csv_file = os.path.join(workspace.list, "歌手001", "歌手001.csv")
+    readme = os.path.join(workspace.list, "歌手001", "README.md")
+    rows = workspace.rows("歌手001", "歌手001.csv")
+
+    os.remove(csv_file)
+    os.remove(readme)
+    workspace.run(os.path.join(lib, "歌手001"), "-s", "--db")
+    assert workspace.rows("歌手001", "歌手001.csv") == rows
+    assert "**[002]** b" in workspace.text("歌手001", "README.md")
+
+def test_deleted_summary_is_exported_again(workspace):
+    lib = workspace.path("lib")
+    touch(f"{lib}/CloudMusic/A/S1-one_CD.mp3")
+    workspace.run(lib, "-c", "--policy", "accept", "--db")
+    rows = workspace.rows("Summary.csv")
+
+    os.remove(os.path.join(workspace.list, "Summary.csv"))
+    workspace.run(lib, "-c", "--policy", "accept", "--db")
+    assert workspace.rows("Summary.csv") == rows
+
+def test_csv_edited_outside_catalog_is_reimported(workspace):
+    lib = make_library(workspace)
+    workspace.run(lib, "-a", "--policy", "accept", "--db")
+    csv_file = os.path.join(workspace.list, "歌手001", "歌手001.csv")
+    with open(csv_file, "a", encoding="utf-8", newline="") as f:
+        f.write("\r\nsingle,1999.01.01,-,-,Handmade")
+
+    workspace.run(lib, "-a", "--policy", "keep", "--db")
+    assert ["single", "1999.01.01", "-", "-", "Handmade"] in workspace.rows("歌手001", "歌手001.csv")
+
+def test_plan_writes_nothing(workspace):
+    lib = make_library(workspace)
+    workspace.run("plan", lib)
+    assert os.listdir(workspace.list) == [".cache"]
+    cache = os.listdir(os.path.join(workspace.list, ".cache"))
+    assert "catalog.pack" not in cache and "search.sqlite3" not in cache
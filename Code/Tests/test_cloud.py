@@ -0,0 +1,29 @@
+"""模式 C：Summary.csv 的增量更新与 CloudMusic 子目录清单"""
+import os
+
+from conftest import touch
+
+HEADER = ["Singer", "Name", "From"]
+
+def test_accept_after_keep_drops_kept_rows(workspace):
+    """keep 保留了已删除的条目后，清单不能掩盖差异：之后的 accept 仍需删除这些条目"""
+    sub = workspace.path("lib", "CloudMusic", "A")
+    touch(f"{sub}/S1-one_CD.mp3")
+    touch(f"{sub}/S1-two_CD.mp3")
+    lib = workspace.path("lib")
+    workspace.run(lib, "-c", "--policy", "accept")
+
+    os.remove(f"{sub}/S1-two_CD.mp3")
+    touch(f"{sub}/S1-three_CD.mp3")
+    workspace.run(lib, "-c", "--policy", "keep")
+    assert workspace.rows("Summary.csv") == [HEADER, ["S1", "one", "CD"], ["S1", "two", "CD"], ["S1", "three", "CD"]]
+
+    workspace.run(lib, "-c", "--policy", "accept")
+    assert workspace.rows("Summary.csv") == [HEADER, ["S1", "one", "CD"], ["S1", "three", "CD"]]
+
+def test_cloud_folder_is_not_an_artist(workspace):
+    touch(workspace.path("lib", "CloudMusic", "A", "S1-one_CD.mp3"))
+    touch(workspace.path("lib", "Art", "2001.01.01_Album_X", "001.a.flac"))
+    workspace.run(workspace.path("lib"), "-a", "--policy", "accept")
+    assert os.path.exists(os.path.join(workspace.list, "Art", "Art.csv"))
+    assert not os.path.exists(os.path.join(workspace.list, "CloudMusic"))
@@ -0,0 +1,45 @@
+"""多个根目录（模式 A）：同一条目只写一行，Root 列合并各根目录的标签"""
+import pytest
+
+from conftest import touch
+
+HEADER = ["Type", "Date", "Album", "No", "Name", "Root"]
+
+def make_roots(workspace):
+    root_a, root_b = workspace.path("rootA"), workspace.path("rootB")
+    for root in (root_a, root_b):
+        touch(f"{root}/Art/2001.01.01_Album_X/001.a.flac")
+    touch(f"{root_a}/Art/2001.01.01_Album_X/002.b.flac")
+    return root_a, root_b
+
+@pytest.mark.parametrize("mode", ["All", "Partial"])
+def test_album_on_two_roots_is_one_row(workspace, mode):
+    root_a, root_b = make_roots(workspace)
+    workspace.run(root_a, root_b, "-a", "--policy", "accept", "-m", mode)
+
+    assert workspace.rows("Art", "Art.csv") == [
+        HEADER,
+        ["album", "2001.01.01", "X", "001", "a", f"{root_a}|{root_b}"],
+        ["album", "2001.01.01", "X", "002", "b", root_a],
+    ]
+    assert workspace.text("Art", "README.md").count("**[001]** a") == 1
+    assert "🔎 1 条结果" in workspace.run("search", "a", "--artist", "Art")
+
+def test_partial_run_keeps_labels_of_unscanned_roots(workspace):
+    root_a, root_b = make_roots(workspace)
+    workspace.run(root_a, root_b, "-a", "--policy", "accept")
+    before = workspace.rows("Art", "Art.csv")
+
+    workspace.run(root_a, "-a", "--policy", "accept")
+    assert workspace.rows("Art", "Art.csv") == before
+    workspace.run(root_b, "-a", "--policy", "accept")
+    assert workspace.rows("Art", "Art.csv") == before
+
+def test_duplicates_within_one_root_are_kept(workspace):
+    """单个根目录内的重复条目（同名 flac / mp3）与单根目录运行时一致，不因多根目录合并而减少"""
+    root_a, root_b = make_roots(workspace)
+    touch(f"{root_a}/Art/2001.01.01_Album_X/001.a.mp3")
+    workspace.run(root_a, root_b, "-a", "--policy", "accept", "-m", "All")
+
+    rows = workspace.rows("Art", "Art.csv")
+    assert [row[4] for row in rows[1:]] == ["a", "a", "b"]
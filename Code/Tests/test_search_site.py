@@ -0,0 +1,114 @@
+"""搜索索引 (Head_Search) 与静态网站 (Head_Site)：归一化规则、增量更新、导出文件权限"""
+import os
+import json
+import stat
+import shutil
+import subprocess
+
+import pytest
+
+from Head_Record import make_record
+from Head_Search import SearchIndex, normalize
+from Head_Site import build_site, search_js
+
+CATALOGS = {
+    "Die Ärzte": [make_record("album", "2000.01.01", "Straße", "001", "Weißes Lied"),
+                  make_record("single", "2001.01.01", "-", "-", "ΟΔΥΣΣΕΥΣ")],
+    "LiSA": [make_record("album", "2019.12.11", "残響散歌", "001", "残響散歌"),
+             make_record("live", "2020.02.02", "-", "-", "ＬｉＳＡ ＬＩＶＥ")],
+}
+CLOUD = [{"Singer": "周杰伦", "Name": "晴天", "From": "CD"}]
+SAMPLES = ["STRASSE", "ẞ", "weiss", "ΟΔΥΣΣΕΥΣ", "οδυσσευς", "ﬁnal", "İstanbul", "ＬｉＳＡ", "µ ſ"]
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.sqlite3"))
+    for artist, records in CATALOGS.items():
+        index.update_artist(artist, records)
+    index.update_cloud(CLOUD)
+    yield index
+    index.close()
+
+def names(results):
+    return sorted(r["Name"] for r in results)
+
+def test_search_folds_case_and_width(index):
+    assert names(index.search("strasse")) == ["Weißes Lied"]
+    assert names(index.search("WEISS")) == ["Weißes Lied"]
+    assert names(index.search("οδυσσευς")) == ["ΟΔΥΣΣΕΥΣ"]
+    assert names(index.search("lisa live")) == ["ＬｉＳＡ ＬＩＶＥ"]
+
+def test_search_cjk_substrings(index):
+    assert names(index.search("響散")) == ["残響散歌"]
+    assert index.search("散響") == []
+    assert [r["Kind"] for r in index.search("晴天")] == ["cloud"]
+
+def test_search_incremental_update(index):
+    index.update_artist("LiSA", CATALOGS["LiSA"][1:])
+    assert index.search("残響") == []
+    index.update_artist("LiSA", CATALOGS["LiSA"])
+    assert names(index.search("残響")) == ["残響散歌"]
+
+# ---------- 静态网站 ----------
+def read_files(root):
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+def site_search(root, term):
+    """按 search.js 的规则在导出的分片中检索单个词（至少两个字符），返回命中文档的标题"""
+    with open(os.path.join(root, "search", "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    found = None
+    for i in range(len(term) - 1):
+        gram = term[i:i + 2]
+        with open(os.path.join(root, "search", f"g{ord(gram[0]) % meta['shards']}.json"), encoding="utf-8") as f:
+            ids = set(json.load(f).get(gram, []))
+        found = ids if found is None else found & ids
+    titles = []
+    for doc_id in sorted(found):
+        with open(os.path.join(root, "search", f"d{doc_id // meta['per_shard']}.json"), encoding="utf-8") as f:
+            doc = json.load(f)[doc_id % meta["per_shard"]]
+        if doc is not None and term in doc[4]:
+            titles.append(doc[1])
+    return titles
+
+def test_site_incremental_matches_full_build(tmp_path):
+    site, fresh = str(tmp_path / "site"), str(tmp_path / "fresh")
+    build_site(site, CATALOGS, CLOUD)
+    catalogs = dict(CATALOGS, LiSA=CATALOGS["LiSA"] + [make_record("album", "2021.01.01", "新しい", "001", "炎")])
+    result = build_site(site, catalogs, CLOUD)
+    assert 0 < result["rendered"] < result["pages"]
+    build_site(fresh, catalogs, CLOUD, force=True)
+
+    pages = lambda files: {k: v for k, v in files.items() if not k.startswith(("search", ".manifest"))}
+    assert pages(read_files(site)) == pages(read_files(fresh))
+    assert site_search(site, normalize("新し")) == ["炎"]
+    assert site_search(site, normalize("STRASSE")) == ["Weißes Lied"]
+
+def test_site_is_world_readable(tmp_path):
+    old_umask = os.umask(0o022)
+    try:
+        site = str(tmp_path / "site")
+        build_site(site, CATALOGS, CLOUD)
+        build_site(site, dict(CATALOGS, LiSA=CATALOGS["LiSA"][:1]), CLOUD)
+    finally:
+        os.umask(old_umask)
+    for dirpath, dirnames, filenames in os.walk(site):
+        for name in dirnames:
+            assert os.stat(os.path.join(dirpath, name)).st_mode & stat.S_IXOTH, name
+        for name in filenames:
+            assert os.stat(os.path.join(dirpath, name)).st_mode & stat.S_IROTH, name
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="需要 node")
+def test_search_js_normalize_matches_python():
+    js = search_js()
+    source = js[js.index("const FOLD"):js.index("function postings")]
+    source += "process.stdout.write(JSON.stringify(JSON.parse(require('fs').readFileSync(0, 'utf8')).map(normalize)));"
+    result = subprocess.run(["node", "-e", source], input=json.dumps(SAMPLES), capture_output=True,
+                            text=True, encoding="utf-8", check=True)
+    assert json.loads(result.stdout) == [normalize(s) for s in SAMPLES]